@@ -0,0 +1,156 @@
+# app/adb_shell.py
+
+"""
+Persistent ADB shell sessions. Instead of opening a new `shell:` channel for
+every command, one `sh` process per device stays open for the whole run;
+commands are written to its stdin and each command's output is read up to a
+sentinel line. Dropped sessions are reopened on the next command.
+"""
+
+import atexit
+import shlex
+import threading
+import uuid
+
+from ppadb.device import Device
+
+# Seconds to wait for a command's output before the session counts as dropped
+SHELL_TIMEOUT_SECONDS = 30
+
+# Use persistent sessions in helper_functions.shell(), see configure_persistent_shell()
+persistent_shell_enabled = True
+
+# Commands that are safe to run again when a session drops mid-command
+IDEMPOTENT_COMMAND_PREFIXES = (
+    "wm size",
+    "am force-stop",
+    "am kill",
+    "am start",
+    "input keyevent KEYCODE_HOME",
+)
+
+# Open sessions by device serial
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class CommandInterruptedError(RuntimeError):
+    """The session dropped while a command ran; it may or may not have taken effect"""
+
+
+class PersistentShell:
+    """One long-lived `sh` process on the device, shared by all shell commands"""
+
+    def __init__(self, device, timeout: float = SHELL_TIMEOUT_SECONDS):
+        self.device = device
+        self.timeout = timeout
+        self.reconnects = 0
+        self._opened = False
+        self._conn = None
+        self._sentinel = f"__HINGE_SHELL_DONE_{uuid.uuid4().hex}__"
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def _open(self):
+        if self._opened:
+            print("🔌 Reopening ADB shell session...")
+            self.reconnects += 1
+        self._opened = True
+        conn = self.device.create_connection(timeout=self.timeout)
+        try:
+            # `sh` without a tty: no prompt or echo, stdin is the command stream
+            conn.send("shell:sh")
+        except Exception:
+            conn.close()
+            raise
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+    def run(self, command: str) -> str:
+        """
+        Run a command and return its combined stdout/stderr.
+
+        Raises ConnectionError if the command could not be sent (it did not
+        run), and CommandInterruptedError if the session dropped while it was
+        running.
+        """
+        sentinel = self._sentinel.encode()
+        # Each command runs in its own `sh -c`, so a syntax error (e.g. an
+        # unbalanced quote in typed text) ends that command instead of leaving
+        # the session waiting for more input. stdin is the session itself, so
+        # commands must not read from it.
+        payload = (
+            f"sh -c {shlex.quote(command)} </dev/null 2>&1; echo {self._sentinel}\n"
+        )
+
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._open()
+                    self._conn.write(payload.encode())
+                    break
+                except Exception as e:
+                    self.close()
+                    if attempt:
+                        raise ConnectionError(f"ADB shell session unavailable: {e}")
+
+            output = bytearray()
+            try:
+                while True:
+                    end = output.find(sentinel)
+                    if end != -1 and output.find(b"\n", end) != -1:
+                        return output[:end].decode("utf-8", errors="replace")
+                    data = self._conn.read(4096)
+                    if not data:
+                        raise RuntimeError("ADB shell session closed")
+                    output += data
+            except Exception as e:
+                self.close()
+                raise CommandInterruptedError(
+                    f"ADB shell session dropped during '{command}': {e}"
+                )
+
+
+def is_idempotent(command: str) -> bool:
+    """Whether a command can be resent after it may already have run"""
+    return command.strip().startswith(IDEMPOTENT_COMMAND_PREFIXES)
+
+
+def configure_persistent_shell(enabled: bool = True):
+    """Enable or disable persistent sessions (closes open ones when disabling)"""
+    global persistent_shell_enabled
+    persistent_shell_enabled = enabled
+    if not enabled:
+        close_shell_sessions()
+
+
+def get_shell_session(device):
+    """Session for a real ppadb device, or None to use device.shell()"""
+    # Fakes, recording and replay devices keep their own shell()
+    if not persistent_shell_enabled or not isinstance(device, Device):
+        return None
+    with _sessions_lock:
+        session = _sessions.get(device.serial)
+        if session is None or session.device is not device:
+            session = _sessions[device.serial] = PersistentShell(device)
+        return session
+
+
+def close_shell_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(close_shell_sessions)
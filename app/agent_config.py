@@ -1,6 +1,6 @@
 # app/agent_config.py
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any
 import random
 
@@ -14,6 +14,9 @@ class AgentConfig:
     max_retries_per_action: int = 3
     max_errors_before_abort: int = 5
     max_stuck_count: int = 3
+    # Graph steps (node executions) budgeted per profile; the whole run stops
+    # at max_profiles times this many steps
+    max_graph_steps_per_profile: int = 40
 
     # Timing settings (in seconds)
     screenshot_delay: float = random.uniform(0, 1)
@@ -22,6 +25,14 @@ class AgentConfig:
     text_input_delay: float = random.uniform(0, 1)
     keyboard_dismiss_delay: float = random.uniform(0, 1)
 
+    # Event-driven waits: after UI actions, poll low-resolution captures until
+    # the screen stops changing (bounded by the old fixed delay) instead of
+    # sleeping; min_action_delay is a pacing floor kept even if the UI settles
+    # sooner (randomized up to the old minimum for ranged human-like delays)
+    stable_screen_waits: bool = True
+    stable_screen_poll_interval: float = 0.25
+    min_action_delay: float = 0.5
+
     # Profile analysis thresholds
     quality_threshold_high: int = 8
     quality_threshold_medium: int = 6
@@ -35,6 +46,22 @@ class AgentConfig:
     min_ui_confidence: float = 0.7
     retry_confidence_threshold: float = 0.7
 
+    # OpenCV template matching: coarse pyramid level and per-template search
+    # regions as screen fractions (x1, y1, x2, y2)
+    cv_pyramid_scale: float = 0.25
+    like_button_roi: tuple = (0.0, 0.0, 1.0, 1.0)
+    send_button_roi: tuple = (0.0, 0.5, 1.0, 1.0)
+    comment_field_roi: tuple = (0.0, 0.25, 1.0, 1.0)
+
+    # Local profile change detection (perceptual hash + SSIM over the header
+    # region); scores between the two similarity thresholds escalate to Gemini
+    screen_change_region: tuple = (0.0, 0.06, 1.0, 0.45)
+    screen_unchanged_similarity: float = 0.9
+    screen_changed_similarity: float = 0.6
+    # Screen-height fraction searched for the previous header after the
+    # navigation swipe; a header that only moved up is the same profile
+    navigation_max_scroll: float = 0.18
+
     # Swipe and tap coordinates (as percentages)
     dislike_button_coords: tuple = (0.15, 0.85)
     navigation_swipe_coords: tuple = (0.15, 0.5, 0.15, 0.375)  # x1, y1, x2, y2
@@ -50,6 +77,36 @@ class AgentConfig:
     max_scroll_attempts: int = 3
     scroll_distance_factor: float = 0.3  # how far to scroll
 
+    # Follow the normal workflow with a local transition table; Gemini only
+    # picks the next action after a failed action or when stuck
+    rule_based_routing: bool = True
+
+    # Profile analysis: "multi_image" sends every scroll screenshot in a single
+    # Gemini request; "per_frame" extracts each screenshot then analyzes the text
+    profile_analysis_mode: str = "multi_image"
+
+    # Per-frame pipelining: extract text from each scroll screenshot in
+    # background workers while the device keeps scrolling
+    pipeline_profile_extraction: bool = True
+    extraction_workers: int = 4
+
+    # Screenshot preparation for Gemini vision requests: downscale to a max
+    # edge and encode as "jpeg"/"webp" (or lossless "png"); crop regions are
+    # optional (x1, y1, x2, y2) screen fractions keyed by request name
+    gemini_image_format: str = "jpeg"
+    gemini_image_max_edge: int = 1280
+    gemini_image_quality: int = 80
+    gemini_image_crop_regions: Dict[str, tuple] = field(default_factory=dict)
+
+    # Gemini response cache, keyed by prompt and screenshot content; "exact"
+    # matches identical pixels, "perceptual" also reuses near-identical screens.
+    # Comment generation is never cached.
+    gemini_cache_enabled: bool = True
+    gemini_cache_dir: str = ".gemini_cache"
+    gemini_cache_max_entries: int = 512
+    gemini_cache_ttl_seconds: float = 3600.0
+    gemini_cache_image_key: str = "exact"
+
     # Recovery strategies
     enable_aggressive_navigation: bool = True
     enable_back_button_recovery: bool = True
@@ -59,7 +116,19 @@ class AgentConfig:
     default_comment: str = "Hey, I'd love to meet up!"
     comment_style: str = "balanced"  # comedic, flirty, straightforward, balanced
 
+    # Screenshot capture: "png" (device-side PNG encoding) or "raw" (framebuffer dump)
+    screenshot_capture_mode: str = "png"
+
+    # Run shell commands over one long-lived `adb shell` session per device
+    # instead of opening a new shell channel for every command
+    persistent_adb_shell: bool = True
+
+    # Comment/feedback storage: "sqlite" (indexed, aggregate queries) or
+    # "jsonl" (append-only log)
+    data_store_backend: str = "sqlite"
+
     # Debug settings
+    enable_timing: bool = False  # per-node / per-dependency latency report
     save_screenshots: bool = True
     screenshot_dir: str = "images"
     verbose_logging: bool = True
@@ -0,0 +1,72 @@
+# app/background_writer.py
+
+"""
+Background thread for local disk writes (screenshots, comment records).
+Workflow nodes hand writes to a bounded queue and continue immediately;
+the queue is flushed at the end of a session and on interpreter exit.
+"""
+
+import atexit
+import queue
+import threading
+
+# Queued writes before submit() applies backpressure
+MAX_PENDING_WRITES = 256
+
+
+class BackgroundWriter:
+    """Runs queued write callables in order on a single daemon thread"""
+
+    def __init__(self, name: str = "background-writer", max_pending: int = None):
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_pending or MAX_PENDING_WRITES)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            fn, args, kwargs = self._queue.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"⚠️  Warning: Background write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def in_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); blocks only if the queue is full"""
+        if self.in_writer_thread():
+            # Writes issued by a queued write run inline to keep ordering
+            fn(*args, **kwargs)
+            return
+        self._ensure_started()
+        self._queue.put((fn, args, kwargs))
+
+    def flush(self):
+        """Block until every queued write has completed"""
+        if self._thread is None or self.in_writer_thread():
+            return
+        self._queue.join()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+
+_background_writer = BackgroundWriter()
+atexit.register(_background_writer.flush)
+
+
+def get_background_writer() -> BackgroundWriter:
+    return _background_writer
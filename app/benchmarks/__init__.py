@@ -0,0 +1,12 @@
+# app/benchmarks/__init__.py
+
+"""
+Benchmarks for the local hot paths (CV detection, profile text merging,
+comment storage and success-rate queries).
+
+Run from the app directory:
+    python -m benchmarks                  # full suite, compared to baseline.json
+    python -m benchmarks --quick          # skip the 1M record data sets
+    python -m benchmarks --save-baseline  # store results as the new baseline
+    python -m benchmarks.scenario         # end-to-end profiles/hour simulation
+"""
@@ -0,0 +1,263 @@
+# app/benchmarks/__main__.py
+
+"""
+Benchmark runner: python -m benchmarks [--quick] [--save-baseline]
+Writes machine-readable results and compares them against a saved baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import data_store
+from benchmarks.synthetic import (
+    RESOLUTIONS,
+    profile_texts,
+    synthetic_screen,
+    write_history,
+)
+from helper_functions import (
+    detect_comment_field_cv,
+    detect_like_button_cv,
+    detect_send_button_cv,
+)
+from langgraph_hinge_agent import LangGraphHingeAgent
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+QUICK_HISTORY_SIZES = (1_000, 100_000)
+
+# Metrics compared against the baseline: times (lower is better), e.g. the
+# first success-rate call that scans the history, and throughputs (higher is better)
+TIME_METRICS = ("median_ms", "first_call_ms")
+THROUGHPUT_METRICS = ("written_per_s",)
+
+
+def measure(fn, repeat: int = 20, warmup: int = 2) -> dict:
+    """Time repeated calls of fn, in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+        "repeat": repeat,
+    }
+
+
+def _quiet(fn):
+    """Run fn with its progress prints discarded"""
+
+    def run():
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            return fn()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    return run
+
+
+def bench_cv() -> dict:
+    results = {}
+    detectors = {
+        "detect_like_button_cv": detect_like_button_cv,
+        "detect_send_button_cv": detect_send_button_cv,
+        "detect_comment_field_cv": detect_comment_field_cv,
+    }
+    for width, height in RESOLUTIONS:
+        screen = synthetic_screen(width, height)
+        for name, detector in detectors.items():
+            result = _quiet(lambda: detector(screen))()
+            if not result.get("found"):
+                print(f"⚠️  {name} did not find its template at {width}x{height}")
+            results[f"cv.{name}[{width}x{height}]"] = measure(
+                _quiet(lambda: detector(screen))
+            )
+    return results
+
+
+def bench_text() -> dict:
+    texts = profile_texts()
+    return {
+        "text._combine_unique_content": measure(
+            lambda: LangGraphHingeAgent._combine_unique_content(texts), repeat=200
+        )
+    }
+
+
+def _in_directory(directory: str, fn):
+    previous_dir = os.getcwd()
+    os.chdir(directory)
+    try:
+        return fn()
+    finally:
+        data_store.close_comment_store()
+        data_store.close_database()
+        os.chdir(previous_dir)
+
+
+def bench_success_rates(sizes) -> dict:
+    results = {}
+    for backend in ("sqlite", "jsonl"):
+        for records in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+
+                def run():
+                    data_store.configure_data_store(backend, data_store.DEFAULT_DB_FILE)
+                    write_history(backend, records, directory)
+                    calculate = _quiet(data_store.calculate_template_success_rates)
+
+                    start = time.perf_counter()
+                    calculate()
+                    first_ms = (time.perf_counter() - start) * 1000
+
+                    timing = measure(calculate, repeat=10, warmup=0)
+                    timing["first_call_ms"] = round(first_ms, 4)
+                    return timing
+
+                key = f"data.calculate_template_success_rates[{backend},{records}]"
+                results[key] = _in_directory(directory, run)
+                print(f"   {key}: {results[key]['median_ms']:.3f} ms")
+    data_store.configure_data_store(db_file=data_store.DEFAULT_DB_FILE)
+    return results
+
+
+def bench_store_comment() -> dict:
+    results = {}
+    for backend in ("sqlite", "jsonl"):
+        with tempfile.TemporaryDirectory() as directory:
+
+            def run():
+                data_store.configure_data_store(backend, data_store.DEFAULT_DB_FILE)
+                counter = iter(range(10**9))
+
+                def store():
+                    data_store.store_generated_comment(
+                        f"c{next(counter)}", "profile " * 40, "comment " * 10, "flirty"
+                    )
+
+                # Latency seen by the workflow node (queued write)
+                timing = measure(store, repeat=500)
+
+                # Throughput including the background write and fsync
+                start = time.perf_counter()
+                for _ in range(1000):
+                    store()
+                data_store.flush_comment_store()
+                timing["written_per_s"] = round(1000 / (time.perf_counter() - start))
+                return timing
+
+            results[f"data.store_generated_comment[{backend}]"] = _in_directory(
+                directory, run
+            )
+    data_store.configure_data_store(db_file=data_store.DEFAULT_DB_FILE)
+    return results
+
+
+def _slowdown(metric: str, before: float, after: float) -> float:
+    """Relative slowdown, positive when the result got worse"""
+    if metric in THROUGHPUT_METRICS:
+        before, after = after, before
+    return (after - before) / before if before else 0.0
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Benchmark metrics that regressed by more than tolerance"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for metric in TIME_METRICS + THROUGHPUT_METRICS:
+            if metric not in result or metric not in reference:
+                continue
+            before, after = reference[metric], result[metric]
+            change = _slowdown(metric, before, after)
+            status = "❌" if change > tolerance else "✅"
+            unit = "/s" if metric in THROUGHPUT_METRICS else " ms"
+            print(
+                f"{status} {key} {metric}: {before:.3f} → {after:.3f}{unit} "
+                f"({change:+.0%})"
+            )
+            if change > tolerance:
+                regressions.append(f"{key}:{metric}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local hot path benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Skip 1M record sets")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results JSON path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Save results as the baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown of any compared metric before it counts as regressed",
+    )
+    args = parser.parse_args()
+
+    print("🏁 Running CV benchmarks...")
+    results = bench_cv()
+    print("🏁 Running text benchmarks...")
+    results.update(bench_text())
+    print("🏁 Running success-rate benchmarks...")
+    results.update(
+        bench_success_rates(QUICK_HISTORY_SIZES if args.quick else HISTORY_SIZES)
+    )
+    print("🏁 Running comment store benchmarks...")
+    results.update(bench_store_comment())
+
+    report = {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️  No baseline found - run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) regressed")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+# app/benchmarks/scenario.py
+
+"""
+End-to-end scenario benchmark: runs LangGraphHingeAgent.run_automation against
+a simulated Hinge device and a stub Gemini client with configurable latency
+distributions, and reports profiles/hour, Gemini calls and upload bytes per
+profile, and time spent sleeping.
+
+Run from the app directory:
+    python -m benchmarks.scenario --profiles 5 --gemini-median-ms 1500
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import fakes
+import instrumentation
+from agent_config import AgentConfig
+from benchmarks.synthetic import synthetic_screen
+from fakes import profile_response
+from helper_functions import set_sleep_scale
+from langgraph_hinge_agent import LangGraphHingeAgent
+
+
+def _lognormal_seconds(rng, median_ms: float, sigma: float) -> float:
+    if median_ms <= 0:
+        return 0.0
+    return float(rng.lognormal(np.log(median_ms / 1000), sigma))
+
+
+class SimulatedHingeDevice:
+    """
+    Fake device showing a stream of profiles. Scroll swipes move down the
+    current profile; taps (like/dislike) and navigation swipes open the next one.
+
+    Screens come from a pool rendered up front, so the run measures the agent
+    rather than PNG encoding on the host. For `transition_ms` after each action
+    captures show changing frames, like a UI animation.
+    """
+
+    serial = "simulated"
+
+    def __init__(
+        self,
+        width: int = 1080,
+        height: int = 2400,
+        screencap_median_ms: float = 250,
+        shell_median_ms: float = 40,
+        sigma: float = 0.3,
+        seed: int = 0,
+        screen_pool: int = 8,
+        transition_ms: float = 400,
+    ):
+        self.width = width
+        self.height = height
+        self.screencap_median_ms = screencap_median_ms
+        self.shell_median_ms = shell_median_ms
+        self.sigma = sigma
+        self.rng = np.random.default_rng(seed)
+        self.transition_ms = transition_ms
+        self.profile = 0
+        self.scroll = 0
+        self.screencaps = 0
+        self._changed_at = None
+
+        # Each profile/scroll position shows one of these, with a like button
+        self._pool = [
+            synthetic_screen(
+                width, height, templates=["like_button"], seed=seed * 100 + i
+            ).png_bytes
+            for i in range(screen_pool)
+        ]
+        self._transitions = [
+            synthetic_screen(
+                width, height, templates=[], seed=seed * 100 + 50 + i
+            ).png_bytes
+            for i in range(4)
+        ]
+        self._screens = {(0, 0): 0}
+        self._screen = 0
+
+    def shell(self, command):
+        time.sleep(_lognormal_seconds(self.rng, self.shell_median_ms, self.sigma))
+        args = command.split()
+        if command == "wm size":
+            return f"Physical size: {self.width}x{self.height}"
+        if args[:2] == ["input", "tap"]:
+            self._next_profile()
+        elif args[:2] == ["input", "swipe"]:
+            x1, y1, _, y2 = (int(value) for value in args[2:6])
+            if x1 < self.width * 0.3 and y2 < y1 and y1 - y2 < self.height * 0.2:
+                self._next_profile()  # navigation swipe
+            else:
+                self.scroll += 1
+                self._show_next_screen()
+        return ""
+
+    def _next_profile(self):
+        self.profile += 1
+        self.scroll = 0
+        self._show_next_screen()
+
+    def _show_next_screen(self):
+        # Consecutive screens always differ
+        key = (self.profile, self.scroll)
+        if key not in self._screens:
+            self._screens[key] = (self._screen + 1) % len(self._pool)
+        self._screen = self._screens[key]
+        self._changed_at = time.perf_counter()
+
+    def screencap(self):
+        time.sleep(_lognormal_seconds(self.rng, self.screencap_median_ms, self.sigma))
+        self.screencaps += 1
+        if self._changed_at is not None:
+            elapsed_ms = (time.perf_counter() - self._changed_at) * 1000
+            if elapsed_ms < self.transition_ms:
+                # A new animation frame every 50ms
+                frame = int(elapsed_ms // 50) % len(self._transitions)
+                return self._transitions[frame]
+        return self._pool[self._screen]
+
+
+class _LatencyResponder:
+    """Response text for each request, after a lognormal latency"""
+
+    def __init__(self, median_ms: float, sigma: float, like_rate: float, seed: int):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.like_rate = like_rate
+        self.rng = np.random.default_rng(seed)
+        self.bytes_uploaded = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, contents, config):
+        with self._lock:
+            for part in contents:
+                if isinstance(part, str):
+                    self.bytes_uploaded += len(part.encode())
+                elif getattr(part, "inline_data", None) is not None:
+                    self.bytes_uploaded += len(part.inline_data.data)
+            latency = _lognormal_seconds(self.rng, self.median_ms, self.sigma)
+            liked = self.rng.random() < self.like_rate
+        time.sleep(latency)
+
+        images = sum(1 for part in contents if not isinstance(part, str))
+        if images > 1:
+            analysis = {
+                "profile_quality_score": 9 if liked else 3,
+                "conversation_potential": 9 if liked else 2,
+                "positive_indicators": ["hiking", "travel"],
+                "red_flags": [] if liked else ["empty profile"],
+                "name": "Sam",
+            }
+            return profile_response(analysis, "Name: Sam\nLoves hiking")
+        if config is not None:
+            return "{}"
+        return "Want to grab a coffee this week?"
+
+
+class StubGeminiClient(fakes.StubGeminiClient):
+    """genai.Client stand-in with lognormal response latency"""
+
+    def __init__(self, median_ms=1500, sigma=0.4, like_rate=0.3, seed=0):
+        self.responder = _LatencyResponder(median_ms, sigma, like_rate, seed)
+        super().__init__(self.responder)
+
+
+def run_scenario(
+    profiles: int = 5,
+    gemini_median_ms: float = 1500,
+    gemini_sigma: float = 0.4,
+    screencap_median_ms: float = 250,
+    shell_median_ms: float = 40,
+    transition_ms: float = 400,
+    sleep_scale: float = 1.0,
+    like_rate: float = 0.3,
+    config: AgentConfig = None,
+) -> dict:
+    """Run one simulated session and return its throughput metrics"""
+    # Screens are rendered here, outside the measured run
+    device = SimulatedHingeDevice(
+        screencap_median_ms=screencap_median_ms,
+        shell_median_ms=shell_median_ms,
+        transition_ms=transition_ms,
+    )
+    client = StubGeminiClient(gemini_median_ms, gemini_sigma, like_rate)
+    config = config or AgentConfig()
+    config.max_profiles = profiles
+    config.save_screenshots = False
+    config.gemini_cache_enabled = False
+    config.enable_timing = True
+
+    previous_dir = os.getcwd()
+    set_sleep_scale(sleep_scale)
+    stdout = sys.stdout
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            sys.stdout = open(os.devnull, "w")
+            agent = LangGraphHingeAgent(
+                max_profiles=profiles,
+                config=config,
+                gemini_client=client,
+                device=device,
+            )
+            start = time.perf_counter()
+            result = agent.run_automation()
+            elapsed = time.perf_counter() - start
+    finally:
+        if sys.stdout is not stdout:
+            sys.stdout.close()
+            sys.stdout = stdout
+        set_sleep_scale(1.0)
+        instrumentation.enable_timing(False)
+        os.chdir(previous_dir)
+
+    processed = max(1, result.get("profiles_processed", 0))
+    timing = result.get("timing", {})
+    sleep_seconds = sum(stats["total_s"] for stats in timing.get("sleep", {}).values())
+    wait_seconds = sum(stats["total_s"] for stats in timing.get("wait", {}).values())
+    return {
+        "profiles_processed": result.get("profiles_processed", 0),
+        "likes_sent": result.get("likes_sent", 0),
+        "comments_sent": result.get("comments_sent", 0),
+        "errors_encountered": result.get("errors_encountered", 0),
+        "elapsed_s": round(elapsed, 2),
+        "profiles_per_hour": round(
+            result.get("profiles_processed", 0) / elapsed * 3600, 1
+        ),
+        "gemini_calls_per_profile": round(client.models.calls / processed, 2),
+        "bytes_uploaded_per_profile": round(
+            client.responder.bytes_uploaded / processed
+        ),
+        "screencaps_per_profile": round(device.screencaps / processed, 2),
+        "sleep_s_per_profile": round(sleep_seconds / processed, 2),
+        "sleep_fraction": round(sleep_seconds / elapsed, 3) if elapsed else 0.0,
+        "screen_wait_s_per_profile": round(wait_seconds / processed, 2),
+        "timing": timing,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profiles/hour scenario benchmark")
+    parser.add_argument("--profiles", type=int, default=5)
+    parser.add_argument("--gemini-median-ms", type=float, default=1500)
+    parser.add_argument("--gemini-sigma", type=float, default=0.4)
+    parser.add_argument("--screencap-median-ms", type=float, default=250)
+    parser.add_argument("--shell-median-ms", type=float, default=40)
+    parser.add_argument(
+        "--transition-ms",
+        type=float,
+        default=400,
+        help="How long the screen keeps changing after each UI action",
+    )
+    parser.add_argument(
+        "--sleep-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for the agent's pacing sleeps (0 measures pure overhead)",
+    )
+    parser.add_argument("--like-rate", type=float, default=0.3)
+    parser.add_argument(
+        "--fixed-sleeps",
+        action="store_true",
+        help="Sleep fixed delays after UI actions instead of waiting for a stable screen",
+    )
+    parser.add_argument("--output", help="Write the metrics as JSON to this path")
+    args = parser.parse_args()
+
+    print(f"🏁 Simulating {args.profiles} profiles...")
+    metrics = run_scenario(
+        profiles=args.profiles,
+        gemini_median_ms=args.gemini_median_ms,
+        gemini_sigma=args.gemini_sigma,
+        screencap_median_ms=args.screencap_median_ms,
+        shell_median_ms=args.shell_median_ms,
+        transition_ms=args.transition_ms,
+        sleep_scale=args.sleep_scale,
+        like_rate=args.like_rate,
+        config=AgentConfig(stable_screen_waits=not args.fixed_sleeps),
+    )
+
+    summary = {key: value for key, value in metrics.items() if key != "timing"}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(metrics, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# app/benchmarks/synthetic.py
+
+"""
+Synthetic inputs: screenshots with the UI templates from assets/ composited
+onto photo-like backgrounds, and generated comment/feedback histories.
+"""
+
+import json
+import os
+
+import cv2
+import numpy as np
+
+from frame import Frame
+from template_matcher import ASSETS_DIR
+
+# Device resolutions (width, height) screens are generated at
+RESOLUTIONS = ((1080, 1920), (1080, 2400), (1440, 3200))
+
+# Template centers as screen fractions
+TEMPLATE_POSITIONS = {
+    "like_button": (0.85, 0.62),
+    "send_button": (0.5, 0.86),
+    "comment_field": (0.5, 0.55),
+}
+
+STYLES = ("comedic", "flirty", "straightforward", "balanced")
+
+
+def _background(width: int, height: int, seed: int) -> np.ndarray:
+    """Photo-like header over a plain profile body"""
+    rng = np.random.default_rng(seed)
+    screen = np.full((height, width, 3), 245, dtype=np.uint8)
+    blocks = rng.integers(0, 255, (16, 9, 3), dtype=np.uint8)
+    screen[: height // 2] = cv2.resize(
+        blocks, (width, height // 2), interpolation=cv2.INTER_CUBIC
+    )
+    noise = rng.integers(-4, 5, screen.shape)
+    return np.clip(screen.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_screen(width: int, height: int, templates=None, seed: int = 0) -> Frame:
+    """Frame of the given resolution with the named templates pasted in"""
+    screen = _background(width, height, seed)
+    for name in templates or TEMPLATE_POSITIONS:
+        template = cv2.imread(os.path.join(ASSETS_DIR, f"{name}.png"))
+        t_height, t_width = template.shape[:2]
+        fx, fy = TEMPLATE_POSITIONS[name]
+        x = min(max(0, int(fx * width) - t_width // 2), width - t_width)
+        y = min(max(0, int(fy * height) - t_height // 2), height - t_height)
+        screen[y : y + t_height, x : x + t_width] = template
+
+    frame = Frame(f"synthetic_{width}x{height}", image=screen)
+    frame.png_bytes  # encode up front, like a device screencap
+    return frame
+
+
+def profile_texts(screens: int = 4, lines: int = 30, seed: int = 0) -> list:
+    """Overlapping per-screenshot text extractions of one profile"""
+    rng = np.random.default_rng(seed)
+    profile = [f"Line {i}: {'word ' * int(rng.integers(3, 12))}" for i in range(lines)]
+    step = lines // screens
+    return [
+        "\n".join(profile[max(0, i * step - 3) : (i + 1) * step + 3])
+        for i in range(screens)
+    ]
+
+
+def write_history(backend: str, records: int, directory: str, seed: int = 0):
+    """
+    Write `records` generated comments plus one feedback record each, as left
+    by earlier runs with the given data_store backend. Must run with
+    `directory` as the working directory (data_store paths are cwd-relative).
+    """
+    rng = np.random.default_rng(seed)
+    styles = rng.integers(0, len(STYLES), records)
+    matches = rng.random(records) < 0.2
+
+    feedback = [
+        {"comment_id": f"c{i}", "outcome": "match" if matches[i] else "no_match"}
+        for i in range(records)
+    ]
+    with open(os.path.join(directory, "feedback_records.json"), "w") as f:
+        json.dump(feedback, f)
+
+    # Both backends keep the comment log
+    with open(os.path.join(directory, "generated_comments.jsonl"), "w") as f:
+        for i in range(records):
+            f.write(
+                json.dumps(
+                    {
+                        "timestamp": "2025-01-01T00:00:00",
+                        "comment_id": f"c{i}",
+                        "profile_text": "profile",
+                        "generated_comment": "comment",
+                        "style_used": STYLES[styles[i]],
+                    }
+                )
+                + "\n"
+            )
+
+    if backend == "sqlite":
+        # Load the database through its own import of the log and feedback
+        # files, then close it so the benchmark opens it like a new run
+        import data_store
+
+        data_store.configure_data_store("sqlite")
+        data_store.calculate_template_success_rates()
+        data_store.close_database()
@@ -1,11 +1,102 @@
 # app/data_store.py
 
+import atexit
 import json
 import os
+import sqlite3
+import threading
+import time
 from datetime import datetime
 
-DATA_FILE = "generated_comments.json"
+from background_writer import get_background_writer
+
+DATA_FILE = "generated_comments.jsonl"
+LEGACY_DATA_FILE = "generated_comments.json"
 FEEDBACK_FILE = "feedback_records.json"
+DEFAULT_DB_FILE = "hinge_data.db"
+DB_FILE = DEFAULT_DB_FILE
+STATS_FILE = "style_stats.json"
+
+# "sqlite" (indexed tables, aggregate queries) or "jsonl" (append-only log)
+STORE_BACKEND = "sqlite"
+
+# Appends are flushed to the OS immediately but only fsynced every
+# FSYNC_EVERY records or FSYNC_INTERVAL_SECONDS, whichever comes first
+FSYNC_EVERY = 16
+FSYNC_INTERVAL_SECONDS = 5.0
+
+_comment_log = None
+_pending_sync = 0
+_last_sync = 0.0
+_lock = threading.Lock()
+_db = None
+_db_lock = threading.Lock()
+
+
+def configure_data_store(backend: str = "sqlite", db_file: str = None):
+    """
+    Select the storage backend for comments and feedback. The database path
+    is only changed when db_file is given.
+    """
+    global STORE_BACKEND, DB_FILE
+    if backend not in ("sqlite", "jsonl"):
+        raise ValueError(f"Unknown data store backend: {backend}")
+    get_background_writer().flush()
+    if db_file is None:
+        db_file = DB_FILE
+    if db_file != DB_FILE:
+        close_database()
+    STORE_BACKEND = backend
+    DB_FILE = db_file
+
+
+def _migrate_legacy_comments():
+    """
+    One-time conversion of the old JSON array file into the JSONL log. An
+    unreadable legacy file raises before the log exists, so the migration is
+    retried on the next start instead of the old history being dropped.
+    """
+    with open(LEGACY_DATA_FILE, "r") as f:
+        try:
+            records = json.load(f)
+        except ValueError as e:
+            raise ValueError(
+                f"Could not migrate {LEGACY_DATA_FILE}, repair or move it: {e}"
+            ) from e
+
+    tmp_path = DATA_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, DATA_FILE)
+    os.replace(LEGACY_DATA_FILE, LEGACY_DATA_FILE + ".migrated")
+    print(f"📦 Migrated {len(records)} comments to {DATA_FILE}")
+
+
+def _open_comment_log():
+    global _comment_log, _last_sync
+    if _comment_log is None:
+        if not os.path.exists(DATA_FILE) and os.path.exists(LEGACY_DATA_FILE):
+            _migrate_legacy_comments()
+
+        _comment_log = open(DATA_FILE, "a+b")
+        # Terminate a line left partial by a crash so the next record stays intact
+        if _comment_log.tell() > 0:
+            _comment_log.seek(-1, os.SEEK_END)
+            if _comment_log.read(1) != b"\n":
+                _comment_log.write(b"\n")
+        _last_sync = time.monotonic()
+    return _comment_log
+
+
+def _sync_comment_log():
+    global _pending_sync, _last_sync
+    _comment_log.flush()
+    os.fsync(_comment_log.fileno())
+    _pending_sync = 0
+    _last_sync = time.monotonic()
 
 
 def store_generated_comment(comment_id, profile_text, generated_comment, style_used):
@@ -20,59 +111,393 @@ def store_generated_comment(comment_id, profile_text, generated_comment, style_u
         "style_used": style_used,
     }
 
+    # Written on the background writer thread, off the workflow's critical path.
+    # The JSONL log always gets the record too, so switching back from SQLite
+    # loses nothing. It is appended after the insert, so the SQLite import of
+    # the log finds the row and skips it.
+    if STORE_BACKEND == "sqlite":
+        get_background_writer().submit(_insert_comment, record)
+    get_background_writer().submit(_append_comment, record)
+
+
+def _append_comment(record: dict):
+    global _pending_sync
+    line = (json.dumps(record) + "\n").encode("utf-8")
+    with _lock:
+        log = _open_comment_log()
+        log.write(line)
+        log.flush()
+        _pending_sync += 1
+        if (
+            _pending_sync >= FSYNC_EVERY
+            or time.monotonic() - _last_sync >= FSYNC_INTERVAL_SECONDS
+        ):
+            _sync_comment_log()
+
+
+def flush_comment_store():
+    """Write queued comment records and force them to disk"""
+    get_background_writer().flush()
+    with _lock:
+        if _comment_log is not None and _pending_sync:
+            _sync_comment_log()
+
+
+def close_comment_store():
+    """Flush and close the comment log (it is reopened on the next write)"""
+    global _comment_log
+    get_background_writer().flush()
+    with _lock:
+        if _comment_log is not None:
+            if _pending_sync:
+                _sync_comment_log()
+            _comment_log.close()
+            _comment_log = None
+
+
+atexit.register(close_comment_store)
+
+
+# SQLite backend
+def _get_database() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(DB_FILE, check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("PRAGMA synchronous=NORMAL")
+        _db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS comments (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                comment_id TEXT NOT NULL,
+                profile_text TEXT,
+                generated_comment TEXT,
+                style_used TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_comments_comment_id ON comments (comment_id);
+            CREATE INDEX IF NOT EXISTS idx_comments_style_used ON comments (style_used);
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY,
+                comment_id TEXT NOT NULL,
+                outcome TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_feedback_comment_id ON feedback (comment_id);
+            CREATE TABLE IF NOT EXISTS style_stats (
+                style_used TEXT PRIMARY KEY,
+                matches INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        _import_comment_files(_db)
+        _build_style_stats(_db)
+    return _db
+
+
+def _get_meta(db: sqlite3.Connection, key: str, default=None):
+    row = db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(db: sqlite3.Connection, key: str, value):
+    db.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+    )
+
+
+def _import_comment_files(db: sqlite3.Connection):
+    """
+    Import comments appended to the JSON/JSONL log since the last import,
+    tracked by byte offset. Comments already in the table are skipped, so a
+    replaced log is simply rescanned.
+    """
+    if not os.path.exists(DATA_FILE) and os.path.exists(LEGACY_DATA_FILE):
+        with _lock:
+            _open_comment_log()
+    if not os.path.exists(DATA_FILE):
+        return
+
+    offset = int(_get_meta(db, "comments_log_offset", 0))
+    size = os.path.getsize(DATA_FILE)
+    if size == offset:
+        return
+    if size < offset:
+        offset = 0
+
+    with open(DATA_FILE, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # A partial last line is left for the next import
+    end = data.rfind(b"\n") + 1
+
+    # Before the first stats build the counters are computed from all rows
+    count_outcomes = bool(_get_meta(db, "style_stats_built"))
+    imported = 0
+    with db:
+        for line in data[:end].splitlines():
+            try:
+                c = json.loads(line)
+            except ValueError:
+                continue
+            exists = db.execute(
+                "SELECT 1 FROM comments WHERE comment_id = ? LIMIT 1",
+                (c["comment_id"],),
+            ).fetchone()
+            if exists:
+                continue
+            record = {
+                "timestamp": c.get("timestamp"),
+                "comment_id": c["comment_id"],
+                "profile_text": c.get("profile_text"),
+                "generated_comment": c.get("generated_comment"),
+                "style_used": c.get("style_used"),
+            }
+            _add_comment(db, record, count_outcomes)
+            imported += 1
+        _set_meta(db, "comments_log_offset", offset + end)
+    if imported:
+        print(f"📦 Imported {imported} comments into {DB_FILE}")
+
+
+def _build_style_stats(db: sqlite3.Connection):
+    """One-time build of the per-style counters from existing rows"""
+    if _get_meta(db, "style_stats_built"):
+        return
+
+    with db:
+        db.execute("DELETE FROM style_stats")
+        db.execute(
+            """
+            INSERT INTO style_stats (style_used, matches, total)
+            SELECT c.style_used, SUM(f.outcome = 'match'), COUNT(*)
+            FROM feedback f
+            JOIN comments c ON c.comment_id = f.comment_id
+            WHERE c.style_used IS NOT NULL AND c.style_used != ''
+            GROUP BY c.style_used
+            """
+        )
+        _set_meta(db, "style_stats_built", 1)
+
+
+def _count_outcomes(db: sqlite3.Connection, style: str, matches: int, total: int):
+    if not style or not total:
+        return
+    db.execute(
+        """
+        INSERT INTO style_stats (style_used, matches, total) VALUES (?, ?, ?)
+        ON CONFLICT (style_used) DO UPDATE SET
+            matches = matches + excluded.matches,
+            total = total + excluded.total
+        """,
+        (style, matches, total),
+    )
+
+
+def _ingest_feedback(db: sqlite3.Connection, feedback_rows: list):
+    """Insert (comment_id, outcome) rows and update the per-style counters"""
+    db.executemany(
+        "INSERT INTO feedback (comment_id, outcome) VALUES (?, ?)", feedback_rows
+    )
+    for comment_id, outcome in feedback_rows:
+        row = db.execute(
+            "SELECT style_used FROM comments WHERE comment_id = ? LIMIT 1",
+            (comment_id,),
+        ).fetchone()
+        if row:
+            _count_outcomes(db, row[0], int(outcome == "match"), 1)
+
+
+def _import_feedback_file(db: sqlite3.Connection):
+    """Import feedback records appended to feedback_records.json since the last import"""
+    if not os.path.exists(FEEDBACK_FILE):
+        return
+
+    mtime = os.path.getmtime(FEEDBACK_FILE)
+    if _get_meta(db, "feedback_file_mtime") == str(mtime):
+        return
+
+    with open(FEEDBACK_FILE, "r") as f:
+        feedback_data = json.load(f)
+
+    imported = int(_get_meta(db, "feedback_file_records", 0))
+    with db:
+        _ingest_feedback(
+            db, [(fb["comment_id"], fb["outcome"]) for fb in feedback_data[imported:]]
+        )
+        _set_meta(db, "feedback_file_records", max(imported, len(feedback_data)))
+        _set_meta(db, "feedback_file_mtime", mtime)
+
+
+def _add_comment(db: sqlite3.Connection, record: dict, count_outcomes: bool = True):
+    db.execute(
+        "INSERT INTO comments (timestamp, comment_id, profile_text, generated_comment, style_used) "
+        "VALUES (:timestamp, :comment_id, :profile_text, :generated_comment, :style_used)",
+        record,
+    )
+    if count_outcomes:
+        # Feedback can arrive before its comment is stored
+        matches, total = db.execute(
+            "SELECT SUM(outcome = 'match'), COUNT(*) FROM feedback WHERE comment_id = ?",
+            (record["comment_id"],),
+        ).fetchone()
+        _count_outcomes(db, record["style_used"], matches or 0, total)
+
+
+def _insert_comment(record: dict):
+    with _db_lock:
+        db = _get_database()
+        with db:
+            _add_comment(db, record)
+
+
+def store_feedback(comment_id, outcome):
+    """
+    Record the outcome ("match", ...) of a sent comment.
+    """
+    get_background_writer().flush()
+    with _db_lock:
+        db = _get_database()
+        with db:
+            _ingest_feedback(db, [(comment_id, outcome)])
+
+
+def close_database():
+    global _db
+    get_background_writer().flush()
+    with _db_lock:
+        if _db is not None:
+            _db.close()
+            _db = None
+
+
+atexit.register(close_database)
+
+
+def _calculate_success_rates_sqlite():
+    with _db_lock:
+        db = _get_database()
+        _import_comment_files(db)
+        _import_feedback_file(db)
+        rows = db.execute(
+            "SELECT style_used, matches, total FROM style_stats WHERE total > 0"
+        ).fetchall()
+
+    if not rows:
+        print("No data to calculate success rates.")
+        return {}
+
+    return {style: matches / total for style, matches, total in rows}
+
+
+def load_generated_comments():
+    """
+    Yield stored comment records in write order, skipping any line left
+    incomplete by an interrupted write.
+    """
+    flush_comment_store()
+    if not os.path.exists(DATA_FILE) and os.path.exists(LEGACY_DATA_FILE):
+        with _lock:
+            _open_comment_log()
     if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w") as f:
-            json.dump([], f)
+        return
 
-    with open(DATA_FILE, "r+") as f:
-        data = json.load(f)
-        data.append(record)
-        f.seek(0)
-        json.dump(data, f, indent=2)
+    with open(DATA_FILE, "r") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
 
 
 def calculate_template_success_rates():
     """
-    Merge data from generated_comments.json and feedback_records.json
+    Merge data from the generated comments and feedback records
     to see which style is leading to the most matches.
     """
-    if not (os.path.exists(DATA_FILE) and os.path.exists(FEEDBACK_FILE)):
+    get_background_writer().flush()
+    if STORE_BACKEND == "sqlite":
+        return _calculate_success_rates_sqlite()
+
+    has_comments = os.path.exists(DATA_FILE) or os.path.exists(LEGACY_DATA_FILE)
+    if not (has_comments and os.path.exists(FEEDBACK_FILE)):
         print("No data to calculate success rates.")
         return {}
 
-    with open(DATA_FILE, "r") as f:
-        comments_data = json.load(f)
+    stats = _update_style_stats_file()
+
+    # Convert to success rates
+    success_rates = {}
+    for style, counts in stats["styles"].items():
+        if counts["total"] > 0:
+            success_rates[style] = counts["matches"] / counts["total"]
+        else:
+            success_rates[style] = 0.0
+
+    return success_rates
+
+
+def _load_style_stats_file() -> dict:
+    try:
+        with open(STATS_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"styles": {}, "feedback_records": 0, "pending": []}
+
+
+def _update_style_stats_file() -> dict:
+    """
+    Fold feedback records added since the last call into the persisted
+    per-style counters (JSONL backend). The comment log is only scanned
+    when there is new or still-unmatched feedback.
+    """
+    stats = _load_style_stats_file()
+    mtime = os.path.getmtime(FEEDBACK_FILE)
+    flush_comment_store()
+    log_size = os.path.getsize(DATA_FILE) if os.path.exists(DATA_FILE) else 0
+    retry_pending = stats.get("pending") and stats.get("comments_log_size") != log_size
+    if stats.get("feedback_mtime") == mtime and not retry_pending:
+        return stats
+
     with open(FEEDBACK_FILE, "r") as f:
         feedback_data = json.load(f)
 
-    # comment_id -> style
+    # Feedback whose comment was not stored yet is kept pending and retried
+    new_feedback = stats.get("pending", []) + [
+        [fb["comment_id"], fb["outcome"]]
+        for fb in feedback_data[stats["feedback_records"] :]
+    ]
+
+    wanted = {cid for cid, _ in new_feedback}
     comment_style_map = {}
-    for c in comments_data:
-        cid = c["comment_id"]
-        style = c["style_used"]
-        comment_style_map[cid] = style
+    if wanted:
+        for c in load_generated_comments():
+            if c["comment_id"] in wanted:
+                comment_style_map[c["comment_id"]] = c["style_used"]
 
     # Tally outcomes: style -> {matches, total}
-    results = {}
-    for fb in feedback_data:
-        cid = fb["comment_id"]
-        outcome = fb["outcome"]
-        style = comment_style_map.get(cid)
+    pending = []
+    for cid, outcome in new_feedback:
+        if cid not in comment_style_map:
+            pending.append([cid, outcome])
+            continue
+        style = comment_style_map[cid]
         if not style:
             continue
 
-        if style not in results:
-            results[style] = {"matches": 0, "total": 0}
-        results[style]["total"] += 1
+        counts = stats["styles"].setdefault(style, {"matches": 0, "total": 0})
+        counts["total"] += 1
         if outcome == "match":
-            results[style]["matches"] += 1
+            counts["matches"] += 1
 
-    # Convert to success rates
-    success_rates = {}
-    for style, counts in results.items():
-        if counts["total"] > 0:
-            success_rates[style] = counts["matches"] / counts["total"]
-        else:
-            success_rates[style] = 0.0
+    stats["feedback_records"] = max(stats["feedback_records"], len(feedback_data))
+    stats["feedback_mtime"] = mtime
+    stats["comments_log_size"] = log_size
+    stats["pending"] = pending
 
-    return success_rates
+    tmp_path = STATS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stats, f)
+    os.replace(tmp_path, STATS_FILE)
+    return stats
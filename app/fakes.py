@@ -0,0 +1,79 @@
+# app/fakes.py
+
+"""
+Device and Gemini client stand-ins shared by the test scripts and benchmarks.
+"""
+
+import json
+import threading
+
+import cv2
+import numpy as np
+
+
+class FakeDevice:
+    """
+    Small-screen phone stand-in: every input command shows the next of a few
+    random screens, and `wm size` reports the screen size.
+    """
+
+    serial = "fake"
+
+    def __init__(
+        self, seed: int = 0, screens: int = 4, width: int = 108, height: int = 240
+    ):
+        self.width = width
+        self.height = height
+        rng = np.random.default_rng(seed)
+        images = rng.integers(0, 255, (screens, height, width, 3), dtype=np.uint8)
+        self.screens = [cv2.imencode(".png", image)[1].tobytes() for image in images]
+        self.current = 0
+        self.launches = 0
+
+    def shell(self, command):
+        if command == "wm size":
+            return f"Physical size: {self.width}x{self.height}"
+        if command.startswith("monkey"):
+            self.launches += 1
+        if command.startswith("input"):
+            self.current = (self.current + 1) % len(self.screens)
+        return ""
+
+    def screencap(self):
+        return self.screens[self.current]
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModels:
+    """
+    generate_content() stand-in that counts calls. `respond` is the response
+    text, or a callable taking (contents, config) and returning it.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            self.calls += 1
+        if callable(self.respond):
+            return StubResponse(self.respond(contents, config))
+        return StubResponse(self.respond)
+
+
+class StubGeminiClient:
+    """genai.Client stand-in returning canned responses"""
+
+    def __init__(self, respond="{}"):
+        self.models = StubModels(respond)
+
+
+def profile_response(analysis: dict, user_content: str = "Name: Sam") -> str:
+    """Response text of a profile analysis request"""
+    return json.dumps({"user_content": user_content, "analysis": analysis})
@@ -0,0 +1,243 @@
+# app/frame.py
+
+"""
+In-memory screenshot frames shared between capture, CV detection and Gemini calls.
+A Frame holds the encoded screenshot bytes and decodes them at most once.
+"""
+
+import hashlib
+import os
+import time
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+
+from background_writer import BackgroundWriter, get_background_writer
+
+
+class Frame:
+    """A captured screen with lazily decoded pixel data"""
+
+    __slots__ = (
+        "name",
+        "timestamp",
+        "path",
+        "_png_bytes",
+        "_image",
+        "_gray",
+        "_content_hash",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        png_bytes: Optional[bytes] = None,
+        image: Optional[np.ndarray] = None,
+        timestamp: Optional[int] = None,
+        path: Optional[str] = None,
+    ):
+        self.name = name
+        self.timestamp = timestamp or int(time.time() * 1000)
+        self.path = path
+        self._png_bytes = png_bytes
+        self._image = image
+        self._gray = None
+        self._content_hash = None
+
+    @classmethod
+    def from_file(cls, path: str) -> "Frame":
+        """Load a frame from a screenshot on disk (missing files give an empty frame)"""
+        png_bytes = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                png_bytes = f.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        return cls(name, png_bytes=png_bytes, path=path)
+
+    @property
+    def png_bytes(self) -> Optional[bytes]:
+        """PNG-encoded screenshot bytes"""
+        if self._png_bytes is None and self._image is not None:
+            ok, buffer = cv2.imencode(".png", self._image)
+            if ok:
+                self._png_bytes = buffer.tobytes()
+        return self._png_bytes
+
+    @property
+    def image(self) -> Optional[np.ndarray]:
+        """BGR pixel array, decoded on first access"""
+        if self._image is None and self._png_bytes:
+            self._image = cv2.imdecode(
+                np.frombuffer(self._png_bytes, np.uint8), cv2.IMREAD_COLOR
+            )
+        return self._image
+
+    @property
+    def gray(self) -> Optional[np.ndarray]:
+        """Grayscale pixel array, converted on first access"""
+        if self._gray is None and self.image is not None:
+            self._gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def content_hash(self) -> str:
+        """Exact content digest (of the encoded bytes, or the pixels for raw frames)"""
+        if self._content_hash is None:
+            data = self._png_bytes
+            if data is None:
+                data = self.image.tobytes() if self.image is not None else b""
+            self._content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return self._content_hash
+
+    def encode(
+        self,
+        fmt: str = "jpeg",
+        max_edge: Optional[int] = None,
+        quality: int = 85,
+        crop: Optional[tuple] = None,
+    ) -> Optional[bytes]:
+        """
+        Encode the frame for upload, optionally cropped to a region given as
+        screen fractions (x1, y1, x2, y2) and downscaled so its longest edge
+        is at most max_edge pixels. Returns None if the frame has no pixels.
+        """
+        if fmt == "png" and not max_edge and not crop:
+            return self.png_bytes
+
+        image = self.image
+        if image is None:
+            return None
+
+        if crop:
+            height, width = image.shape[:2]
+            x1, y1, x2, y2 = crop
+            image = image[
+                int(y1 * height) : int(y2 * height), int(x1 * width) : int(x2 * width)
+            ]
+
+        if max_edge and max(image.shape[:2]) > max_edge:
+            scale = max_edge / max(image.shape[:2])
+            image = cv2.resize(
+                image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+            )
+
+        if fmt == "png":
+            ok, buffer = cv2.imencode(".png", image)
+        elif fmt == "webp":
+            ok, buffer = cv2.imencode(
+                ".webp", image, [cv2.IMWRITE_WEBP_QUALITY, quality]
+            )
+        else:
+            ok, buffer = cv2.imencode(
+                ".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality]
+            )
+        return buffer.tobytes() if ok else None
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1] if self.image is not None else 0
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0] if self.image is not None else 0
+
+    @property
+    def filename(self) -> str:
+        """Timestamped filename used when the frame is persisted"""
+        return f"{self.timestamp}_{self.name}.png"
+
+    def __str__(self) -> str:
+        return self.path or self.filename
+
+    def __repr__(self) -> str:
+        return f"Frame({self.name!r}, timestamp={self.timestamp})"
+
+
+# screencap pixel formats (android.graphics.PixelFormat) -> (bytes per pixel, BGR conversion)
+RAW_PIXEL_FORMATS = {
+    1: (4, cv2.COLOR_RGBA2BGR),  # RGBA_8888
+    2: (4, cv2.COLOR_RGBA2BGR),  # RGBX_8888
+    3: (3, cv2.COLOR_RGB2BGR),  # RGB_888
+    5: (4, cv2.COLOR_BGRA2BGR),  # BGRA_8888
+}
+
+
+def decode_raw_framebuffer(data: bytes) -> np.ndarray:
+    """
+    Decode the output of `screencap` (without -p) into a BGR pixel array.
+
+    The dump starts with a little-endian header of width, height and pixel
+    format, followed on newer Android versions by a fourth dataspace word.
+    The header size is inferred from the payload length.
+    """
+    if len(data) < 12:
+        raise ValueError(f"Raw framebuffer too short: {len(data)} bytes")
+
+    width, height, pixel_format = np.frombuffer(data, dtype="<u4", count=3)
+    if pixel_format not in RAW_PIXEL_FORMATS:
+        raise ValueError(f"Unsupported framebuffer pixel format: {pixel_format}")
+
+    bytes_per_pixel, conversion = RAW_PIXEL_FORMATS[int(pixel_format)]
+    pixel_bytes = int(width) * int(height) * bytes_per_pixel
+    header_size = len(data) - pixel_bytes
+    if header_size not in (12, 16):
+        raise ValueError(
+            f"Unexpected framebuffer size {len(data)} for {width}x{height} format {pixel_format}"
+        )
+
+    pixels = np.frombuffer(data, dtype=np.uint8, count=pixel_bytes, offset=header_size)
+    pixels = pixels.reshape(int(height), int(width), bytes_per_pixel)
+    return cv2.cvtColor(pixels, conversion)
+
+
+def as_frame(screenshot: Union[Frame, str]) -> Frame:
+    """Accept either a Frame or a screenshot path"""
+    if isinstance(screenshot, Frame):
+        return screenshot
+    return Frame.from_file(screenshot)
+
+
+class ScreenshotSink:
+    """Optional asynchronous disk persistence for captured frames"""
+
+    def __init__(
+        self,
+        directory: str = "images",
+        enabled: bool = True,
+        writer: BackgroundWriter = None,
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self._writer = writer
+
+    def configure(self, directory: str = None, enabled: bool = None):
+        if directory is not None:
+            self.directory = directory
+        if enabled is not None:
+            self.enabled = enabled
+
+    def submit(self, frame: Frame) -> Optional[str]:
+        """Queue a frame for writing and return the path it will be written to"""
+        if not self.enabled:
+            return None
+
+        frame.path = os.path.join(self.directory, frame.filename)
+        self.writer.submit(self._write, frame)
+        return frame.path
+
+    @property
+    def writer(self) -> BackgroundWriter:
+        return self._writer or get_background_writer()
+
+    def _write(self, frame: Frame):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(frame.path, "wb") as fp:
+                fp.write(frame.png_bytes)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not save screenshot {frame.path}: {e}")
+
+    def flush(self):
+        """Block until all queued frames are written"""
+        self.writer.flush()
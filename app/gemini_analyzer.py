@@ -1,42 +1,156 @@
 # app/gemini_analyzer.py
 
-import os
-from google import genai
 from google.genai import types
 import json
 
+from frame import as_frame
+from gemini_cache import get_gemini_cache
+from gemini_client import get_gemini_client
+from instrumentation import span
 
-def extract_text_from_image_gemini(image_path: str, gemini_api_key: str = None) -> str:
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Longest edge of each frame sent in a multi-image profile request
+MULTI_IMAGE_MAX_EDGE = 1024
+
+# Image preparation for vision requests (see configure_image_preparation)
+IMAGE_FORMAT = "jpeg"
+IMAGE_MAX_EDGE = 1280
+IMAGE_QUALITY = 80
+IMAGE_CROP_REGIONS = {}  # request name -> (x1, y1, x2, y2) screen fractions
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+
+def configure_image_preparation(
+    fmt: str = "jpeg",
+    max_edge: int = 1280,
+    quality: int = 80,
+    crop_regions: dict = None,
+):
     """
-    Uses Google's Gemini API to extract and analyze text from dating profile images.
+    Set how screenshots are prepared before upload.
 
     Args:
-        image_path: Path to the screenshot image
-        gemini_api_key: Google GenAI API key (optional, will use env var if not provided)
+        fmt: "jpeg", "webp" or "png" (lossless)
+        max_edge: Longest edge in pixels after downscaling (None keeps full size)
+        quality: JPEG/WebP quality (1-100)
+        crop_regions: Optional crop per request name, as screen fractions
+    """
+    global IMAGE_FORMAT, IMAGE_MAX_EDGE, IMAGE_QUALITY, IMAGE_CROP_REGIONS
+    if fmt not in MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    IMAGE_FORMAT = fmt
+    IMAGE_MAX_EDGE = max_edge
+    IMAGE_QUALITY = quality
+    IMAGE_CROP_REGIONS = dict(crop_regions or {})
 
-    Returns:
-        Extracted text from the image
+
+def _preparation_key(function_name: str, max_edge: int = None) -> str:
+    """Image preparation settings for a request, as part of its cache key"""
+    crop = IMAGE_CROP_REGIONS.get(function_name)
+    return f"{IMAGE_FORMAT}:{max_edge or IMAGE_MAX_EDGE}:{IMAGE_QUALITY}:{crop}"
+
+
+def prepare_image_part(
+    image, function_name: str = "", max_edge: int = None
+) -> types.Part:
+    """
+    Build a Gemini image part from a Frame or screenshot path: cropped to the
+    request's configured region, downscaled and encoded per the current settings.
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
+    frame = as_frame(image)
+    data = frame.encode(
+        IMAGE_FORMAT,
+        max_edge=max_edge or IMAGE_MAX_EDGE,
+        quality=IMAGE_QUALITY,
+        crop=IMAGE_CROP_REGIONS.get(function_name),
+    )
+    return types.Part.from_bytes(data=data, mime_type=MIME_TYPES[IMAGE_FORMAT])
+
+
+def generate_gemini_content(
+    function_name: str,
+    prompt: str,
+    images: list = (),
+    json_response: bool = False,
+    client=None,
+    max_edge: int = None,
+    cacheable: bool = True,
+    response_schema: types.Schema = None,
+) -> str:
+    """
+    Run a Gemini request through the response cache.
 
-    if not gemini_api_key:
-        raise ValueError("GEMINI_API_KEY environment variable not set")
+    Args:
+        function_name: Name of the calling analysis, part of the cache key
+        prompt: Text prompt
+        images: Frames or screenshot paths attached after the prompt
+        json_response: Request an application/json response
+        client: Gemini client (defaults to the shared client)
+        max_edge: Longest image edge, overriding the configured default
+        cacheable: False for generation prompts, which should give a fresh
+            response every time rather than repeat a cached one
+        response_schema: Schema the JSON response must follow (implies json_response)
 
-    try:
-        # Initialize the client
-        client = genai.Client(api_key=gemini_api_key)
+    Returns:
+        Response text ("" if the model returned nothing)
+    """
+    frames = [as_frame(image) for image in images]
+    cache = get_gemini_cache()
+    key = None
+    if cache.enabled and cacheable:
+        key = cache.make_key(
+            f"{function_name}:{_preparation_key(function_name, max_edge)}",
+            GEMINI_MODEL,
+            prompt,
+            frames,
+        )
+        cached_text = cache.get(key)
+        if cached_text is not None:
+            return cached_text
 
-        # Load and prepare the image
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
+    if client is None:
+        client = get_gemini_client()
 
-        # Create the image part
-        image_part = types.Part.from_bytes(
-            data=image_bytes,
-            mime_type="image/png",  # Assuming screenshots are PNG
+    contents = [prompt] + [
+        prepare_image_part(frame, function_name, max_edge) for frame in frames
+    ]
+    config = None
+    if json_response or response_schema is not None:
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json", response_schema=response_schema
+        )
+
+    with span("gemini", function_name):
+        response = client.models.generate_content(
+            model=GEMINI_MODEL, contents=contents, config=config
         )
 
+    text = response.text or ""
+    if key is not None:
+        cache.put(key, text)
+    return text
+
+
+def extract_text_from_image_gemini(
+    image, gemini_api_key: str = None, client=None
+) -> str:
+    """
+    Uses Google's Gemini API to extract and analyze text from dating profile images.
+
+    Args:
+        image: Frame or path to the screenshot image
+        gemini_api_key: Google GenAI API key (optional, will use env var if not provided)
+        client: Gemini client (defaults to the shared client for the key)
+
+    Returns:
+        Extracted text from the image
+    """
+    client = client or get_gemini_client(gemini_api_key)
+
+    try:
         # Prompt specifically for dating profile text extraction
         prompt = """
         Extract all visible text from this dating profile screenshot. 
@@ -51,37 +165,34 @@ def extract_text_from_image_gemini(image_path: str, gemini_api_key: str = None)
         """
 
         # Generate content
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part]
+        text = generate_gemini_content(
+            "extract_text_from_image_gemini", prompt, [image], client=client
         )
 
-        return response.text.strip() if response.text else ""
+        return text.strip()
 
     except Exception as e:
         print(f"Error extracting text with Gemini API: {e}")
         return ""
 
 
-def generate_comment_gemini(profile_text: str, gemini_api_key: str = None) -> str:
+def generate_comment_gemini(
+    profile_text: str, gemini_api_key: str = None, client=None
+) -> str:
     """
     Generate a flirty, witty dating app comment focused on getting a date.
 
     Args:
         profile_text: The extracted text from the dating profile
         gemini_api_key: Google GenAI API key (optional, will use env var if not provided)
+        client: Gemini client (defaults to the shared client for the key)
 
     Returns:
         Generated comment string
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-    if not gemini_api_key:
-        raise ValueError("GEMINI_API_KEY environment variable not set")
+    client = client or get_gemini_client(gemini_api_key)
 
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
         prompt = f"""
         Based on this dating profile, generate a FLIRTY, WITTY comment that's designed to get a date.
 
@@ -116,11 +227,11 @@ def generate_comment_gemini(profile_text: str, gemini_api_key: str = None) -> st
         Generate ONE flirty, witty comment that will get them excited to meet up:
         """
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt]
+        text = generate_gemini_content(
+            "generate_comment_gemini", prompt, client=client, cacheable=False
         )
 
-        comment = response.text.strip() if response.text else ""
+        comment = text.strip()
 
         # Clean up the comment (remove quotes if present)
         comment = comment.strip("\"'")
@@ -190,16 +301,13 @@ def _generate_fallback_flirty_comment(profile_text: str) -> str:
 
 
 def generate_contextual_date_comment(
-    profile_analysis: dict, profile_text: str, gemini_api_key: str = None
+    profile_analysis: dict, profile_text: str, gemini_api_key: str = None, client=None
 ) -> str:
     """
     Generate highly contextual, flirty comments based on detailed profile analysis
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
     try:
-        client = genai.Client(api_key=gemini_api_key)
+        client = client or get_gemini_client(gemini_api_key)
 
         interests = profile_analysis.get("interests", [])
         personality_traits = profile_analysis.get("personality_traits", [])
@@ -241,43 +349,34 @@ def generate_contextual_date_comment(
         Generate ONE comment that's impossible to ignore:
         """
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt]
+        text = generate_gemini_content(
+            "generate_contextual_date_comment", prompt, client=client, cacheable=False
         )
 
-        comment = response.text.strip().strip("\"'") if response.text else ""
+        comment = text.strip().strip("\"'")
 
         if not comment or len(comment) < 15:
-            return generate_comment_gemini(profile_text, gemini_api_key)
+            return generate_comment_gemini(profile_text, gemini_api_key, client)
 
         return comment
 
     except Exception as e:
         print(f"Error generating contextual comment: {e}")
-        return generate_comment_gemini(profile_text, gemini_api_key)
+        return generate_comment_gemini(profile_text, gemini_api_key, client)
 
 
-def analyze_dating_ui_with_gemini(image_path: str, gemini_api_key: str = None) -> dict:
+def analyze_dating_ui_with_gemini(
+    image, gemini_api_key: str = None, client=None
+) -> dict:
     """
     Use Gemini to analyze the dating app UI and determine what actions are available.
 
     Returns:
         Dictionary with UI analysis including like button location, profile content, etc.
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-    if not gemini_api_key:
-        raise ValueError("GEMINI_API_KEY environment variable not set")
+    client = client or get_gemini_client(gemini_api_key)
 
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
-
         prompt = """
         Analyze this dating app screenshot and provide a comprehensive UI analysis in JSON format:
         
@@ -305,13 +404,15 @@ def analyze_dating_ui_with_gemini(image_path: str, gemini_api_key: str = None) -
         Be honest in your assessment.
         """
 
-        config = types.GenerateContentConfig(response_mime_type="application/json")
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+        text = generate_gemini_content(
+            "analyze_dating_ui_with_gemini",
+            prompt,
+            [image],
+            json_response=True,
+            client=client,
         )
 
-        return json.loads(response.text) if response.text else {}
+        return json.loads(text) if text else {}
 
     except Exception as e:
         print(f"Error analyzing UI with Gemini API: {e}")
@@ -324,29 +425,22 @@ def analyze_dating_ui_with_gemini(image_path: str, gemini_api_key: str = None) -
 
 
 def find_ui_elements_with_gemini(
-    image_path: str, element_type: str = "like_button", gemini_api_key: str = None
+    image, element_type: str = "like_button", gemini_api_key: str = None, client=None
 ) -> dict:
     """
     Use Gemini to find UI elements and their approximate locations.
 
     Args:
-        image_path: Path to screenshot
+        image: Frame or path to screenshot
         element_type: Type of element to find ("like_button", "dislike_button", etc.)
         gemini_api_key: API key
+        client: Gemini client (defaults to the shared client for the key)
 
     Returns:
         Dictionary with element location info
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
+        client = client or get_gemini_client(gemini_api_key)
 
         prompt = f"""
         Analyze this dating app screenshot and find the {element_type}.
@@ -371,36 +465,32 @@ def find_ui_elements_with_gemini(
         Express coordinates as percentages where 0.0 = left/top edge, 1.0 = right/bottom edge.
         """
 
-        config = types.GenerateContentConfig(response_mime_type="application/json")
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+        text = generate_gemini_content(
+            "find_ui_elements_with_gemini",
+            prompt,
+            [image],
+            json_response=True,
+            client=client,
         )
 
-        return json.loads(response.text) if response.text else {"element_found": False}
+        return json.loads(text) if text else {"element_found": False}
 
     except Exception as e:
         print(f"Error finding UI elements with Gemini: {e}")
         return {"element_found": False}
 
 
-def analyze_profile_scroll_content(image_path: str, gemini_api_key: str = None) -> dict:
+def analyze_profile_scroll_content(
+    image, gemini_api_key: str = None, client=None
+) -> dict:
     """
     Analyze if there's more content to scroll through on a profile.
 
     Returns:
         Dictionary with scroll analysis
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
+        client = client or get_gemini_client(gemini_api_key)
 
         prompt = """
         Analyze this dating profile screenshot to determine scrolling needs:
@@ -432,15 +522,15 @@ def analyze_profile_scroll_content(image_path: str, gemini_api_key: str = None)
         The scroll area should be in the center of the profile content, avoiding buttons at bottom.
         """
 
-        config = types.GenerateContentConfig(response_mime_type="application/json")
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+        text = generate_gemini_content(
+            "analyze_profile_scroll_content",
+            prompt,
+            [image],
+            json_response=True,
+            client=client,
         )
 
-        return (
-            json.loads(response.text) if response.text else {"has_more_content": False}
-        )
+        return json.loads(text) if text else {"has_more_content": False}
 
     except Exception as e:
         print(f"Error analyzing scroll content: {e}")
@@ -448,21 +538,13 @@ def analyze_profile_scroll_content(image_path: str, gemini_api_key: str = None)
 
 
 def get_profile_navigation_strategy(
-    image_path: str, gemini_api_key: str = None
+    image, gemini_api_key: str = None, client=None
 ) -> dict:
     """
     Determine the best navigation strategy to avoid getting stuck.
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
+        client = client or get_gemini_client(gemini_api_key)
 
         prompt = """
         Analyze this dating app screen to determine navigation strategy:
@@ -488,37 +570,27 @@ def get_profile_navigation_strategy(
         For getting unstuck, recommend larger swipe distances and different directions.
         """
 
-        config = types.GenerateContentConfig(response_mime_type="application/json")
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+        text = generate_gemini_content(
+            "get_profile_navigation_strategy",
+            prompt,
+            [image],
+            json_response=True,
+            client=client,
         )
 
-        return (
-            json.loads(response.text)
-            if response.text
-            else {"navigation_action": "swipe_left"}
-        )
+        return json.loads(text) if text else {"navigation_action": "swipe_left"}
 
     except Exception as e:
         print(f"Error getting navigation strategy: {e}")
         return {"navigation_action": "swipe_left", "reason": "fallback"}
 
 
-def detect_comment_ui_elements(image_path: str, gemini_api_key: str = None) -> dict:
+def detect_comment_ui_elements(image, gemini_api_key: str = None, client=None) -> dict:
     """
     Detect comment interface elements like text field and send button.
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
+        client = client or get_gemini_client(gemini_api_key)
 
         prompt = """
         Analyze this dating app comment interface screenshot and find UI elements:
@@ -548,13 +620,15 @@ def detect_comment_ui_elements(image_path: str, gemini_api_key: str = None) -> d
         Express coordinates as percentages (0.0 = left/top, 1.0 = right/bottom).
         """
 
-        config = types.GenerateContentConfig(response_mime_type="application/json")
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+        text = generate_gemini_content(
+            "detect_comment_ui_elements",
+            prompt,
+            [image],
+            json_response=True,
+            client=client,
         )
 
-        return json.loads(response.text) if response.text else {}
+        return json.loads(text) if text else {}
 
     except Exception as e:
         print(f"Error detecting comment UI elements: {e}")
@@ -562,29 +636,22 @@ def detect_comment_ui_elements(image_path: str, gemini_api_key: str = None) -> d
 
 
 def verify_action_success(
-    image_path: str, action_type: str, gemini_api_key: str = None
+    image, action_type: str, gemini_api_key: str = None, client=None
 ) -> dict:
     """
     Verify if a specific action (like, comment, etc.) was successful.
 
     Args:
-        image_path: Path to screenshot after action
+        image: Frame or path to screenshot after action
         action_type: "like_tap", "comment_sent", "profile_change"
         gemini_api_key: API key
+        client: Gemini client (defaults to the shared client for the key)
 
     Returns:
         Dictionary with verification results
     """
-    if not gemini_api_key:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-
     try:
-        client = genai.Client(api_key=gemini_api_key)
-
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
+        client = client or get_gemini_client(gemini_api_key)
 
         if action_type == "like_tap":
             prompt = """
@@ -676,13 +743,11 @@ def verify_action_success(
             }}
             """
 
-        config = types.GenerateContentConfig(response_mime_type="application/json")
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+        text = generate_gemini_content(
+            "verify_action_success", prompt, [image], json_response=True, client=client
         )
 
-        result = json.loads(response.text) if response.text else {}
+        result = json.loads(text) if text else {}
         result["verification_type"] = action_type
         return result
 
@@ -694,3 +759,161 @@ def verify_action_success(
             "confidence": 0.0,
             "description": f"Verification failed: {e}",
         }
+
+
+_SCORE = types.Schema(type=types.Type.INTEGER, minimum=1, maximum=10)
+_TEXT = types.Schema(type=types.Type.STRING)
+_TEXT_LIST = types.Schema(type=types.Type.ARRAY, items=_TEXT)
+
+# Response of analyze_profile_frames_gemini, matching the JSON its prompt describes
+PROFILE_FRAMES_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "user_content": _TEXT,
+        "analysis": types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "profile_quality_score": _SCORE,
+                "should_like": types.Schema(type=types.Type.BOOLEAN),
+                "reason": _TEXT,
+                "profile_completeness": _SCORE,
+                "conversation_potential": _SCORE,
+                "content_depth": _SCORE,
+                "authenticity_score": _SCORE,
+                "red_flags": _TEXT_LIST,
+                "positive_indicators": _TEXT_LIST,
+                "personality_traits": _TEXT_LIST,
+                "interests": _TEXT_LIST,
+                "estimated_age": types.Schema(type=types.Type.INTEGER),
+                "name": _TEXT,
+                "location": _TEXT,
+                "profession": _TEXT,
+                "content_quality": types.Schema(
+                    type=types.Type.STRING, enum=["high", "medium", "low"]
+                ),
+                "bio_length": types.Schema(
+                    type=types.Type.STRING,
+                    enum=["detailed", "moderate", "brief", "missing"],
+                ),
+                "prompt_answers": types.Schema(
+                    type=types.Type.INTEGER, minimum=0, maximum=10
+                ),
+                "overall_impression": _TEXT,
+            },
+            required=[
+                "profile_quality_score",
+                "should_like",
+                "reason",
+                "conversation_potential",
+                "red_flags",
+                "positive_indicators",
+            ],
+        ),
+    },
+    required=["user_content", "analysis"],
+)
+
+
+def analyze_profile_frames_gemini(
+    images: list,
+    gemini_api_key: str = None,
+    max_edge: int = MULTI_IMAGE_MAX_EDGE,
+    client=None,
+) -> dict:
+    """
+    Extract user content and analyze a complete profile from all of its scroll
+    screenshots in a single request.
+
+    Args:
+        images: Frames (or paths) covering the profile from top to bottom
+        gemini_api_key: API key
+        max_edge: Longest edge each frame is downscaled to before upload
+        client: Gemini client (defaults to the shared client for the key)
+
+    Returns:
+        Dictionary with "user_content" (combined user text) and "analysis"
+        (comprehensive profile analysis), or {} if the request failed
+    """
+    try:
+        client = client or get_gemini_client(gemini_api_key)
+
+        frames = [as_frame(image) for image in images]
+        frames = [frame for frame in frames if frame.image is not None]
+        if not frames:
+            return {}
+
+        prompt = f"""
+        These {len(frames)} screenshots show ONE dating profile, in order from top to bottom
+        as the profile was scrolled. Screenshots overlap, so do not repeat content.
+
+        STEP 1 - Extract ONLY user-generated content:
+        INCLUDE: profile name and age, bio/description text, prompt answers
+        (e.g. "My simple pleasures: ..."), interests, hobbies, job titles,
+        user-provided location and any text the user wrote about themselves.
+        EXCLUDE: UI buttons (Like, Pass, Comment, Send, etc.), navigation elements,
+        app interface text, system messages, generic prompts/questions before answers,
+        UI icons and emojis, distance indicators, match percentage, photo count indicators.
+
+        STEP 2 - Analyze the complete profile based on all screenshots and the extracted content.
+
+        Respond in JSON format:
+        {{
+            "user_content": "all extracted user content, one item per line",
+            "analysis": {{
+                "profile_quality_score": 1-10,
+                "should_like": true/false,
+                "reason": "detailed reason for recommendation",
+                "profile_completeness": 1-10,
+                "conversation_potential": 1-10,
+                "content_depth": 1-10,
+                "authenticity_score": 1-10,
+                "red_flags": ["any", "concerning", "elements"],
+                "positive_indicators": ["good", "signs", "to", "like"],
+                "personality_traits": ["observed", "traits"],
+                "interests": ["extracted", "interests", "hobbies"],
+                "estimated_age": 25,
+                "name": "extracted_name",
+                "location": "extracted_location",
+                "profession": "extracted_job",
+                "content_quality": "high/medium/low",
+                "bio_length": "detailed/moderate/brief/missing",
+                "prompt_answers": 0-10,
+                "overall_impression": "detailed assessment"
+            }}
+        }}
+
+        Base your assessment on:
+        - Depth and quality of written content
+        - Authenticity and genuineness of responses
+        - Conversation starter potential
+        - Shared interests or compatibility indicators
+        - Overall effort put into the profile
+        - Completeness of information provided
+        """
+
+        text = generate_gemini_content(
+            "analyze_profile_frames_gemini",
+            prompt,
+            frames,
+            client=client,
+            max_edge=max_edge,
+            response_schema=PROFILE_FRAMES_SCHEMA,
+        )
+
+        result = json.loads(text) if text else {}
+        if not isinstance(result.get("analysis"), dict):
+            return {}
+
+        # One item per line, even if the model returned them as a list
+        user_content = result.get("user_content") or ""
+        if isinstance(user_content, list):
+            user_content = "\n".join(str(item) for item in user_content)
+
+        return {
+            "user_content": str(user_content).strip(),
+            "analysis": result["analysis"],
+        }
+
+    except Exception as e:
+        print(f"Error analyzing profile frames with Gemini: {e}")
+        return {}
@@ -0,0 +1,198 @@
+# app/gemini_cache.py
+
+"""
+Content-addressed cache for Gemini responses.
+Responses are keyed by (function, model, prompt hash, image hashes) and kept in
+an in-memory LRU backed by an on-disk store, both bounded in size and by TTL,
+so re-analyzing an unchanged screen does not cost another round-trip.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from frame import Frame
+from screen_change import dhash
+
+
+class GeminiResponseCache:
+    """In-memory LRU + on-disk cache of Gemini response texts"""
+
+    def __init__(
+        self,
+        directory: str = ".gemini_cache",
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        persist: bool = True,
+        image_key: str = "exact",
+        enabled: bool = True,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self.image_key = image_key
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created_at, text)
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+
+    # Keys
+    def _image_hash(self, frame: Frame) -> str:
+        if self.image_key == "perceptual" and frame.gray is not None:
+            # 256-bit difference hash: near-identical frames share a key
+            return "p" + "".join(
+                "1" if bit else "0" for bit in dhash(frame.gray, hash_size=16)
+            )
+        return "x" + frame.content_hash
+
+    def make_key(
+        self, function_name: str, model: str, prompt: str, frames: List[Frame] = ()
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(function_name.encode())
+        digest.update(b"\0" + model.encode())
+        digest.update(b"\0" + hashlib.sha256(prompt.encode()).digest())
+        for frame in frames:
+            digest.update(b"\0" + self._image_hash(frame).encode())
+        return digest.hexdigest()
+
+    # Lookup
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                self._remember(key, entry)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        if not self.enabled or not text:
+            return
+
+        entry = (time.time(), text)
+        with self._lock:
+            self._remember(key, entry)
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= self.max_entries // 4 + 1
+            if prune:
+                self._puts_since_prune = 0
+
+        self._write_disk(key, entry)
+        if prune:
+            self.prune_disk()
+
+    def _remember(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persist and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
+
+    # Disk store
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        if not self.persist:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                record = json.load(f)
+            return record["created_at"], record["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, entry: tuple):
+        if not self.persist:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"created_at": entry[0], "text": entry[1]}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"⚠️  Warning: Could not persist Gemini cache entry: {e}")
+
+    def prune_disk(self):
+        """Drop expired entries and keep at most max_entries files on disk"""
+        if not self.persist or not os.path.isdir(self.directory):
+            return
+
+        now = time.time()
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+                if now - mtime > self.ttl_seconds:
+                    os.remove(path)
+                else:
+                    files.append((mtime, path))
+            except OSError:
+                continue
+
+        files.sort()
+        for _, path in files[: max(0, len(files) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_gemini_cache = GeminiResponseCache()
+
+
+def get_gemini_cache() -> GeminiResponseCache:
+    return _gemini_cache
+
+
+def configure_gemini_cache(
+    enabled: bool = True,
+    directory: str = ".gemini_cache",
+    max_entries: int = 512,
+    ttl_seconds: float = 3600.0,
+    image_key: str = "exact",
+) -> GeminiResponseCache:
+    """Replace the shared cache with one built from agent configuration"""
+    global _gemini_cache
+    _gemini_cache = GeminiResponseCache(
+        directory=directory,
+        max_entries=max_entries,
+        ttl_seconds=ttl_seconds,
+        image_key=image_key,
+        enabled=enabled,
+    )
+    _gemini_cache.prune_disk()
+    return _gemini_cache
@@ -0,0 +1,63 @@
+# app/gemini_client.py
+
+"""
+Shared Gemini client provider.
+One client (and its pooled keep-alive HTTP connections) is reused by every
+analyzer call instead of constructing a new client and TLS session per request.
+"""
+
+import os
+import threading
+
+import httpx
+from google import genai
+from google.genai import types
+
+# Connection pool settings for the shared HTTP client
+MAX_CONNECTIONS = 16
+MAX_KEEPALIVE_CONNECTIONS = 8
+KEEPALIVE_EXPIRY_SECONDS = 120.0
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _create_client(api_key: str) -> genai.Client:
+    http_options = types.HttpOptions(
+        client_args={
+            "limits": httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            )
+        }
+    )
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+def get_gemini_client(gemini_api_key: str = None):
+    """
+    Return the shared Gemini client. Analyzer functions call this when no
+    client is passed to them.
+
+    Args:
+        gemini_api_key: Google GenAI API key (optional, will use env var if not provided)
+
+    Returns:
+        A cached client per API key
+
+    Raises:
+        ValueError: If no API key is configured
+    """
+    if not gemini_api_key:
+        gemini_api_key = os.getenv("GEMINI_API_KEY")
+
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY environment variable not set")
+
+    with _lock:
+        client = _clients.get(gemini_api_key)
+        if client is None:
+            client = _create_client(gemini_api_key)
+            _clients[gemini_api_key] = client
+        return client
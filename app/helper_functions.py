@@ -1,29 +1,179 @@
 from ppadb.client import Client as AdbClient
 import time
-import cv2
 import random
 from dotenv import load_dotenv
 import os
 import glob
 
+import cv2
+import numpy as np
+
+from adb_shell import CommandInterruptedError, get_shell_session, is_idempotent
+from frame import Frame, ScreenshotSink, as_frame, decode_raw_framebuffer
+from instrumentation import span, timed
+from template_matcher import get_template_matcher
+
 load_dotenv()
 
+# Disk persistence for captured frames (optional, written in the background)
+screenshot_sink = ScreenshotSink()
+
+# Screenshot backend, see set_capture_mode()
+capture_mode = "png"
+
+# Multiplier for pause()/random_delay(), 0 skips sleeps (offline replay)
+sleep_scale = 1.0
+
+# Longest command line sent by one ShellBatch round-trip
+MAX_BATCH_COMMAND_LENGTH = 1000
+
+# Event-driven waits after UI actions, see configure_screen_waits()
+screen_waits_enabled = False
+screen_wait_interval = 0.25
+screen_wait_min_delay = 0.0
+
+# Mean absolute grey-level difference between consecutive low-resolution
+# captures below which the screen counts as unchanged
+STABLE_DIFF_THRESHOLD = 1.5
+# Consecutive unchanged captures needed before the screen counts as settled
+STABLE_POLLS = 1
+
+
+def set_sleep_scale(scale=1.0):
+    global sleep_scale
+    sleep_scale = scale
+
+
+def pause(seconds):
+    """Sleep for a fixed time (recorded as a timing span)"""
+    with span("sleep", "pause"):
+        time.sleep(seconds * sleep_scale)
+
 
 def random_delay(min_sec=0.5, max_sec=2.0):
     """Add a random delay to appear more human-like"""
     delay = random.uniform(min_sec, max_sec)
-    time.sleep(delay)
+    with span("sleep", "random_delay"):
+        time.sleep(delay * sleep_scale)
     return delay
 
 
-def clear_screenshots_directory():
+def configure_screen_waits(enabled=True, poll_interval=0.25, min_delay=0.0):
+    """Configure the stable-screen waits used by settle()"""
+    global screen_waits_enabled, screen_wait_interval, screen_wait_min_delay
+    screen_waits_enabled = enabled
+    screen_wait_interval = poll_interval
+    screen_wait_min_delay = min_delay
+
+
+def settle(device, min_sec, max_sec=None):
+    """
+    Wait for the UI after an action. With stable-screen waits enabled this
+    returns as soon as the screen stops changing (at most max_sec, or min_sec
+    when no range is given); otherwise it sleeps a fixed or random delay.
+    Ranged waits keep a random pacing floor between the configured minimum
+    delay and min_sec, so the timing between actions still varies.
+    """
+    if not screen_waits_enabled:
+        if max_sec is None:
+            pause(min_sec)
+        else:
+            random_delay(min_sec, max_sec)
+        return
+    floor = screen_wait_min_delay
+    if max_sec is not None:
+        floor = random.uniform(floor, max(floor, min_sec))
+    wait_for_screen_stable(
+        device,
+        timeout=max_sec or min_sec,
+        min_interval=screen_wait_interval,
+        min_delay=floor,
+    )
+
+
+def shell(device, command):
+    """
+    Run an ADB shell command (recorded as a timing span), over the device's
+    persistent shell session when one is available.
+
+    Raises CommandInterruptedError if the session dropped while a command
+    that is not safe to resend (e.g. an input event) was running.
+    """
+    with span("adb", " ".join(command.split()[:2])):
+        session = get_shell_session(device)
+        if session is not None:
+            try:
+                return session.run(command)
+            except ConnectionError as e:
+                # The command was not sent, run it on a one-off channel instead
+                print(f"⚠️  {e}, falling back to a new shell channel")
+            except CommandInterruptedError as e:
+                # The command may already have run; resending an input event
+                # could repeat a tap, so only idempotent commands are retried
+                # and callers of the others decide how to verify. The session
+                # reopens on the next command either way.
+                if not is_idempotent(command):
+                    raise
+                print(f"⚠️  {e}, retrying on a new shell channel")
+        return device.shell(command)
+
+
+class ShellBatch:
+    """
+    Queue shell commands (e.g. `input` events) and run them in as few
+    `device.shell` round-trips as possible. Pauses between commands become
+    device-side `sleep`s. Used as a context manager the batch runs on exit.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.commands = []
+
+    def add(self, command):
+        self.commands.append(command)
+        return self
+
+    def sleep(self, seconds):
+        if seconds * sleep_scale > 0:
+            self.commands.append(f"sleep {seconds * sleep_scale:.2f}")
+        return self
+
+    def run(self):
+        """Send the queued commands, split to stay under MAX_BATCH_COMMAND_LENGTH"""
+        commands, self.commands = self.commands, []
+        outputs = []
+        line = ""
+        for command in commands:
+            if line and len(line) + len(command) + 2 > MAX_BATCH_COMMAND_LENGTH:
+                outputs.append(shell(self.device, line))
+                line = ""
+            line = f"{line}; {command}" if line else command
+        if line:
+            outputs.append(shell(self.device, line))
+        return "".join(output or "" for output in outputs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.run()
+        return False
+
+
+def configure_screenshot_sink(enabled=True, directory="images"):
+    """Enable or disable saving captured frames to disk"""
+    screenshot_sink.configure(directory=directory, enabled=enabled)
+
+
+def clear_screenshots_directory(directory="images"):
     """
     Clear all old screenshots from the images directory to prevent confusion
     """
     try:
-        if os.path.exists("images"):
+        if os.path.exists(directory):
             # Remove all PNG files in the images directory
-            old_screenshots = glob.glob("images/*.png")
+            old_screenshots = glob.glob(os.path.join(directory, "*.png"))
             count = len(old_screenshots)
 
             if count > 0:
@@ -55,54 +205,204 @@ def connect_device(user_ip_address="127.0.0.1"):
     return device
 
 
+def set_capture_mode(mode="png"):
+    """
+    Select the screenshot backend:
+    - "png": `screencap -p`, the device PNG-encodes every frame
+    - "raw": raw framebuffer dump, PNG is only encoded when a caller needs it
+    """
+    global capture_mode
+    if mode not in ("png", "raw"):
+        raise ValueError(f"Unknown capture mode: {mode}")
+    capture_mode = mode
+
+
+def supports_raw_capture(device):
+    """
+    Whether raw framebuffer reads are possible. Wrapper devices that only proxy
+    shell() and screencap() (recording, replay) set supports_raw_capture = False.
+    """
+    return getattr(device, "supports_raw_capture", True) and hasattr(
+        device, "create_connection"
+    )
+
+
+def read_raw_framebuffer(device):
+    """Read the raw `screencap` framebuffer dump over a binary-safe exec channel"""
+    conn = device.create_connection()
+    with conn, span("adb", "screencap raw"):
+        conn.send("exec:screencap")
+        return bytes(conn.read_all())
+
+
 def capture_screenshot(device, filename):
     """
-    Capture screenshot with timestamp to prevent confusion between screenshots
+    Capture screenshot into an in-memory Frame with a timestamp to prevent
+    confusion between screenshots. Saving to disk is handled asynchronously
+    by the screenshot sink when enabled.
     """
     timestamp = int(time.time() * 1000)  # millisecond timestamp
 
-    result = device.screencap()
-    # Ensure images directory exists
-    os.makedirs("images", exist_ok=True)
+    frame = None
+    if capture_mode == "raw" and supports_raw_capture(device):
+        try:
+            image = decode_raw_framebuffer(read_raw_framebuffer(device))
+            frame = Frame(filename, image=image, timestamp=timestamp)
+        except Exception as e:
+            print(f"⚠️  Raw framebuffer capture failed, falling back to PNG: {e}")
+
+    if frame is None:
+        with span("adb", "screencap"):
+            result = device.screencap()
+        frame = Frame(filename, png_bytes=bytes(result), timestamp=timestamp)
+
+    filepath = screenshot_sink.submit(frame)
+    if filepath:
+        print(f"📸 Screenshot captured: {frame.name} (saving to {filepath})")
+    else:
+        print(f"📸 Screenshot captured: {frame.name}")
+    return frame
+
+
+def _capture_thumbnail(device):
+    """
+    Low-resolution grayscale capture used to detect screen changes. The raw
+    framebuffer is used whatever the capture mode, since it skips the
+    device-side PNG encode that dominates `screencap -p`.
+    """
+    if supports_raw_capture(device):
+        try:
+            image = decode_raw_framebuffer(read_raw_framebuffer(device))
+            return cv2.cvtColor(image[::8, ::8], cv2.COLOR_BGR2GRAY)
+        except Exception:
+            pass
+    with span("adb", "screencap"):
+        data = bytes(device.screencap())
+    # Decoding at 1/8 scale skips most of the PNG work
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+
+
+def wait_for_screen_stable(device, timeout=3.0, min_interval=0.25, min_delay=0.0):
+    """
+    Poll low-resolution captures until the screen stops changing.
+
+    Args:
+        device: ADB device object
+        timeout: Maximum time to wait in seconds
+        min_interval: Time between captures in seconds
+        min_delay: Pacing floor, the wait lasts at least this long
+
+    Returns:
+        dict: {'stable': bool, 'waited': float, 'polls': int}
+    """
+    start = time.perf_counter()
+    # Live waits end at the timeout or the poll budget. A replayed session
+    # reuses the poll count of the recorded wait instead, so it consumes the
+    # same recorded captures whatever the replay latency.
+    recorded_polls = None
+    if hasattr(device, "next_wait_polls"):
+        recorded_polls = device.next_wait_polls()
+    if recorded_polls is not None:
+        max_polls = recorded_polls
+    else:
+        max_polls = max(STABLE_POLLS + 1, int(timeout / min_interval) + 1)
+    previous = None
+    unchanged = 0
+    polls = 0
+    stable = False
+
+    with span("wait", "screen_stable"):
+        while polls < max_polls:
+            pause(min_interval)
+            try:
+                current = _capture_thumbnail(device)
+            except Exception as e:
+                print(f"⚠️  Screen stability capture failed: {e}")
+                break
+            polls += 1
+
+            if (
+                previous is not None
+                and current is not None
+                and current.shape == previous.shape
+                and cv2.absdiff(current, previous).mean() < STABLE_DIFF_THRESHOLD
+            ):
+                unchanged += 1
+                if unchanged >= STABLE_POLLS:
+                    stable = True
+                    break
+            else:
+                unchanged = 0
+            previous = current
+
+            if recorded_polls is None and time.perf_counter() - start >= timeout:
+                break
+
+        waited = time.perf_counter() - start
+        if waited < min_delay * sleep_scale:
+            pause(min_delay - waited / sleep_scale)
 
-    # Add timestamp to filename for uniqueness
-    timestamped_filename = f"{timestamp}_{filename}.png"
-    filepath = f"images/{timestamped_filename}"
+    if hasattr(device, "record_wait_polls"):
+        device.record_wait_polls(polls)
+    return {
+        "stable": stable,
+        "waited": time.perf_counter() - start,
+        "polls": polls,
+    }
 
-    with open(filepath, "wb") as fp:
-        fp.write(result)
 
-    print(f"📸 Screenshot saved: {filepath}")
-    return filepath
+def _send_input(device, command):
+    """
+    Send an input event command (or a ShellBatch of them). Returns False if
+    the shell session dropped while it ran, so it may not have reached the device.
+    """
+    try:
+        if isinstance(command, ShellBatch):
+            command.run()
+        else:
+            shell(device, command)
+        return True
+    except CommandInterruptedError as e:
+        print(f"⚠️  {e} - the input may not have reached the device")
+        return False
 
 
 def tap(device, x, y):
-    """Basic tap function with slight position randomization"""
+    """
+    Basic tap function with slight position randomization
+
+    Returns:
+        bool: False if the tap may not have reached the device
+    """
     # Add slight random offset (±5 pixels) to appear more human
     x_offset = random.randint(-5, 5)
     y_offset = random.randint(-5, 5)
-    device.shell(f"input tap {x + x_offset} {y + y_offset}")
+    return _send_input(device, f"input tap {x + x_offset} {y + y_offset}")
 
 
 def tap_with_confidence(device, x, y, confidence=1.0, tap_area_size="medium"):
     """
     Enhanced tap function with accuracy adjustments based on confidence and area size
+
+    Returns:
+        bool: False if the tap may not have reached the device
     """
     # Adjust tap position based on confidence and area size
     if confidence < 0.7:
         # If low confidence, tap slightly offset to increase hit chance
         offset = 20 if tap_area_size == "small" else 10
-        device.shell(f"input tap {x - offset} {y}")
-        time.sleep(0.2)
-        device.shell(f"input tap {x + offset} {y}")
+        batch = ShellBatch(device).add(f"input tap {x - offset} {y}")
+        batch.sleep(0.2).add(f"input tap {x + offset} {y}")
+        sent = _send_input(device, batch)
     elif tap_area_size == "large":
         # For large areas, tap the center
-        device.shell(f"input tap {x} {y}")
+        sent = _send_input(device, f"input tap {x} {y}")
     else:
         # Standard tap
-        device.shell(f"input tap {x} {y}")
+        sent = _send_input(device, f"input tap {x} {y}")
 
     print(f"Tapped at ({x}, {y}) with confidence {confidence:.2f}")
+    return sent
 
 
 def dismiss_keyboard(device, width=None, height=None):
@@ -117,9 +417,9 @@ def dismiss_keyboard(device, width=None, height=None):
     try:
         # Method 1: Press Enter (might send message in some apps)
         print("  📥 Trying ENTER key to close keyboard...")
-        device.shell("input keyevent KEYCODE_ENTER")
+        shell(device, "input keyevent KEYCODE_ENTER")
         methods_tried.append("ENTER")
-        time.sleep(1)
+        settle(device, 1)
 
     except Exception as e:
         print(f"  ⚠️  ENTER key failed: {e}")
@@ -127,9 +427,9 @@ def dismiss_keyboard(device, width=None, height=None):
     try:
         # Method 2: Back key to hide keyboard
         print("  ⬅️  Trying BACK key to hide keyboard...")
-        device.shell("input keyevent KEYCODE_BACK")
+        shell(device, "input keyevent KEYCODE_BACK")
         methods_tried.append("BACK")
-        time.sleep(1)
+        settle(device, 1)
 
     except Exception as e:
         print(f"  ⚠️  BACK key failed: {e}")
@@ -137,11 +437,12 @@ def dismiss_keyboard(device, width=None, height=None):
     try:
         # Method 3: Hide keyboard ADB command
         print("  📱 Trying hide keyboard command...")
-        device.shell("ime disable com.android.inputmethod.latin/.LatinIME")
-        time.sleep(0.5)
-        device.shell("ime enable com.android.inputmethod.latin/.LatinIME")
+        with ShellBatch(device) as batch:
+            batch.add("ime disable com.android.inputmethod.latin/.LatinIME")
+            batch.sleep(0.5)
+            batch.add("ime enable com.android.inputmethod.latin/.LatinIME")
         methods_tried.append("IME_TOGGLE")
-        time.sleep(1)
+        settle(device, 1)
 
     except Exception as e:
         print(f"  ⚠️  IME toggle failed: {e}")
@@ -153,7 +454,7 @@ def dismiss_keyboard(device, width=None, height=None):
             # Tap in upper third of screen where keyboard shouldn't be
             tap(device, int(width * 0.5), int(height * 0.25))
             methods_tried.append("TAP_OUTSIDE")
-            time.sleep(1)
+            settle(device, 1)
 
     except Exception as e:
         print(f"  ⚠️  Tap outside failed: {e}")
@@ -166,7 +467,7 @@ def input_text(device, text):
     # Escape spaces in the text
     text = text.replace(" ", "%s")
     print("text to be written: ", text)
-    device.shell(f'input text "{text}"')
+    shell(device, f'input text "{text}"')
 
 
 def input_text_robust(device, text, max_attempts=3):
@@ -198,8 +499,8 @@ def input_text_robust(device, text, max_attempts=3):
     # Clean and prepare text
     original_text = text
     methods = [
-        ("adb_shell_direct", lambda t: device.shell(f'input text "{t}"')),
-        ("adb_shell_escaped", lambda t: device.shell(f"input text '{t}'")),
+        ("adb_shell_direct", lambda t: shell(device, f'input text "{t}"')),
+        ("adb_shell_escaped", lambda t: shell(device, f"input text '{t}'")),
         ("keyevent_typing", lambda t: _type_with_keyevents(device, t)),
     ]
 
@@ -227,7 +528,7 @@ def input_text_robust(device, text, max_attempts=3):
 
                 # Execute the method
                 method_func(prepared_text)
-                time.sleep(1.5)  # Give time for text to appear
+                settle(device, 1.5)  # Give time for text to appear
 
                 print(f"✅ Text input successful with {method_name}")
                 return {
@@ -237,9 +538,21 @@ def input_text_robust(device, text, max_attempts=3):
                     "text_sent": original_text,
                 }
 
+            except CommandInterruptedError as e:
+                # Part of the text may already be typed; another method would
+                # type it again, so leave it to the caller to check the field
+                print(f"❌ Method {method_name} interrupted: {e}")
+                return {
+                    "success": False,
+                    "method_used": method_name,
+                    "attempts_made": attempt + 1,
+                    "text_sent": original_text,
+                    "error": f"Input interrupted, text may be partially typed: {e}",
+                }
+
             except Exception as e:
                 print(f"❌ Method {method_name} failed: {e}")
-                time.sleep(0.5)
+                pause(0.5)
                 continue
 
     # All methods failed
@@ -253,47 +566,47 @@ def input_text_robust(device, text, max_attempts=3):
     }
 
 
+# Keycodes for characters `input text` cannot type reliably
+PUNCTUATION_KEYCODES = {
+    ".": ["KEYCODE_PERIOD"],
+    ",": ["KEYCODE_COMMA"],
+    "!": ["KEYCODE_SHIFT_LEFT", "KEYCODE_1"],  # Shift + 1
+    "?": ["KEYCODE_SHIFT_LEFT", "KEYCODE_SLASH"],  # Shift + /
+}
+
+
+def _keycodes_for_char(char):
+    if char == " ":
+        return ["KEYCODE_SPACE"]
+    if char.isascii() and char.isalnum():
+        return [f"KEYCODE_{char.upper()}"]
+    # Skip other special characters
+    return PUNCTUATION_KEYCODES.get(char, [])
+
+
 def _type_with_keyevents(device, text):
-    """Type text using individual key events (slower but more reliable)"""
-    for char in text:
-        if char == " ":
-            device.shell("input keyevent KEYCODE_SPACE")
-        elif char.isalpha():
-            # Handle letters
-            keycode = f"KEYCODE_{char.upper()}"
-            device.shell(f"input keyevent {keycode}")
-        elif char.isdigit():
-            # Handle numbers
-            keycodes = {
-                "0": "KEYCODE_0",
-                "1": "KEYCODE_1",
-                "2": "KEYCODE_2",
-                "3": "KEYCODE_3",
-                "4": "KEYCODE_4",
-                "5": "KEYCODE_5",
-                "6": "KEYCODE_6",
-                "7": "KEYCODE_7",
-                "8": "KEYCODE_8",
-                "9": "KEYCODE_9",
-            }
-            device.shell(f"input keyevent {keycodes[char]}")
-        elif char in ".,!?":
-            # Handle basic punctuation
-            punctuation_codes = {
-                ".": "KEYCODE_PERIOD",
-                ",": "KEYCODE_COMMA",
-                "!": "KEYCODE_1",  # Shift + 1
-                "?": "KEYCODE_SLASH",  # Shift + /
-            }
-            if char in ["!", "?"]:
-                device.shell("input keyevent KEYCODE_SHIFT_LEFT")
-            device.shell(f"input keyevent {punctuation_codes[char]}")
-        # Skip other special characters
-        time.sleep(0.1)  # Small delay between keystrokes
+    """
+    Type text using key events (slower but more reliable). Each word is sent
+    as one multi-key `input keyevent` and the whole text as a single batch.
+    """
+    words = text.split(" ")
+    with ShellBatch(device) as batch:
+        for i, word in enumerate(words):
+            if i < len(words) - 1:
+                word += " "
+            keycodes = [code for char in word for code in _keycodes_for_char(char)]
+            if keycodes:
+                batch.add("input keyevent " + " ".join(keycodes))
+                batch.sleep(0.1)  # Small delay between words
 
 
 def swipe(device, x1, y1, x2, y2, duration=500):
-    """Swipe with randomized parameters to appear more human"""
+    """
+    Swipe with randomized parameters to appear more human
+
+    Returns:
+        bool: False if the swipe may not have reached the device
+    """
     # Add slight random offset to start/end positions (±10 pixels)
     x1 += random.randint(-10, 10)
     y1 += random.randint(-10, 10)
@@ -301,7 +614,7 @@ def swipe(device, x1, y1, x2, y2, duration=500):
     y2 += random.randint(-10, 10)
     # Vary duration by ±20%
     duration = int(duration * random.uniform(0.8, 1.2))
-    device.shell(f"input swipe {x1} {y1} {x2} {y2} {duration}")
+    return _send_input(device, f"input swipe {x1} {y1} {x2} {y2} {duration}")
 
 
 def generate_comment(profile_text):
@@ -313,97 +626,86 @@ def generate_comment(profile_text):
 
 
 def get_screen_resolution(device):
-    output = device.shell("wm size")
+    output = shell(device, "wm size")
     print("screen size: ", output)
     resolution = output.strip().split(":")[1].strip()
     width, height = map(int, resolution.split("x"))
     return width, height
 
 
-def detect_like_button_cv(screenshot_path):
+@timed("cv", "detect_ui_elements")
+def detect_ui_elements_cv(screenshot, templates=None, parallel=False):
     """
-    Detect like button using OpenCV template matching
+    Detect several UI elements in one pass: the screenshot is decoded and
+    converted to grayscale once, then every requested template is matched.
+
+    Args:
+        screenshot: Frame or path to screenshot
+        templates: Template names to match (default: all registered templates)
+        parallel: Match templates concurrently in a thread pool
 
     Returns:
-        dict: {
-            'found': bool,
-            'x': int,
-            'y': int,
-            'confidence': float,
-            'width': int,
-            'height': int
-        }
+        dict: template name -> detection result (see detect_like_button_cv)
     """
-    try:
-        # Load template image
-        template_path = "assets/like_button.png"
-        if not os.path.exists(template_path):
-            print(f"❌ Like button template not found: {template_path}")
-            return {"found": False, "confidence": 0.0}
+    matcher = get_template_matcher()
+    templates = list(templates or matcher.specs)
 
-        # Load screenshot and template
-        screenshot = cv2.imread(screenshot_path)
-        template = cv2.imread(template_path)
-
-        if screenshot is None:
-            print(f"❌ Could not load screenshot: {screenshot_path}")
-            return {"found": False, "confidence": 0.0}
+    try:
+        frame = as_frame(screenshot)
 
-        if template is None:
-            print(f"❌ Could not load template: {template_path}")
-            return {"found": False, "confidence": 0.0}
+        if frame.gray is None:
+            print(f"❌ Could not load screenshot: {frame}")
+            return {name: {"found": False, "confidence": 0.0} for name in templates}
 
-        # Get template dimensions
-        template_height, template_width = template.shape[:2]
+        results = matcher.match_many(templates, frame.gray, parallel=parallel)
 
-        # Convert to grayscale for better matching
-        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-        template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    except Exception as e:
+        print(f"❌ CV UI element detection failed: {e}")
+        return {name: {"found": False, "confidence": 0.0} for name in templates}
 
-        # Perform template matching
-        result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+    for name, result in results.items():
+        label = name.replace("_", " ").title()
+        if "x" not in result:
+            print(f"❌ {label} template not available or larger than search region")
+            results[name] = {"found": False, "confidence": 0.0}
+            continue
 
-        # Find the best match
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        print(f"🎯 CV {label} Detection:")
+        print(f"   📍 Center: ({result['x']}, {result['y']})")
+        print(f"   📐 Template size: {result['width']}x{result['height']}")
+        print(f"   🎯 Confidence: {result['confidence']:.3f}")
+        print(f"   ✅ Found: {result['found']} (threshold: {result['threshold']})")
 
-        # max_val is the confidence score (0-1)
-        confidence = float(max_val)
+    return results
 
-        # Calculate center coordinates
-        top_left = max_loc
-        center_x = top_left[0] + template_width // 2
-        center_y = top_left[1] + template_height // 2
 
-        # Consider it found if confidence is above threshold
-        confidence_threshold = 0.7
-        found = confidence >= confidence_threshold
+def detect_like_button_cv(screenshot):
+    """
+    Detect like button using OpenCV template matching
 
-        print("🎯 CV Like Button Detection:")
-        print(f"   📍 Center: ({center_x}, {center_y})")
-        print(f"   📐 Template size: {template_width}x{template_height}")
-        print(f"   🎯 Confidence: {confidence:.3f}")
-        print(f"   ✅ Found: {found} (threshold: {confidence_threshold})")
+    Args:
+        screenshot: Frame or path to screenshot
 
-        return {
-            "found": found,
-            "x": center_x,
-            "y": center_y,
-            "confidence": confidence,
-            "width": template_width,
-            "height": template_height,
-            "top_left_x": top_left[0],
-            "top_left_y": top_left[1],
+    Returns:
+        dict: {
+            'found': bool,
+            'x': int,
+            'y': int,
+            'confidence': float,
+            'width': int,
+            'height': int
         }
-
-    except Exception as e:
-        print(f"❌ CV like button detection failed: {e}")
-        return {"found": False, "confidence": 0.0}
+    """
+    return detect_ui_elements_cv(screenshot, ["like_button"])["like_button"]
 
 
-def detect_send_button_cv(screenshot_path):
+def detect_send_button_cv(screenshot):
     """
     Detect send button using OpenCV template matching
 
+    Args:
+        screenshot: Frame or path to screenshot
+
     Returns:
         dict: {
             'found': bool,
@@ -414,78 +716,16 @@ def detect_send_button_cv(screenshot_path):
             'height': int
         }
     """
-    try:
-        # Load template image
-        template_path = "assets/send_button.png"
-        if not os.path.exists(template_path):
-            print(f"❌ Send button template not found: {template_path}")
-            return {"found": False, "confidence": 0.0}
-
-        # Load screenshot and template
-        screenshot = cv2.imread(screenshot_path)
-        template = cv2.imread(template_path)
-
-        if screenshot is None:
-            print(f"❌ Could not load screenshot: {screenshot_path}")
-            return {"found": False, "confidence": 0.0}
-
-        if template is None:
-            print(f"❌ Could not load template: {template_path}")
-            return {"found": False, "confidence": 0.0}
-
-        # Get template dimensions
-        template_height, template_width = template.shape[:2]
-
-        # Convert to grayscale for better matching
-        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-        template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-
-        # Perform template matching
-        result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-
-        # Find the best match
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-        # max_val is the confidence score (0-1)
-        confidence = float(max_val)
-
-        # Calculate center coordinates
-        top_left = max_loc
-        center_x = top_left[0] + template_width // 2
-        center_y = top_left[1] + template_height // 2
-
-        # Consider it found if confidence is above threshold
-        confidence_threshold = (
-            0.6  # Lower threshold for send button as it may have different styles
-        )
-        found = confidence >= confidence_threshold
-
-        print("🎯 CV Send Button Detection:")
-        print(f"   📍 Center: ({center_x}, {center_y})")
-        print(f"   📐 Template size: {template_width}x{template_height}")
-        print(f"   🎯 Confidence: {confidence:.3f}")
-        print(f"   ✅ Found: {found} (threshold: {confidence_threshold})")
-
-        return {
-            "found": found,
-            "x": center_x,
-            "y": center_y,
-            "confidence": confidence,
-            "width": template_width,
-            "height": template_height,
-            "top_left_x": top_left[0],
-            "top_left_y": top_left[1],
-        }
-
-    except Exception as e:
-        print(f"❌ CV send button detection failed: {e}")
-        return {"found": False, "confidence": 0.0}
+    return detect_ui_elements_cv(screenshot, ["send_button"])["send_button"]
 
 
-def detect_comment_field_cv(screenshot_path):
+def detect_comment_field_cv(screenshot):
     """
     Detect comment field using OpenCV template matching
 
+    Args:
+        screenshot: Frame or path to screenshot
+
     Returns:
         dict: {
             'found': bool,
@@ -496,76 +736,13 @@ def detect_comment_field_cv(screenshot_path):
             'height': int
         }
     """
-    try:
-        # Load template image
-        template_path = "assets/comment_field.png"
-        if not os.path.exists(template_path):
-            print(f"❌ Comment field template not found: {template_path}")
-            return {"found": False, "confidence": 0.0}
-
-        # Load screenshot and template
-        screenshot = cv2.imread(screenshot_path)
-        template = cv2.imread(template_path)
-
-        if screenshot is None:
-            print(f"❌ Could not load screenshot: {screenshot_path}")
-            return {"found": False, "confidence": 0.0}
-
-        if template is None:
-            print(f"❌ Could not load template: {template_path}")
-            return {"found": False, "confidence": 0.0}
-
-        # Get template dimensions
-        template_height, template_width = template.shape[:2]
-
-        # Convert to grayscale for better matching
-        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-        template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-
-        # Perform template matching
-        result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-
-        # Find the best match
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-        # max_val is the confidence score (0-1)
-        confidence = float(max_val)
-
-        # Calculate center coordinates
-        top_left = max_loc
-        center_x = top_left[0] + template_width // 2
-        center_y = top_left[1] + template_height // 2
-
-        # Consider it found if confidence is above threshold
-        confidence_threshold = 0.6  # Lower threshold for comment field as text may vary
-        found = confidence >= confidence_threshold
-
-        print("🎯 CV Comment Field Detection:")
-        print(f"   📍 Center: ({center_x}, {center_y})")
-        print(f"   📐 Template size: {template_width}x{template_height}")
-        print(f"   🎯 Confidence: {confidence:.3f}")
-        print(f"   ✅ Found: {found} (threshold: {confidence_threshold})")
-
-        return {
-            "found": found,
-            "x": center_x,
-            "y": center_y,
-            "confidence": confidence,
-            "width": template_width,
-            "height": template_height,
-            "top_left_x": top_left[0],
-            "top_left_y": top_left[1],
-        }
-
-    except Exception as e:
-        print(f"❌ CV comment field detection failed: {e}")
-        return {"found": False, "confidence": 0.0}
+    return detect_ui_elements_cv(screenshot, ["comment_field"])["comment_field"]
 
 
 def open_hinge(device):
     package_name = "co.match.android.matchhinge"
-    device.shell(f"monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
-    time.sleep(5)
+    shell(device, f"monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
+    settle(device, 5)
 
 
 def reset_hinge_app(device):
@@ -579,21 +756,21 @@ def reset_hinge_app(device):
 
     # Step 1: Force stop the app
     print("🛑 Force stopping Hinge app...")
-    device.shell(f"am force-stop {package_name}")
-    time.sleep(2)
+    shell(device, f"am force-stop {package_name}")
+    settle(device, 2)
 
     # Step 2: Kill app from background processes
     print("💀 Killing background processes...")
-    device.shell(f"am kill {package_name}")
-    time.sleep(1)
+    shell(device, f"am kill {package_name}")
+    settle(device, 1)
 
     # Step 3: Go back to home screen
-    device.shell("input keyevent KEYCODE_HOME")
-    time.sleep(2)
+    shell(device, "input keyevent KEYCODE_HOME")
+    settle(device, 2)
 
     # Step 4: Reopen the app
     print("🚀 Reopening Hinge app...")
-    device.shell(f"am start -n {package_name}")
-    time.sleep(2)
+    shell(device, f"am start -n {package_name}")
+    settle(device, 2)
 
     print("✅ Hinge app reset completed")
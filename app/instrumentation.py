@@ -0,0 +1,113 @@
+# app/instrumentation.py
+
+"""
+Lightweight latency spans for workflow nodes and external dependencies
+(Gemini, ADB, CV, sleeps). Disabled by default: a disabled span is a shared
+no-op object, so instrumented code only pays for one flag check.
+"""
+
+import functools
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict
+
+import numpy as np
+
+ENABLED = False
+
+_durations = defaultdict(list)  # (category, name) -> [seconds, ...]
+_lock = threading.Lock()
+
+
+def enable_timing(enabled: bool = True):
+    global ENABLED
+    ENABLED = enabled
+
+
+def reset_timing():
+    with _lock:
+        _durations.clear()
+
+
+def record(category: str, name: str, seconds: float):
+    with _lock:
+        _durations[(category, name)].append(seconds)
+
+
+class _Span:
+    __slots__ = ("category", "name", "start")
+
+    def __init__(self, category: str, name: str):
+        self.category = category
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.category, self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(category: str, name: str):
+    """Context manager timing a block under category/name"""
+    return _Span(category, name) if ENABLED else _NOOP_SPAN
+
+
+def timed(category: str, name: str = None):
+    """Decorator timing every call of a function under category/name"""
+
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(category, label, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def timing_report() -> Dict[str, Any]:
+    """
+    Summarize recorded spans.
+
+    Returns:
+        dict: {category: {name: {'count', 'total_s', 'p50_ms', 'p95_ms', 'max_ms'}}}
+    """
+    with _lock:
+        items = [(key, list(values)) for key, values in _durations.items()]
+
+    report = {}
+    for (category, name), values in sorted(items):
+        samples = np.array(values) * 1000
+        report.setdefault(category, {})[name] = {
+            "count": len(values),
+            "total_s": round(float(samples.sum()) / 1000, 3),
+            "p50_ms": round(float(np.percentile(samples, 50)), 1),
+            "p95_ms": round(float(np.percentile(samples, 95)), 1),
+            "max_ms": round(float(samples.max()), 1),
+        }
+    return report
@@ -8,13 +8,22 @@ Uses state-based workflow management for improved reliability and debugging.
 import json
 import time
 import uuid
-from typing import Dict, Any, Optional, TypedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Iterator, Optional, TypedDict
+from langgraph.errors import GraphRecursionError
 from langgraph.graph import StateGraph, END
-from google import genai
 from google.genai import types
 
+from adb_shell import close_shell_sessions, configure_persistent_shell
 from config import GEMINI_API_KEY
+from frame import Frame
+from gemini_cache import configure_gemini_cache, get_gemini_cache
+from gemini_client import get_gemini_client
+from instrumentation import enable_timing, reset_timing, span, timed, timing_report
 from helper_functions import (
+    configure_screen_waits,
+    configure_screenshot_sink,
     connect_device,
     get_screen_resolution,
     open_hinge,
@@ -27,11 +36,18 @@ from helper_functions import (
     clear_screenshots_directory,
     detect_like_button_cv,
     detect_send_button_cv,
-    detect_comment_field_cv,
+    detect_ui_elements_cv,
     input_text_robust,
-    random_delay,
+    pause,
+    settle,
+    shell,
+    set_capture_mode,
 )
 from gemini_analyzer import (
+    analyze_profile_frames_gemini,
+    configure_image_preparation,
+    generate_gemini_content,
+    prepare_image_part,
     extract_text_from_image_gemini,
     analyze_dating_ui_with_gemini,
     analyze_profile_scroll_content,
@@ -39,18 +55,134 @@ from gemini_analyzer import (
     generate_comment_gemini,
     generate_contextual_date_comment,
 )
-from data_store import store_generated_comment, calculate_template_success_rates
+from data_store import (
+    calculate_template_success_rates,
+    configure_data_store,
+    flush_comment_store,
+    store_generated_comment,
+)
 from prompt_engine import update_template_weights
+from screen_change import detect_screen_change
+from template_matcher import configure_template_matcher
 
 
-class HingeAgentState(TypedDict):
-    """State maintained throughout the dating app automation workflow"""
+# Happy-path workflow transitions (last action -> next action), followed
+# without a Gemini round-trip while actions succeed
+WORKFLOW_TRANSITIONS = {
+    "": "capture_screenshot",
+    "initialize_session": "capture_screenshot",
+    "capture_screenshot": "analyze_profile",
+    "analyze_profile": "make_like_decision",
+    "scroll_profile": "make_like_decision",
+    "detect_like_button": "execute_like",
+    "generate_comment": "send_comment_with_typing",
+    "verify_profile_change": "capture_screenshot",
+    "recover_from_stuck": "capture_screenshot",
+    "reset_app": "capture_screenshot",
+}
+
+
+@dataclass(frozen=True)
+class SessionContext:
+    """Device session shared by every node, set once by initialize_session"""
+
+    __slots__ = ("device", "width", "height", "max_profiles")
 
-    # Device and session info
     device: Any
     width: int
     height: int
     max_profiles: int
+
+
+@dataclass(frozen=True)
+class ProfileRecord:
+    """
+    What the agent knows about one profile. Records are immutable: nodes
+    return an updated copy made with dataclasses.replace().
+    """
+
+    __slots__ = (
+        "index",
+        "text",
+        "analysis",
+        "decision_reason",
+        "generated_comment",
+        "comment_id",
+        "like_button_coords",
+        "like_button_confidence",
+    )
+
+    index: int  # current_profile_index the record was analyzed at, -1 if none
+    text: str
+    analysis: Dict[str, Any]
+    decision_reason: str
+    generated_comment: str
+    comment_id: str
+    like_button_coords: Optional[tuple]
+    like_button_confidence: float
+
+    @property
+    def features(self) -> Dict[str, Any]:
+        """Identity features compared when verifying a profile change"""
+        return {
+            "age": self.analysis.get("estimated_age", 0),
+            "name": self.analysis.get("name", ""),
+            "location": self.analysis.get("location", ""),
+            "interests": self.analysis.get("interests", []),
+        }
+
+
+EMPTY_PROFILE = ProfileRecord(-1, "", {}, "", "", "", None, 0.0)
+
+
+@dataclass(frozen=True)
+class AutomationEvent:
+    """
+    Progress of one graph step, yielded by stream_automation(). The last
+    event of a run has node "session_end" and carries the completion reason.
+    """
+
+    __slots__ = (
+        "node",
+        "step",
+        "duration",
+        "elapsed",
+        "successful",
+        "profile_index",
+        "profiles_processed",
+        "likes_sent",
+        "comments_sent",
+        "errors_encountered",
+        "completion_reason",
+        "error",
+    )
+
+    node: str
+    step: int
+    duration: float  # seconds spent in this step
+    elapsed: float  # seconds since the run started
+    successful: bool
+    profile_index: int
+    profiles_processed: int
+    likes_sent: int
+    comments_sent: int
+    errors_encountered: int
+    completion_reason: str
+    error: str
+
+    @property
+    def profiles_per_hour(self) -> float:
+        return self.profiles_processed / self.elapsed * 3600 if self.elapsed else 0.0
+
+
+class HingeAgentState(TypedDict):
+    """
+    State maintained throughout the dating app automation workflow. Nodes
+    return only the keys they change and LangGraph merges them.
+    """
+
+    # Device and session info
+    session: SessionContext
     current_profile_index: int
 
     # Session metrics
@@ -61,28 +193,19 @@ class HingeAgentState(TypedDict):
     stuck_count: int
 
     # Current profile data
-    current_screenshot: Optional[str]
-    profile_text: str
-    profile_analysis: Dict[str, Any]
-    decision_reason: str
+    current_screenshot: Optional[Frame]
+    profile: ProfileRecord
+    comment_interface_open: bool
 
-    # Profile change detection data
-    previous_profile_text: str
-    previous_profile_features: Dict[str, Any]
+    # Profile change detection data: the profile and frame before the last action
+    previous_profile: Optional[ProfileRecord]
+    previous_screenshot: Optional[Frame]
 
     # Action results
     last_action: str
     action_successful: bool
     retry_count: int
 
-    # Generated content
-    generated_comment: str
-    comment_id: str
-
-    # Button coordinates
-    like_button_coords: Optional[tuple]
-    like_button_confidence: float
-
     # Control flow
     should_continue: bool
     completion_reason: str
@@ -91,9 +214,6 @@ class HingeAgentState(TypedDict):
     gemini_reasoning: str
     next_tool_suggestion: str
 
-    # Batch processing for LangGraph recursion limit management
-    batch_start_index: int
-
 
 class LangGraphHingeAgent:
     """
@@ -101,47 +221,87 @@ class LangGraphHingeAgent:
     Replaces GeminiAgentController with improved workflow management.
     """
 
-    def __init__(self, max_profiles: int = 10, config=None):
+    def __init__(
+        self, max_profiles: int = 10, config=None, gemini_client=None, device=None
+    ):
         from agent_config import DEFAULT_CONFIG
 
         self.max_profiles = max_profiles
         self.config = config or DEFAULT_CONFIG
-        self.gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+        # Injected client (e.g. a stub) passed to this agent's analyzer calls
+        self._gemini_client = gemini_client
+        # Injected device (e.g. a recording or replay device) instead of ADB
+        self.device = device
+        self._extraction_pool = None
+        configure_image_preparation(
+            fmt=self.config.gemini_image_format,
+            max_edge=self.config.gemini_image_max_edge,
+            quality=self.config.gemini_image_quality,
+            crop_regions=self.config.gemini_image_crop_regions,
+        )
+        configure_data_store(backend=self.config.data_store_backend)
+        configure_gemini_cache(
+            enabled=self.config.gemini_cache_enabled,
+            directory=self.config.gemini_cache_dir,
+            max_entries=self.config.gemini_cache_max_entries,
+            ttl_seconds=self.config.gemini_cache_ttl_seconds,
+            image_key=self.config.gemini_cache_image_key,
+        )
+        configure_screenshot_sink(
+            enabled=self.config.save_screenshots,
+            directory=self.config.screenshot_dir,
+        )
+        set_capture_mode(self.config.screenshot_capture_mode)
+        configure_screen_waits(
+            enabled=self.config.stable_screen_waits,
+            poll_interval=self.config.stable_screen_poll_interval,
+            min_delay=self.config.min_action_delay,
+        )
+        configure_persistent_shell(self.config.persistent_adb_shell)
+        # Load and preprocess CV templates once per session
+        configure_template_matcher(
+            pyramid_scale=self.config.cv_pyramid_scale,
+            rois={
+                "like_button": self.config.like_button_roi,
+                "send_button": self.config.send_button_roi,
+                "comment_field": self.config.comment_field_roi,
+            },
+        )
+        enable_timing(self.config.enable_timing)
         self.graph = self._build_workflow()
 
-        # Profile batch processing to avoid LangGraph recursion limits
-        self.profiles_per_batch = (
-            3  # Process 3 profiles per batch to stay under 25-turn limit
-        )
-        self.max_turns_per_profile = 8  # Estimated max turns needed per profile
+    @property
+    def gemini_client(self):
+        """Injected client, or the shared connection-pooled Gemini client"""
+        return self._gemini_client or get_gemini_client(GEMINI_API_KEY)
 
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow with Gemini-controlled decision making"""
 
         workflow = StateGraph(HingeAgentState)
 
+        def add_node(name, node):
+            # Timed under the "node" category (a flag check when timing is off)
+            workflow.add_node(name, timed("node", name)(node))
+
         # Add all workflow nodes
-        workflow.add_node("initialize_session", self.initialize_session_node)
-        workflow.add_node("gemini_decide_action", self.gemini_decide_action_node)
-        workflow.add_node("capture_screenshot", self.capture_screenshot_node)
-        workflow.add_node("analyze_profile", self.analyze_profile_node)
-        workflow.add_node("scroll_profile", self.scroll_profile_node)
-        workflow.add_node("make_like_decision", self.make_like_decision_node)
-        workflow.add_node("detect_like_button", self.detect_like_button_node)
-        workflow.add_node("execute_like", self.execute_like_node)
-        workflow.add_node("generate_comment", self.generate_comment_node)
-        workflow.add_node(
-            "send_comment_with_typing", self.send_comment_with_typing_node
-        )
-        workflow.add_node(
-            "send_like_without_comment", self.send_like_without_comment_node
-        )
-        workflow.add_node("execute_dislike", self.execute_dislike_node)
-        workflow.add_node("navigate_to_next", self.navigate_to_next_node)
-        workflow.add_node("verify_profile_change", self.verify_profile_change_node)
-        workflow.add_node("recover_from_stuck", self.recover_from_stuck_node)
-        workflow.add_node("reset_app", self.reset_app_node)
-        workflow.add_node("finalize_session", self.finalize_session_node)
+        add_node("initialize_session", self.initialize_session_node)
+        add_node("gemini_decide_action", self.gemini_decide_action_node)
+        add_node("capture_screenshot", self.capture_screenshot_node)
+        add_node("analyze_profile", self.analyze_profile_node)
+        add_node("scroll_profile", self.scroll_profile_node)
+        add_node("make_like_decision", self.make_like_decision_node)
+        add_node("detect_like_button", self.detect_like_button_node)
+        add_node("execute_like", self.execute_like_node)
+        add_node("generate_comment", self.generate_comment_node)
+        add_node("send_comment_with_typing", self.send_comment_with_typing_node)
+        add_node("send_like_without_comment", self.send_like_without_comment_node)
+        add_node("execute_dislike", self.execute_dislike_node)
+        add_node("navigate_to_next", self.navigate_to_next_node)
+        add_node("verify_profile_change", self.verify_profile_change_node)
+        add_node("recover_from_stuck", self.recover_from_stuck_node)
+        add_node("reset_app", self.reset_app_node)
+        add_node("finalize_session", self.finalize_session_node)
 
         # Set entry point
         workflow.set_entry_point("initialize_session")
@@ -202,8 +362,7 @@ class LangGraphHingeAgent:
 
         workflow.add_edge("finalize_session", END)
 
-        # Compile with increased recursion limit for multi-profile processing
-        # Each profile may require 10-15 iterations, so allow for more profiles
+        # The recursion limit is set per run, see _recursion_limit()
         return workflow.compile(
             checkpointer=None,  # No checkpointing needed for our use case
             interrupt_before=None,
@@ -220,11 +379,8 @@ class LangGraphHingeAgent:
 
     def _route_action_result(self, state: HingeAgentState) -> str:
         # Check completion conditions
-        batch_start = state.get("batch_start_index", 0)
-        batch_end = batch_start + self.profiles_per_batch
-
         if (
-            state["current_profile_index"] >= min(batch_end, state["max_profiles"])
+            state["current_profile_index"] >= state["session"].max_profiles
             or state["errors_encountered"] > self.config.max_errors_before_abort
             or not state.get("should_continue", True)
         ):
@@ -237,12 +393,11 @@ class LangGraphHingeAgent:
         print("🚀 Initializing LangGraph Hinge automation session...")
 
         # Clear old screenshots to prevent confusion
-        clear_screenshots_directory()
+        clear_screenshots_directory(self.config.screenshot_dir)
 
-        device = connect_device(self.config.device_ip)
+        device = self.device or connect_device(self.config.device_ip)
         if not device:
             return {
-                **state,
                 "should_continue": False,
                 "completion_reason": "Failed to connect to device",
                 "last_action": "initialize_session",
@@ -251,7 +406,7 @@ class LangGraphHingeAgent:
 
         width, height = get_screen_resolution(device)
         open_hinge(device)
-        random_delay(4, 7)  # Variable startup delay
+        settle(device, 4, 7)  # Variable startup delay
 
         # Update template weights
         success_rates = calculate_template_success_rates()
@@ -262,29 +417,20 @@ class LangGraphHingeAgent:
         )
 
         return {
-            **state,
-            "device": device,
-            "width": width,
-            "height": height,
-            "max_profiles": self.max_profiles,
+            "session": SessionContext(device, width, height, self.max_profiles),
             "current_profile_index": 0,
             "profiles_processed": 0,
             "likes_sent": 0,
             "comments_sent": 0,
             "errors_encountered": 0,
             "stuck_count": 0,
-            "profile_text": "",
-            "profile_analysis": {},
-            "decision_reason": "",
-            "previous_profile_text": "",
-            "previous_profile_features": {},
+            "profile": EMPTY_PROFILE,
+            "comment_interface_open": False,
+            "previous_profile": None,
+            "previous_screenshot": None,
             "last_action": "initialize_session",
             "action_successful": True,
             "retry_count": 0,
-            "generated_comment": "",
-            "comment_id": "",
-            "like_button_coords": None,
-            "like_button_confidence": 0.0,
             "should_continue": True,
             "completion_reason": "",
             "gemini_reasoning": "",
@@ -292,26 +438,68 @@ class LangGraphHingeAgent:
             "current_screenshot": None,
         }
 
+    def _rule_based_next_action(self, state: HingeAgentState) -> Optional[str]:
+        """
+        Next step of the normal workflow, decided locally.
+        Returns None when Gemini should decide (failed action or stuck).
+        """
+        if not state["action_successful"] or state["stuck_count"] > 0:
+            return None
+
+        last_action = state["last_action"]
+        if last_action == "make_like_decision":
+            should_like = state["profile"].analysis.get("should_like")
+            return "detect_like_button" if should_like else "execute_dislike"
+
+        if last_action == "execute_like":
+            if state.get("comment_interface_open"):
+                return "generate_comment"
+            return "capture_screenshot"
+
+        if last_action in (
+            "send_comment_with_typing",
+            "send_like_without_comment",
+            "execute_dislike",
+            "navigate_to_next",
+        ):
+            # Stayed on the analyzed profile (e.g. comment sent without advancing)
+            if state["current_profile_index"] <= state["profile"].index:
+                return "navigate_to_next"
+            return "capture_screenshot"
+
+        return WORKFLOW_TRANSITIONS.get(last_action)
+
     def gemini_decide_action_node(self, state: HingeAgentState) -> HingeAgentState:
         """Ask Gemini to analyze current state and decide next action"""
+        if self.config.rule_based_routing:
+            next_action = self._rule_based_next_action(state)
+            if next_action:
+                print(f"⚡ Workflow rule: {state['last_action']} → {next_action}")
+                return {
+                    "next_tool_suggestion": next_action,
+                    "gemini_reasoning": "Deterministic workflow transition",
+                    "last_action": "gemini_decide_action",
+                    "action_successful": True,
+                }
+
         print(
-            f"🤖 Asking Gemini for next action (Profile {state['current_profile_index'] + 1}/{state['max_profiles']})"
+            f"🤖 Asking Gemini for next action (Profile {state['current_profile_index'] + 1}/{state['session'].max_profiles})"
         )
 
         # Prepare context for Gemini
         context = f"""
         Current Hinge Automation State:
-        - Profile Index: {state["current_profile_index"]}/{state["max_profiles"]}
+        - Profile Index: {state["current_profile_index"]}/{state["session"].max_profiles}
         - Profiles Processed: {state["profiles_processed"]}
         - Last Action: {state["last_action"]}
         - Action Successful: {state["action_successful"]}
         - Current Screenshot: {state["current_screenshot"]}
-        - Profile Text: {state["profile_text"][:300]}...
+        - Profile Text: {state["profile"].text[:300]}...
         - Stuck Count: {state["stuck_count"]}
         - Errors: {state["errors_encountered"]}
         
         Profile Analysis:
-        {json.dumps(state.get("profile_analysis", {}), indent=2)[:500]}
+        {json.dumps(state["profile"].analysis, indent=2)[:500]}
         
         Available Actions:
         1. capture_screenshot - Take screenshot of current screen
@@ -348,11 +536,8 @@ class LangGraphHingeAgent:
         try:
             if state["current_screenshot"]:
                 # Include screenshot for visual analysis
-                with open(state["current_screenshot"], "rb") as f:
-                    image_bytes = f.read()
-
-                image_part = types.Part.from_bytes(
-                    data=image_bytes, mime_type="image/png"
+                image_part = prepare_image_part(
+                    state["current_screenshot"], "gemini_decide_action"
                 )
 
                 prompt = f"""
@@ -395,9 +580,10 @@ class LangGraphHingeAgent:
                 )
                 contents = [prompt]
 
-            response = self.gemini_client.models.generate_content(
-                model="gemini-2.5-flash", contents=contents, config=config
-            )
+            with span("gemini", "gemini_decide_action"):
+                response = self.gemini_client.models.generate_content(
+                    model="gemini-2.5-flash", contents=contents, config=config
+                )
 
             decision = json.loads(response.text) if response.text else {}
             next_action = decision.get("next_action", "capture_screenshot")
@@ -407,7 +593,6 @@ class LangGraphHingeAgent:
             print(f"💭 Reasoning: {reasoning}")
 
             return {
-                **state,
                 "next_tool_suggestion": next_action,
                 "gemini_reasoning": reasoning,
                 "last_action": "gemini_decide_action",
@@ -424,7 +609,6 @@ class LangGraphHingeAgent:
             )
 
             return {
-                **state,
                 "next_tool_suggestion": fallback_action,
                 "gemini_reasoning": f"Fallback due to error: {e}",
                 "last_action": "gemini_decide_action",
@@ -436,13 +620,13 @@ class LangGraphHingeAgent:
         """Capture current screen screenshot"""
         print("📸 Capturing screenshot...")
 
-        screenshot_path = capture_screenshot(
-            state["device"], f"profile_{state['current_profile_index']}_langgraph"
+        screenshot = capture_screenshot(
+            state["session"].device,
+            f"profile_{state['current_profile_index']}_langgraph",
         )
 
         return {
-            **state,
-            "current_screenshot": screenshot_path,
+            "current_screenshot": screenshot,
             "last_action": "capture_screenshot",
             "action_successful": True,
         }
@@ -453,20 +637,23 @@ class LangGraphHingeAgent:
 
         if not state["current_screenshot"]:
             return {
-                **state,
                 "last_action": "analyze_profile",
                 "action_successful": False,
             }
 
-        # Collect multiple screenshots by scrolling through the profile
+        # Collect multiple screenshots by scrolling through the profile.
+        # In multi-image mode all screenshots are analyzed in one Gemini request
+        # at the end; otherwise each screenshot is extracted separately (in the
+        # background while the device keeps scrolling when pipelining is enabled).
+        multi_image = self.config.profile_analysis_mode == "multi_image"
         all_screenshots = []
-        all_profile_texts = []
+        pending_texts = []
 
         # Start with initial screenshot
         print("📸 Analyzing initial screenshot...")
         all_screenshots.append(state["current_screenshot"])
-        initial_text = self._extract_user_content_only(state["current_screenshot"])
-        all_profile_texts.append(initial_text)
+        if not multi_image:
+            pending_texts.append(self._start_extraction(state["current_screenshot"]))
 
         # Perform 3 scrolls to capture full profile content
         current_screenshot = state["current_screenshot"]
@@ -475,65 +662,106 @@ class LangGraphHingeAgent:
             print(f"📜 Performing scroll {scroll_num}/3...")
 
             # Scroll down to reveal more content
-            scroll_x = int(state["width"] * 0.5)  # Center of screen
-            scroll_y_start = int(state["height"] * 0.7)  # Start from 70% down
-            scroll_y_end = int(state["height"] * 0.3)  # End at 30% down
+            scroll_x = int(state["session"].width * 0.5)  # Center of screen
+            scroll_y_start = int(state["session"].height * 0.7)  # Start from 70% down
+            scroll_y_end = int(state["session"].height * 0.3)  # End at 30% down
 
             swipe(
-                state["device"],
+                state["session"].device,
                 scroll_x,
                 scroll_y_start,
                 scroll_x,
                 scroll_y_end,
                 duration=600,
             )
-            random_delay(1.5, 3.5)  # Variable delay after scroll
+            settle(state["session"].device, 1.5, 3.5)  # Variable delay after scroll
 
             # Capture screenshot after scroll
             scroll_screenshot = capture_screenshot(
-                state["device"],
+                state["session"].device,
                 f"profile_{state['current_profile_index']}_scroll_{scroll_num}",
             )
             all_screenshots.append(scroll_screenshot)
 
             # Extract user content from this scroll
-            scroll_text = self._extract_user_content_only(scroll_screenshot)
-            all_profile_texts.append(scroll_text)
+            if not multi_image:
+                pending_texts.append(self._start_extraction(scroll_screenshot))
 
             current_screenshot = scroll_screenshot
 
-        # Combine all extracted text, removing duplicates
-        combined_text = self._combine_unique_content(all_profile_texts)
-
-        # Perform comprehensive analysis on all collected content
-        print("🧠 Performing comprehensive profile analysis...")
-        comprehensive_analysis = self._analyze_complete_profile(
-            all_screenshots, combined_text
-        )
+        profile_result = {}
+        if multi_image:
+            print(
+                f"🧠 Analyzing all {len(all_screenshots)} screenshots in one request..."
+            )
+            profile_result = analyze_profile_frames_gemini(
+                all_screenshots, GEMINI_API_KEY, client=self._gemini_client
+            )
+            if profile_result:
+                combined_text = self._combine_unique_content(
+                    [profile_result["user_content"]]
+                )
+                comprehensive_analysis = profile_result["analysis"]
+            else:
+                print("⚠️ Multi-image analysis failed - falling back to per-frame")
+                pending_texts = [
+                    self._start_extraction(screenshot) for screenshot in all_screenshots
+                ]
+
+        if not profile_result:
+            # Join extraction results in screenshot order
+            all_profile_texts = [
+                text.result() if isinstance(text, Future) else text
+                for text in pending_texts
+            ]
+
+            # Combine all extracted text, removing duplicates
+            combined_text = self._combine_unique_content(all_profile_texts)
+
+            # Perform comprehensive analysis on all collected content
+            print("🧠 Performing comprehensive profile analysis...")
+            comprehensive_analysis = self._analyze_complete_profile(
+                all_screenshots, combined_text
+            )
 
         quality_score = comprehensive_analysis.get("profile_quality_score", 0)
         print(f"📊 Comprehensive profile quality: {quality_score}/10")
         print(f"📝 Total content captured: {len(combined_text)} characters")
 
         return {
-            **state,
             "current_screenshot": current_screenshot,  # Use latest screenshot
-            "profile_text": combined_text,
-            "profile_analysis": comprehensive_analysis,
+            "profile": replace(
+                EMPTY_PROFILE,
+                index=state["current_profile_index"],
+                text=combined_text,
+                analysis=comprehensive_analysis,
+            ),
             "last_action": "analyze_profile",
             "action_successful": True,
         }
 
-    def _extract_user_content_only(self, screenshot_path: str) -> str:
-        """Extract only user-generated content, filtering out UI elements"""
-        try:
-            client = genai.Client(api_key=GEMINI_API_KEY)
+    def _start_extraction(self, screenshot: Frame):
+        """Extract user content now, or submit it to the worker pool when pipelining"""
+        if not self.config.pipeline_profile_extraction:
+            return self._extract_user_content_only(screenshot)
 
-            with open(screenshot_path, "rb") as f:
-                image_bytes = f.read()
+        if self._extraction_pool is None:
+            self._extraction_pool = ThreadPoolExecutor(
+                max_workers=self.config.extraction_workers,
+                thread_name_prefix="profile-extraction",
+            )
+        return self._extraction_pool.submit(self._extract_user_content_only, screenshot)
 
-            image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
+    def _shutdown_extraction_pool(self):
+        """Stop the extraction workers; a later run creates a new pool"""
+        if self._extraction_pool is not None:
+            # Results of extractions still queued are no longer needed
+            self._extraction_pool.shutdown(wait=False, cancel_futures=True)
+            self._extraction_pool = None
 
+    def _extract_user_content_only(self, screenshot: Frame) -> str:
+        """Extract only user-generated content, filtering out UI elements"""
+        try:
             prompt = """
             Extract ONLY user-generated content from this dating profile screenshot. 
             
@@ -561,17 +789,21 @@ class LangGraphHingeAgent:
             If no user content is visible, return an empty string.
             """
 
-            response = client.models.generate_content(
-                model="gemini-2.5-flash", contents=[prompt, image_part]
+            text = generate_gemini_content(
+                "extract_user_content_only",
+                prompt,
+                [screenshot],
+                client=self.gemini_client,
             )
 
-            return response.text.strip() if response.text else ""
+            return text.strip()
 
         except Exception as e:
             print(f"❌ Error extracting user content: {e}")
             return ""
 
-    def _combine_unique_content(self, text_list: list) -> str:
+    @staticmethod
+    def _combine_unique_content(text_list: list) -> str:
         """Combine text from multiple screenshots, removing duplicates"""
         all_lines = []
         seen_lines = set()
@@ -592,14 +824,6 @@ class LangGraphHingeAgent:
     def _analyze_complete_profile(self, screenshots: list, combined_text: str) -> dict:
         """Perform comprehensive analysis on the complete profile content"""
         try:
-            client = genai.Client(api_key=GEMINI_API_KEY)
-
-            # Use the most recent screenshot for visual analysis
-            with open(screenshots[-1], "rb") as f:
-                image_bytes = f.read()
-
-            image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/png")
-
             prompt = f"""
             Analyze this complete dating profile based on the comprehensive content below.
             This content was extracted from multiple screenshots covering the entire profile.
@@ -641,13 +865,16 @@ class LangGraphHingeAgent:
             Be thorough since this represents their complete profile content.
             """
 
-            config = types.GenerateContentConfig(response_mime_type="application/json")
-
-            response = client.models.generate_content(
-                model="gemini-2.5-flash", contents=[prompt, image_part], config=config
+            # Use the most recent screenshot for visual analysis
+            text = generate_gemini_content(
+                "analyze_complete_profile",
+                prompt,
+                [screenshots[-1]],
+                json_response=True,
+                client=self.gemini_client,
             )
 
-            return json.loads(response.text) if response.text else {}
+            return json.loads(text) if text else {}
 
         except Exception as e:
             print(f"❌ Error in comprehensive analysis: {e}")
@@ -663,41 +890,43 @@ class LangGraphHingeAgent:
         print("📜 Scrolling profile...")
 
         scroll_analysis = analyze_profile_scroll_content(
-            state["current_screenshot"], GEMINI_API_KEY
+            state["current_screenshot"], GEMINI_API_KEY, client=self._gemini_client
         )
 
         if not scroll_analysis.get("should_scroll_down"):
             return {
-                **state,
                 "last_action": "scroll_profile",
                 "action_successful": False,
             }
 
         # Perform scroll
         scroll_x = int(
-            scroll_analysis.get("scroll_area_center_x", 0.5) * state["width"]
+            scroll_analysis.get("scroll_area_center_x", 0.5) * state["session"].width
         )
         scroll_y_start = int(
-            scroll_analysis.get("scroll_area_center_y", 0.6) * state["height"]
+            scroll_analysis.get("scroll_area_center_y", 0.6) * state["session"].height
         )
         scroll_y_end = int(scroll_y_start * 0.3)
 
-        swipe(state["device"], scroll_x, scroll_y_start, scroll_x, scroll_y_end)
-        time.sleep(2)
+        swipe(state["session"].device, scroll_x, scroll_y_start, scroll_x, scroll_y_end)
+        settle(state["session"].device, 2)
 
         # Capture new content
-        new_screenshot = capture_screenshot(state["device"], f"scrolled_{time.time()}")
-        additional_text = extract_text_from_image_gemini(new_screenshot, GEMINI_API_KEY)
+        new_screenshot = capture_screenshot(
+            state["session"].device, f"scrolled_{time.time()}"
+        )
+        additional_text = extract_text_from_image_gemini(
+            new_screenshot, GEMINI_API_KEY, client=self._gemini_client
+        )
 
         # Update profile text if new content found
-        updated_text = state["profile_text"]
+        updated_text = state["profile"].text
         if additional_text and additional_text not in updated_text:
             updated_text += "\n" + additional_text
 
         return {
-            **state,
             "current_screenshot": new_screenshot,
-            "profile_text": updated_text,
+            "profile": replace(state["profile"], text=updated_text),
             "last_action": "scroll_profile",
             "action_successful": True,
         }
@@ -706,7 +935,7 @@ class LangGraphHingeAgent:
         """Make like/dislike decision based on profile analysis"""
         print("🎯 Making like/dislike decision...")
 
-        analysis = state.get("profile_analysis", {})
+        analysis = state["profile"].analysis
         quality = analysis.get("profile_quality_score", 0)
         potential = analysis.get("conversation_potential", 0)
         red_flags = analysis.get("red_flags", [])
@@ -734,7 +963,7 @@ class LangGraphHingeAgent:
                 f"Good profile with positives: {', '.join(positive_indicators[:2])}"
             )
         elif (
-            len(state["profile_text"]) > self.config.min_text_length_detailed
+            len(state["profile"].text) > self.config.min_text_length_detailed
             and quality >= self.config.min_quality_for_detailed
         ):
             should_like = True
@@ -743,11 +972,13 @@ class LangGraphHingeAgent:
         print(f"🎯 DECISION: {'💖 LIKE' if should_like else '👎 DISLIKE'} - {reason}")
 
         return {
-            **state,
-            "decision_reason": reason,
+            "profile": replace(
+                state["profile"],
+                decision_reason=reason,
+                analysis={**analysis, "should_like": should_like},
+            ),
             "last_action": "make_like_decision",
             "action_successful": True,
-            "profile_analysis": {**analysis, "should_like": should_like},
         }
 
     def detect_like_button_node(self, state: HingeAgentState) -> HingeAgentState:
@@ -756,7 +987,7 @@ class LangGraphHingeAgent:
 
         # Take fresh screenshot for button detection
         fresh_screenshot = capture_screenshot(
-            state["device"], f"like_detection_{state['current_profile_index']}"
+            state["session"].device, f"like_detection_{state['current_profile_index']}"
         )
 
         # Use CV-based detection instead of Gemini
@@ -765,7 +996,6 @@ class LangGraphHingeAgent:
         if not cv_result.get("found"):
             print("❌ Like button not found with CV detection")
             return {
-                **state,
                 "current_screenshot": fresh_screenshot,
                 "last_action": "detect_like_button",
                 "action_successful": False,
@@ -782,10 +1012,12 @@ class LangGraphHingeAgent:
         print(f"   📐 Template size: {cv_result['width']}x{cv_result['height']}")
 
         return {
-            **state,
             "current_screenshot": fresh_screenshot,
-            "like_button_coords": (like_x, like_y),
-            "like_button_confidence": confidence,
+            "profile": replace(
+                state["profile"],
+                like_button_coords=(like_x, like_y),
+                like_button_confidence=confidence,
+            ),
             "last_action": "detect_like_button",
             "action_successful": True,
         }
@@ -794,25 +1026,19 @@ class LangGraphHingeAgent:
         """Execute like action with profile change verification"""
         print("💖 Executing like action...")
 
-        # Store previous profile data for verification
-        updated_state = {
-            **state,
-            "previous_profile_text": state.get("profile_text", ""),
-        }
-
-        current_analysis = state.get("profile_analysis", {})
-        updated_state["previous_profile_features"] = {
-            "age": current_analysis.get("estimated_age", 0),
-            "name": current_analysis.get("name", ""),
-            "location": current_analysis.get("location", ""),
-            "interests": current_analysis.get("interests", []),
-        }
-
         # Re-detect like button on current screen using CV
-        fresh_screenshot = capture_screenshot(state["device"], "fresh_like_detection")
+        fresh_screenshot = capture_screenshot(
+            state["session"].device, "fresh_like_detection"
+        )
 
-        # Update state immediately with fresh screenshot
-        updated_state["current_screenshot"] = fresh_screenshot
+        # Store previous profile data for verification; the fresh screenshot
+        # is the pre-action reference for local screen change detection
+        changes = {
+            "previous_profile": state["profile"],
+            "previous_screenshot": fresh_screenshot,
+            "current_screenshot": fresh_screenshot,
+            "comment_interface_open": False,
+        }
 
         # Use CV-based detection for more accuracy
         cv_result = detect_like_button_cv(fresh_screenshot)
@@ -820,7 +1046,7 @@ class LangGraphHingeAgent:
         if not cv_result.get("found"):
             print("❌ Like button not found with CV on fresh screenshot")
             return {
-                **updated_state,
+                **changes,
                 "last_action": "execute_like",
                 "action_successful": False,
             }
@@ -830,41 +1056,44 @@ class LangGraphHingeAgent:
         like_y = cv_result["y"]
 
         print("🎯 Like button detected with OpenCV:")
-        print(f"   📱 Screen size: {state['width']}x{state['height']}")
+        print(f"   📱 Screen size: {state['session'].width}x{state['session'].height}")
         print(f"   📍 Coordinates: ({like_x}, {like_y})")
         print(f"   🎯 CV Confidence: {confidence:.3f}")
         print(f"   📐 Template size: {cv_result['width']}x{cv_result['height']}")
 
         # Execute the like tap
-        tap_with_confidence(state["device"], like_x, like_y, confidence)
-        random_delay(2, 4)  # Variable delay after like
+        tap_with_confidence(state["session"].device, like_x, like_y, confidence)
+        settle(state["session"].device, 2, 4)  # Variable delay after like
 
         # Check if comment interface appeared
         immediate_screenshot = capture_screenshot(
-            state["device"], "post_like_immediate"
+            state["session"].device, "post_like_immediate"
+        )
+        comment_ui = detect_comment_ui_elements(
+            immediate_screenshot, GEMINI_API_KEY, client=self._gemini_client
         )
-        comment_ui = detect_comment_ui_elements(immediate_screenshot, GEMINI_API_KEY)
         comment_interface_appeared = comment_ui.get("comment_field_found", False)
 
         if comment_interface_appeared:
             print("💬 Comment interface appeared - like successful!")
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": immediate_screenshot,
                 "likes_sent": state["likes_sent"] + 1,
+                "comment_interface_open": True,
                 "last_action": "execute_like",
                 "action_successful": True,
             }
 
         # Check if we moved to next profile using verification
-        time.sleep(2)
+        settle(state["session"].device, 2)
         verification_screenshot = capture_screenshot(
-            state["device"], "like_verification"
+            state["session"].device, "like_verification"
         )
 
         # Use profile change verification
         profile_verification = self._verify_profile_change_internal(
-            {**updated_state, "current_screenshot": verification_screenshot}
+            verification_screenshot, fresh_screenshot, state["profile"]
         )
 
         if profile_verification.get("profile_changed", False):
@@ -872,7 +1101,7 @@ class LangGraphHingeAgent:
                 f"✅ Like successful - moved to new profile (confidence: {profile_verification.get('confidence', 0):.2f})"
             )
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": verification_screenshot,
                 "likes_sent": state["likes_sent"] + 1,
                 "current_profile_index": state["current_profile_index"] + 1,
@@ -884,7 +1113,7 @@ class LangGraphHingeAgent:
         else:
             print("⚠️ Like may have failed - still on same profile")
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": verification_screenshot,
                 "stuck_count": state["stuck_count"] + 1,
                 "last_action": "execute_like",
@@ -895,23 +1124,27 @@ class LangGraphHingeAgent:
         """Generate flirty, date-focused comment for current profile"""
         print("💬 Generating flirty, date-focused comment...")
 
-        if not state["profile_text"]:
+        if not state["profile"].text:
             return {
-                **state,
                 "last_action": "generate_comment",
                 "action_successful": False,
             }
 
         # Use contextual generation if we have detailed profile analysis
-        profile_analysis = state.get("profile_analysis", {})
+        profile_analysis = state["profile"].analysis
         if profile_analysis and len(profile_analysis) > 3:
             print("🎯 Using contextual comment generation with profile analysis...")
             comment = generate_contextual_date_comment(
-                profile_analysis, state["profile_text"], GEMINI_API_KEY
+                profile_analysis,
+                state["profile"].text,
+                GEMINI_API_KEY,
+                client=self._gemini_client,
             )
         else:
             print("💬 Using standard flirty comment generation...")
-            comment = generate_comment_gemini(state["profile_text"], GEMINI_API_KEY)
+            comment = generate_comment_gemini(
+                state["profile"].text, GEMINI_API_KEY, client=self._gemini_client
+            )
 
         if not comment:
             comment = self.config.default_comment
@@ -919,7 +1152,7 @@ class LangGraphHingeAgent:
         comment_id = str(uuid.uuid4())
         store_generated_comment(
             comment_id=comment_id,
-            profile_text=state["profile_text"],
+            profile_text=state["profile"].text,
             generated_comment=comment,
             style_used="langgraph_flirty_contextual",
         )
@@ -927,9 +1160,9 @@ class LangGraphHingeAgent:
         print(f"💋 Generated flirty comment: {comment[:60]}...")
 
         return {
-            **state,
-            "generated_comment": comment,
-            "comment_id": comment_id,
+            "profile": replace(
+                state["profile"], generated_comment=comment, comment_id=comment_id
+            ),
             "last_action": "generate_comment",
             "action_successful": True,
         }
@@ -938,49 +1171,52 @@ class LangGraphHingeAgent:
         """Type comment text into the comment field"""
         print("⌨️ Typing comment into field...")
 
-        if not state.get("generated_comment"):
+        if not state["profile"].generated_comment:
             print("❌ No comment to type")
-            return {**state, "last_action": "type_comment", "action_successful": False}
+            return {"last_action": "type_comment", "action_successful": False}
 
-        comment = state["generated_comment"]
+        comment = state["profile"].generated_comment
         print(f"💬 Typing comment: {comment[:50]}...")
 
         try:
             # Fresh screenshot to see current interface
             fresh_screenshot = capture_screenshot(
-                state["device"], "comment_interface_typing"
+                state["session"].device, "comment_interface_typing"
             )
 
-            comment_ui = detect_comment_ui_elements(fresh_screenshot, GEMINI_API_KEY)
+            comment_ui = detect_comment_ui_elements(
+                fresh_screenshot, GEMINI_API_KEY, client=self._gemini_client
+            )
 
             if not comment_ui.get("comment_field_found"):
                 print("❌ Comment field not found")
                 return {
-                    **state,
                     "current_screenshot": fresh_screenshot,
                     "last_action": "type_comment",
                     "action_successful": False,
                 }
 
             # Tap comment field to focus
-            comment_x = int(comment_ui["comment_field_x"] * state["width"])
-            comment_y = int(comment_ui["comment_field_y"] * state["height"])
+            comment_x = int(comment_ui["comment_field_x"] * state["session"].width)
+            comment_y = int(comment_ui["comment_field_y"] * state["session"].height)
             print(f"🎯 Tapping comment field at ({comment_x}, {comment_y})")
 
             tap_with_confidence(
-                state["device"],
+                state["session"].device,
                 comment_x,
                 comment_y,
                 comment_ui.get("comment_field_confidence", 0.8),
             )
-            time.sleep(2)
+            settle(state["session"].device, 2)
 
             # Clear any existing text
-            state["device"].shell("input keyevent KEYCODE_CTRL_A")
-            time.sleep(0.5)
+            shell(state["session"].device, "input keyevent KEYCODE_CTRL_A")
+            pause(0.5)
 
             # Use robust text input with multiple fallback methods
-            input_result = input_text_robust(state["device"], comment, max_attempts=2)
+            input_result = input_text_robust(
+                state["session"].device, comment, max_attempts=2
+            )
 
             if input_result["success"]:
                 print(
@@ -991,14 +1227,12 @@ class LangGraphHingeAgent:
                     f"❌ Comment typing failed: {input_result.get('error', 'Unknown error')}"
                 )
                 return {
-                    **state,
                     "current_screenshot": fresh_screenshot,
                     "last_action": "type_comment",
                     "action_successful": False,
                     "errors_encountered": state["errors_encountered"] + 1,
                 }
             return {
-                **state,
                 "current_screenshot": fresh_screenshot,
                 "last_action": "type_comment",
                 "action_successful": True,
@@ -1007,7 +1241,6 @@ class LangGraphHingeAgent:
         except Exception as e:
             print(f"❌ Comment typing failed: {e}")
             return {
-                **state,
                 "errors_encountered": state["errors_encountered"] + 1,
                 "last_action": "type_comment",
                 "action_successful": False,
@@ -1019,17 +1252,18 @@ class LangGraphHingeAgent:
 
         try:
             # Dismiss keyboard using multiple methods
-            success = dismiss_keyboard(state["device"], state["width"], state["height"])
-            time.sleep(2)
+            success = dismiss_keyboard(
+                state["session"].device, state["session"].width, state["session"].height
+            )
+            settle(state["session"].device, 2)
 
             # Take screenshot to verify keyboard is closed
             post_close_screenshot = capture_screenshot(
-                state["device"], "post_keyboard_close"
+                state["session"].device, "post_keyboard_close"
             )
 
             print(f"✅ Text interface closed (success: {success})")
             return {
-                **state,
                 "current_screenshot": post_close_screenshot,
                 "last_action": "close_text_interface",
                 "action_successful": True,
@@ -1038,7 +1272,6 @@ class LangGraphHingeAgent:
         except Exception as e:
             print(f"❌ Failed to close text interface: {e}")
             return {
-                **state,
                 "errors_encountered": state["errors_encountered"] + 1,
                 "last_action": "close_text_interface",
                 "action_successful": False,
@@ -1048,46 +1281,48 @@ class LangGraphHingeAgent:
         """Consolidated comment tool: tap field, type comment, dismiss keyboard, send comment"""
         print("💬 Starting consolidated comment process...")
 
-        if not state.get("generated_comment"):
+        if not state["profile"].generated_comment:
             print("❌ No comment to type")
             return {
-                **state,
                 "last_action": "send_comment_with_typing",
                 "action_successful": False,
             }
 
-        comment = state["generated_comment"]
+        comment = state["profile"].generated_comment
         print(f"💬 Processing comment: {comment[:50]}...")
 
         try:
             # Step 1: Tap the text input field
             print("🎯 Step 1: Tapping comment field...")
             fresh_screenshot = capture_screenshot(
-                state["device"], "comment_interface_typing"
+                state["session"].device, "comment_interface_typing"
             )
 
-            # Use OpenCV to detect comment field
-            cv_result = detect_comment_field_cv(fresh_screenshot)
+            # Use OpenCV to detect comment field and send button in one pass
+            cv_results = detect_ui_elements_cv(
+                fresh_screenshot, ["comment_field", "send_button"], parallel=True
+            )
+            cv_result = cv_results["comment_field"]
+            initial_send_result = cv_results["send_button"]
 
             if not cv_result.get("found"):
                 print("❌ Comment field not found with CV detection")
                 # Fallback to Gemini detection
                 comment_ui = detect_comment_ui_elements(
-                    fresh_screenshot, GEMINI_API_KEY
+                    fresh_screenshot, GEMINI_API_KEY, client=self._gemini_client
                 )
 
                 if not comment_ui.get("comment_field_found"):
                     print("❌ Comment field not found with Gemini fallback either")
                     return {
-                        **state,
                         "current_screenshot": fresh_screenshot,
                         "last_action": "send_comment_with_typing",
                         "action_successful": False,
                     }
 
                 # Use Gemini coordinates
-                comment_x = int(comment_ui["comment_field_x"] * state["width"])
-                comment_y = int(comment_ui["comment_field_y"] * state["height"])
+                comment_x = int(comment_ui["comment_field_x"] * state["session"].width)
+                comment_y = int(comment_ui["comment_field_y"] * state["session"].height)
                 confidence = comment_ui.get("comment_field_confidence", 0.8)
                 print(
                     f"🎯 Using Gemini fallback - Tapping comment field at ({comment_x}, {comment_y})"
@@ -1101,25 +1336,28 @@ class LangGraphHingeAgent:
                     f"✅ Comment field found with OpenCV at ({comment_x}, {comment_y}) - confidence: {confidence:.3f}"
                 )
 
-            tap_with_confidence(state["device"], comment_x, comment_y, confidence)
-            time.sleep(2)
+            tap_with_confidence(
+                state["session"].device, comment_x, comment_y, confidence
+            )
+            settle(state["session"].device, 2)
 
             # Step 2: Enter comment using ADB shell type
             print("⌨️ Step 2: Typing comment...")
 
             # Clear any existing text
-            state["device"].shell("input keyevent KEYCODE_CTRL_A")
-            time.sleep(0.5)
+            shell(state["session"].device, "input keyevent KEYCODE_CTRL_A")
+            pause(0.5)
 
             # Use robust text input
-            input_result = input_text_robust(state["device"], comment, max_attempts=2)
+            input_result = input_text_robust(
+                state["session"].device, comment, max_attempts=2
+            )
 
             if not input_result["success"]:
                 print(
                     f"❌ Comment typing failed: {input_result.get('error', 'Unknown error')}"
                 )
                 return {
-                    **state,
                     "current_screenshot": fresh_screenshot,
                     "last_action": "send_comment_with_typing",
                     "action_successful": False,
@@ -1131,13 +1369,15 @@ class LangGraphHingeAgent:
             # Step 3: Exit text input by tapping outside keyboard
             print("🔽 Step 3: Dismissing keyboard...")
 
-            dismiss_keyboard(state["device"], state["width"], state["height"])
-            time.sleep(2)
+            dismiss_keyboard(
+                state["session"].device, state["session"].width, state["session"].height
+            )
+            settle(state["session"].device, 2)
 
             # Step 4: Locate send button using CV
             print("🔍 Step 4: Finding send button with OpenCV...")
             send_screenshot = capture_screenshot(
-                state["device"], "send_button_detection"
+                state["session"].device, "send_button_detection"
             )
 
             cv_result = detect_send_button_cv(send_screenshot)
@@ -1149,26 +1389,36 @@ class LangGraphHingeAgent:
                 print(
                     f"✅ Send button found with CV at ({send_x}, {send_y}) - confidence: {confidence:.3f}"
                 )
+            elif initial_send_result.get("found"):
+                # Send button seen before typing; the layout is back after the keyboard closed
+                send_x = initial_send_result["x"]
+                send_y = initial_send_result["y"]
+                confidence = initial_send_result["confidence"]
+                print(
+                    f"⚠️ Using send button detected before typing at ({send_x}, {send_y})"
+                )
             else:
                 # Fallback coordinates based on typical Send Like button position
-                send_x = int(state["width"] * 0.67)  # Right side of screen
-                send_y = int(state["height"] * 0.75)  # Lower portion
+                send_x = int(state["session"].width * 0.67)  # Right side of screen
+                send_y = int(state["session"].height * 0.75)  # Lower portion
                 confidence = 0.5
                 print(f"⚠️ Using fallback send button coordinates ({send_x}, {send_y})")
 
             # Step 5: Tap the send button
             print("📤 Step 5: Tapping send button...")
-            tap_with_confidence(state["device"], send_x, send_y, confidence)
-            random_delay(2, 4)  # Variable delay after send
+            tap_with_confidence(state["session"].device, send_x, send_y, confidence)
+            settle(state["session"].device, 2, 4)  # Variable delay after send
 
             # Verify comment was sent by checking if we moved to new profile or interface closed
             verification_screenshot = capture_screenshot(
-                state["device"], "send_comment_verification"
+                state["session"].device, "send_comment_verification"
             )
 
             # Use profile change verification
             profile_verification = self._verify_profile_change_internal(
-                {**state, "current_screenshot": verification_screenshot}
+                verification_screenshot,
+                state["previous_screenshot"],
+                state["previous_profile"],
             )
 
             if profile_verification.get("profile_changed", False):
@@ -1176,7 +1426,6 @@ class LangGraphHingeAgent:
                     "✅ Consolidated comment process successful - moved to new profile"
                 )
                 return {
-                    **state,
                     "current_screenshot": verification_screenshot,
                     "comments_sent": state["comments_sent"] + 1,
                     "current_profile_index": state["current_profile_index"] + 1,
@@ -1188,7 +1437,7 @@ class LangGraphHingeAgent:
             else:
                 # Check if comment interface is gone (comment sent but stayed on profile)
                 still_in_comment = detect_comment_ui_elements(
-                    verification_screenshot, GEMINI_API_KEY
+                    verification_screenshot, GEMINI_API_KEY, client=self._gemini_client
                 )
 
                 if not still_in_comment.get("comment_field_found"):
@@ -1196,7 +1445,6 @@ class LangGraphHingeAgent:
                         "✅ Consolidated comment process successful (interface closed) - stayed on profile"
                     )
                     return {
-                        **state,
                         "current_screenshot": verification_screenshot,
                         "comments_sent": state["comments_sent"] + 1,
                         "last_action": "send_comment_with_typing",
@@ -1207,7 +1455,6 @@ class LangGraphHingeAgent:
                         "⚠️ Consolidated comment process may have failed - still in interface"
                     )
                     return {
-                        **state,
                         "current_screenshot": verification_screenshot,
                         "last_action": "send_comment_with_typing",
                         "action_successful": False,
@@ -1216,7 +1463,6 @@ class LangGraphHingeAgent:
         except Exception as e:
             print(f"❌ Consolidated comment process failed: {e}")
             return {
-                **state,
                 "errors_encountered": state["errors_encountered"] + 1,
                 "last_action": "send_comment_with_typing",
                 "action_successful": False,
@@ -1229,39 +1475,41 @@ class LangGraphHingeAgent:
         try:
             # Close any open comment interface first
             fresh_screenshot = capture_screenshot(
-                state["device"], "fallback_like_before_close"
+                state["session"].device, "fallback_like_before_close"
             )
 
             # Check if comment interface is still open
-            comment_ui = detect_comment_ui_elements(fresh_screenshot, GEMINI_API_KEY)
+            comment_ui = detect_comment_ui_elements(
+                fresh_screenshot, GEMINI_API_KEY, client=self._gemini_client
+            )
 
             if comment_ui.get("comment_field_found"):
                 print("📱 Closing comment interface...")
                 # Try to close comment interface using back key or tap outside
-                state["device"].shell("input keyevent KEYCODE_BACK")
-                time.sleep(2)
+                shell(state["session"].device, "input keyevent KEYCODE_BACK")
+                settle(state["session"].device, 2)
 
                 # Verify interface closed
                 post_close_screenshot = capture_screenshot(
-                    state["device"], "fallback_after_close"
+                    state["session"].device, "fallback_after_close"
                 )
                 comment_ui_check = detect_comment_ui_elements(
-                    post_close_screenshot, GEMINI_API_KEY
+                    post_close_screenshot, GEMINI_API_KEY, client=self._gemini_client
                 )
 
                 if comment_ui_check.get("comment_field_found"):
                     print("⚠️ Comment interface still open, trying tap outside...")
                     # Tap in upper area to close interface
                     tap(
-                        state["device"],
-                        int(state["width"] * 0.5),
-                        int(state["height"] * 0.2),
+                        state["session"].device,
+                        int(state["session"].width * 0.5),
+                        int(state["session"].height * 0.2),
                     )
-                    time.sleep(2)
+                    settle(state["session"].device, 2)
 
             # Take fresh screenshot for like button detection
             final_screenshot = capture_screenshot(
-                state["device"], "fallback_like_detection"
+                state["session"].device, "fallback_like_detection"
             )
 
             # Use CV-based like button detection
@@ -1270,7 +1518,6 @@ class LangGraphHingeAgent:
             if not cv_result.get("found"):
                 print("❌ Like button not found with CV in fallback mode")
                 return {
-                    **state,
                     "current_screenshot": final_screenshot,
                     "last_action": "send_like_without_comment",
                     "action_successful": False,
@@ -1285,31 +1532,16 @@ class LangGraphHingeAgent:
             print(f"   🎯 CV Confidence: {confidence:.3f}")
 
             # Execute the like tap
-            tap_with_confidence(state["device"], like_x, like_y, confidence)
-            random_delay(2, 4)  # Variable delay after like
+            tap_with_confidence(state["session"].device, like_x, like_y, confidence)
+            settle(state["session"].device, 2, 4)  # Variable delay after like
 
             # Verify like was successful by checking for profile change
             verification_screenshot = capture_screenshot(
-                state["device"], "fallback_like_verification"
+                state["session"].device, "fallback_like_verification"
             )
 
-            # Store previous profile data for verification
-            previous_profile_text = state.get("profile_text", "")
-            current_analysis = state.get("profile_analysis", {})
-            previous_profile_features = {
-                "age": current_analysis.get("estimated_age", 0),
-                "name": current_analysis.get("name", ""),
-                "location": current_analysis.get("location", ""),
-                "interests": current_analysis.get("interests", []),
-            }
-
             profile_verification = self._verify_profile_change_internal(
-                {
-                    **state,
-                    "current_screenshot": verification_screenshot,
-                    "previous_profile_text": previous_profile_text,
-                    "previous_profile_features": previous_profile_features,
-                }
+                verification_screenshot, final_screenshot, state["profile"]
             )
 
             if profile_verification.get("profile_changed", False):
@@ -1317,7 +1549,6 @@ class LangGraphHingeAgent:
                     "✅ Like sent successfully without comment - moved to new profile"
                 )
                 return {
-                    **state,
                     "current_screenshot": verification_screenshot,
                     "likes_sent": state["likes_sent"] + 1,
                     "current_profile_index": state["current_profile_index"] + 1,
@@ -1329,7 +1560,6 @@ class LangGraphHingeAgent:
             else:
                 print("⚠️ Fallback like may have failed - still on same profile")
                 return {
-                    **state,
                     "current_screenshot": verification_screenshot,
                     "last_action": "send_like_without_comment",
                     "action_successful": False,
@@ -1338,7 +1568,6 @@ class LangGraphHingeAgent:
         except Exception as e:
             print(f"❌ Send like without comment failed: {e}")
             return {
-                **state,
                 "errors_encountered": state["errors_encountered"] + 1,
                 "last_action": "send_like_without_comment",
                 "action_successful": False,
@@ -1347,43 +1576,35 @@ class LangGraphHingeAgent:
     def execute_dislike_node(self, state: HingeAgentState) -> HingeAgentState:
         """Execute dislike action with profile change verification"""
         print(
-            f"👎 Executing dislike: {state.get('decision_reason', 'criteria not met')}"
+            f"👎 Executing dislike: {state['profile'].decision_reason or 'criteria not met'}"
         )
 
         # Store previous profile data for verification
-        updated_state = {
-            **state,
-            "previous_profile_text": state.get("profile_text", ""),
-        }
-
-        current_analysis = state.get("profile_analysis", {})
-        updated_state["previous_profile_features"] = {
-            "age": current_analysis.get("estimated_age", 0),
-            "name": current_analysis.get("name", ""),
-            "location": current_analysis.get("location", ""),
-            "interests": current_analysis.get("interests", []),
+        changes = {
+            "previous_profile": state["profile"],
+            "previous_screenshot": state["current_screenshot"],
         }
 
         # Execute dislike tap
-        x_dislike = int(state["width"] * self.config.dislike_button_coords[0])
-        y_dislike = int(state["height"] * self.config.dislike_button_coords[1])
+        x_dislike = int(state["session"].width * self.config.dislike_button_coords[0])
+        y_dislike = int(state["session"].height * self.config.dislike_button_coords[1])
 
-        tap(state["device"], x_dislike, y_dislike)
-        random_delay(2, 4)  # Variable delay after dislike
+        tap(state["session"].device, x_dislike, y_dislike)
+        settle(state["session"].device, 2, 4)  # Variable delay after dislike
 
         # Verify dislike using profile change detection
         verification_screenshot = capture_screenshot(
-            state["device"], "dislike_verification"
+            state["session"].device, "dislike_verification"
         )
 
         profile_verification = self._verify_profile_change_internal(
-            {**updated_state, "current_screenshot": verification_screenshot}
+            verification_screenshot, state["current_screenshot"], state["profile"]
         )
 
         if profile_verification.get("profile_changed", False):
             print("✅ Dislike successful - moved to new profile")
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": verification_screenshot,
                 "current_profile_index": state["current_profile_index"] + 1,
                 "profiles_processed": state["profiles_processed"] + 1,
@@ -1394,7 +1615,7 @@ class LangGraphHingeAgent:
         else:
             print("⚠️ Dislike may have failed - still on same profile")
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": verification_screenshot,
                 "stuck_count": state["stuck_count"] + 1,
                 "last_action": "execute_dislike",
@@ -1406,33 +1627,30 @@ class LangGraphHingeAgent:
         print("➡️ Navigating to next profile...")
 
         # Store previous profile data for verification
-        updated_state = {
-            **state,
-            "previous_profile_text": state.get("profile_text", ""),
-        }
-
-        current_analysis = state.get("profile_analysis", {})
-        updated_state["previous_profile_features"] = {
-            "age": current_analysis.get("estimated_age", 0),
-            "name": current_analysis.get("name", ""),
-            "location": current_analysis.get("location", ""),
-            "interests": current_analysis.get("interests", []),
+        changes = {
+            "previous_profile": state["profile"],
+            "previous_screenshot": state["current_screenshot"],
         }
 
         # Execute navigation swipe
-        x1_swipe = int(state["width"] * 0.15)
-        y1_swipe = int(state["height"] * 0.5)
+        x1_swipe = int(state["session"].width * 0.15)
+        y1_swipe = int(state["session"].height * 0.5)
         x2_swipe = x1_swipe
         y2_swipe = int(y1_swipe * 0.75)
 
-        swipe(state["device"], x1_swipe, y1_swipe, x2_swipe, y2_swipe)
-        random_delay(2, 4)  # Variable delay after navigation
+        swipe(state["session"].device, x1_swipe, y1_swipe, x2_swipe, y2_swipe)
+        settle(state["session"].device, 2, 4)  # Variable delay after navigation
 
         # Verify navigation
-        nav_screenshot = capture_screenshot(state["device"], "navigation_verification")
+        nav_screenshot = capture_screenshot(
+            state["session"].device, "navigation_verification"
+        )
 
         profile_verification = self._verify_profile_change_internal(
-            {**updated_state, "current_screenshot": nav_screenshot}
+            nav_screenshot,
+            state["current_screenshot"],
+            state["profile"],
+            max_scroll=self.config.navigation_max_scroll,
         )
 
         if profile_verification.get("profile_changed", False):
@@ -1440,7 +1658,7 @@ class LangGraphHingeAgent:
                 f"✅ Navigation successful - moved to profile {state['current_profile_index'] + 2}"
             )
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": nav_screenshot,
                 "current_profile_index": state["current_profile_index"] + 1,
                 "profiles_processed": state["profiles_processed"] + 1,
@@ -1451,7 +1669,7 @@ class LangGraphHingeAgent:
         else:
             print("⚠️ Navigation failed - still on same profile")
             return {
-                **updated_state,
+                **changes,
                 "current_screenshot": nav_screenshot,
                 "stuck_count": state["stuck_count"] + 1,
                 "last_action": "navigate_to_next",
@@ -1462,7 +1680,11 @@ class LangGraphHingeAgent:
         """Verify if we've moved to a new profile"""
         print("🔍 Verifying profile change...")
 
-        verification_result = self._verify_profile_change_internal(state)
+        verification_result = self._verify_profile_change_internal(
+            state["current_screenshot"],
+            state["previous_screenshot"],
+            state["previous_profile"],
+        )
         profile_changed = verification_result.get("profile_changed", False)
         confidence = verification_result.get("confidence", 0)
 
@@ -1471,7 +1693,6 @@ class LangGraphHingeAgent:
         )
 
         return {
-            **state,
             "last_action": "verify_profile_change",
             "action_successful": profile_changed,
         }
@@ -1484,24 +1705,24 @@ class LangGraphHingeAgent:
         recovery_attempts = [
             # Aggressive horizontal swipe
             (
-                int(state["width"] * 0.9),
-                int(state["height"] * 0.5),
-                int(state["width"] * 0.1),
-                int(state["height"] * 0.5),
+                int(state["session"].width * 0.9),
+                int(state["session"].height * 0.5),
+                int(state["session"].width * 0.1),
+                int(state["session"].height * 0.5),
             ),
             # Vertical swipe down
             (
-                int(state["width"] * 0.5),
-                int(state["height"] * 0.3),
-                int(state["width"] * 0.5),
-                int(state["height"] * 0.7),
+                int(state["session"].width * 0.5),
+                int(state["session"].height * 0.3),
+                int(state["session"].width * 0.5),
+                int(state["session"].height * 0.7),
             ),
             # Diagonal swipe
             (
-                int(state["width"] * 0.8),
-                int(state["height"] * 0.3),
-                int(state["width"] * 0.2),
-                int(state["height"] * 0.7),
+                int(state["session"].width * 0.8),
+                int(state["session"].height * 0.3),
+                int(state["session"].width * 0.2),
+                int(state["session"].height * 0.7),
             ),
         ]
 
@@ -1509,26 +1730,27 @@ class LangGraphHingeAgent:
             print(
                 f"🔄 Recovery attempt {i + 1}: Swipe from ({x1}, {y1}) to ({x2}, {y2})"
             )
-            swipe(state["device"], x1, y1, x2, y2, duration=800)
-            time.sleep(2)
+            swipe(state["session"].device, x1, y1, x2, y2, duration=800)
+            settle(state["session"].device, 2)
 
             # Check if we're unstuck
             recovery_screenshot = capture_screenshot(
-                state["device"], f"recovery_attempt_{i}"
+                state["session"].device, f"recovery_attempt_{i}"
             )
             current_text = extract_text_from_image_gemini(
-                recovery_screenshot, GEMINI_API_KEY
+                recovery_screenshot, GEMINI_API_KEY, client=self._gemini_client
             )
 
-            if current_text != state.get("profile_text", ""):
+            if current_text != state["profile"].text:
                 print(f"✅ Recovery successful on attempt {i + 1}")
                 break
 
         # Capture final result
-        final_screenshot = capture_screenshot(state["device"], "recovery_result")
+        final_screenshot = capture_screenshot(
+            state["session"].device, "recovery_result"
+        )
 
         return {
-            **state,
             "current_screenshot": final_screenshot,
             "stuck_count": 0,  # Reset stuck count after recovery
             "last_action": "recover_from_stuck",
@@ -1541,21 +1763,19 @@ class LangGraphHingeAgent:
 
         try:
             # Use the reset function from helper_functions
-            reset_hinge_app(state["device"])
+            reset_hinge_app(state["session"].device)
 
             # Capture screenshot after app reset
             reset_screenshot = capture_screenshot(
-                state["device"], f"app_reset_{state['current_profile_index']}"
+                state["session"].device, f"app_reset_{state['current_profile_index']}"
             )
 
             # Reset state counters since we're starting fresh
             return {
-                **state,
                 "current_screenshot": reset_screenshot,
-                "profile_text": "",  # Clear previous profile data
-                "profile_analysis": {},
-                "previous_profile_text": "",
-                "previous_profile_features": {},
+                "profile": EMPTY_PROFILE,  # Clear previous profile data
+                "previous_profile": None,
+                "previous_screenshot": None,
                 "stuck_count": 0,  # Reset stuck count
                 "retry_count": 0,
                 "last_action": "reset_app",
@@ -1568,7 +1788,6 @@ class LangGraphHingeAgent:
         except Exception as e:
             print(f"❌ App reset failed: {e}")
             return {
-                **state,
                 "errors_encountered": state["errors_encountered"] + 1,
                 "last_action": "reset_app",
                 "action_successful": False,
@@ -1578,12 +1797,16 @@ class LangGraphHingeAgent:
         """Finalize the automation session"""
         print("🎉 Finalizing automation session...")
 
+        # Drain queued screenshot/comment writes and sync the comment store
+        flush_comment_store()
+        close_shell_sessions()
+
         # Update final success rates
         final_success_rates = calculate_template_success_rates()
         update_template_weights(final_success_rates)
 
         completion_reason = state.get("completion_reason", "Session completed")
-        if state["current_profile_index"] >= state["max_profiles"]:
+        if state["current_profile_index"] >= self.max_profiles:
             completion_reason = "Max profiles reached"
         elif state["errors_encountered"] > self.config.max_errors_before_abort:
             completion_reason = "Too many errors"
@@ -1591,36 +1814,83 @@ class LangGraphHingeAgent:
         print(
             f"📊 Final stats: {state['profiles_processed']} processed, {state['likes_sent']} likes, {state['comments_sent']} comments"
         )
+        gemini_cache = get_gemini_cache()
+        if gemini_cache.enabled:
+            print(
+                f"🗄️  Gemini cache: {gemini_cache.hits} hits, {gemini_cache.misses} misses"
+            )
 
         return {
-            **state,
             "should_continue": False,
             "completion_reason": completion_reason,
             "last_action": "finalize_session",
             "action_successful": True,
         }
 
-    def _verify_profile_change_internal(self, state: HingeAgentState) -> Dict[str, Any]:
-        """Internal helper for profile change verification"""
-        if not state["current_screenshot"]:
+    def _verify_profile_change_internal(
+        self,
+        current_screenshot: Optional[Frame],
+        previous_screenshot: Optional[Frame],
+        previous_profile: Optional[ProfileRecord],
+        max_scroll: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Internal helper for profile change verification. max_scroll is set
+        after vertical swipes, which move the header without changing profile.
+        """
+        if not current_screenshot:
             return {
                 "profile_changed": False,
                 "confidence": 0.0,
                 "message": "No screenshot available",
             }
 
+        # Compare against the pre-action frame locally first; Gemini is only
+        # consulted when the perceptual comparison is ambiguous
+        local_result = detect_screen_change(
+            previous_screenshot,
+            current_screenshot,
+            region=self.config.screen_change_region,
+            unchanged_similarity=self.config.screen_unchanged_similarity,
+            changed_similarity=self.config.screen_changed_similarity,
+            max_scroll=max_scroll,
+        )
+        if local_result["verdict"] == "scrolled":
+            print(
+                f"🔍 Local screen comparison: scrolled {local_result['scroll']:.2f} of the screen within the same profile"
+            )
+            return {
+                "profile_changed": False,
+                "confidence": 0.9,
+                "reasons": [f"Header scrolled: {local_result['scroll']:.2f}"],
+                "method": "perceptual",
+                "message": "Profile unchanged: header only scrolled",
+            }
+        if local_result["verdict"] != "ambiguous":
+            profile_changed = local_result["verdict"] == "changed"
+            print(
+                f"🔍 Local screen comparison: {local_result['verdict']} (similarity: {local_result['similarity']:.2f})"
+            )
+            return {
+                "profile_changed": profile_changed,
+                "confidence": 0.9,
+                "reasons": [f"Screen similarity: {local_result['similarity']:.2f}"],
+                "method": "perceptual",
+                "message": f"Profile {'changed' if profile_changed else 'unchanged'}: local screen comparison",
+            }
+
         # Extract current profile info
         current_text = extract_text_from_image_gemini(
-            state["current_screenshot"], GEMINI_API_KEY
+            current_screenshot, GEMINI_API_KEY, client=self._gemini_client
         )
 
         current_analysis = analyze_dating_ui_with_gemini(
-            state["current_screenshot"], GEMINI_API_KEY
+            current_screenshot, GEMINI_API_KEY, client=self._gemini_client
         )
 
         # Get previous profile info
-        previous_text = state.get("previous_profile_text", "")
-        previous_features = state.get("previous_profile_features", {})
+        previous_text = previous_profile.text if previous_profile else ""
+        previous_features = previous_profile.features if previous_profile else {}
 
         # If first profile, consider it new
         if not previous_text and not previous_features:
@@ -1700,146 +1970,127 @@ class LangGraphHingeAgent:
             "message": f"Profile {'changed' if profile_changed else 'unchanged'}: {', '.join(reasons) if reasons else 'similar content'}",
         }
 
-    def run_automation(self) -> Dict[str, Any]:
-        """Run the complete LangGraph automation workflow with batch processing"""
-        print("🚀 Starting LangGraph-powered Hinge automation with batch processing...")
-        print(
-            f"📊 Processing {self.max_profiles} profiles in batches of {self.profiles_per_batch}"
+    def _recursion_limit(self) -> int:
+        """Graph steps allowed for the whole run (every node execution is one step)"""
+        return self.max_profiles * self.config.max_graph_steps_per_profile + 10
+
+    def _initial_state(self) -> HingeAgentState:
+        return HingeAgentState(
+            current_profile_index=0,
+            profiles_processed=0,
+            likes_sent=0,
+            comments_sent=0,
+            errors_encountered=0,
+            stuck_count=0,
+            current_screenshot=None,
+            profile=EMPTY_PROFILE,
+            comment_interface_open=False,
+            previous_profile=None,
+            previous_screenshot=None,
+            last_action="",
+            action_successful=True,
+            retry_count=0,
+            should_continue=True,
+            completion_reason="",
+            gemini_reasoning="",
+            next_tool_suggestion="",
         )
 
-        # Initialize cumulative results
-        total_results = {
-            "success": True,
-            "profiles_processed": 0,
-            "likes_sent": 0,
-            "comments_sent": 0,
-            "errors_encountered": 0,
-            "completion_reason": "Session completed",
-            "batches_completed": 0,
-            "final_success_rates": {},
-        }
-
-        # Calculate number of batches needed
-        num_batches = (
-            self.max_profiles + self.profiles_per_batch - 1
-        ) // self.profiles_per_batch
-        print(f"📦 Will process {num_batches} batches")
-
-        # Initialize device connection state that persists across batches
-        device = None
-        width = height = 0
-
-        for batch_num in range(num_batches):
-            batch_start = batch_num * self.profiles_per_batch
-            batch_end = min(batch_start + self.profiles_per_batch, self.max_profiles)
-
-            print(
-                f"\n🎯 Starting batch {batch_num + 1}/{num_batches} (profiles {batch_start + 1}-{batch_end})"
-            )
+    def stream_automation(self) -> Iterator[AutomationEvent]:
+        """
+        Run the automation workflow, yielding an AutomationEvent after every
+        graph step and a final "session_end" event. Closing the generator
+        early (e.g. breaking out of the loop) stops the run.
+        """
+        reset_timing()
+        recursion_limit = self._recursion_limit()
+        print(
+            f"📊 Processing {self.max_profiles} profiles (graph step limit: {recursion_limit})"
+        )
 
-            # Create initial state for this batch
-            batch_state = HingeAgentState(
-                device=device,  # Reuse device connection
-                width=width,
-                height=height,
-                max_profiles=self.max_profiles,
-                current_profile_index=batch_start,
-                profiles_processed=total_results["profiles_processed"],
-                likes_sent=total_results["likes_sent"],
-                comments_sent=total_results["comments_sent"],
-                errors_encountered=total_results["errors_encountered"],
-                stuck_count=0,
-                current_screenshot=None,
-                profile_text="",
-                profile_analysis={},
-                decision_reason="",
-                previous_profile_text="",
-                previous_profile_features={},
-                last_action="",
-                action_successful=True,
-                retry_count=0,
-                generated_comment="",
-                comment_id="",
-                like_button_coords=None,
-                like_button_confidence=0.0,
-                should_continue=True,
-                completion_reason="",
-                gemini_reasoning="",
-                next_tool_suggestion="",
-                batch_start_index=batch_start,
+        state = self._initial_state()
+        start = last = time.perf_counter()
+        step = 0
+        completion_reason = "Session completed"
+        error = ""
+
+        def event(node, successful, duration, reason="", error=""):
+            return AutomationEvent(
+                node=node,
+                step=step,
+                duration=duration,
+                elapsed=time.perf_counter() - start,
+                successful=successful,
+                profile_index=state["current_profile_index"],
+                profiles_processed=state["profiles_processed"],
+                likes_sent=state["likes_sent"],
+                comments_sent=state["comments_sent"],
+                errors_encountered=state["errors_encountered"],
+                completion_reason=reason,
+                error=error,
             )
 
-            # Execute batch workflow
+        updates = self.graph.stream(
+            state, config={"recursion_limit": recursion_limit}, stream_mode="updates"
+        )
+        try:
             try:
-                print(f"⚡ Executing LangGraph workflow for batch {batch_num + 1}")
-                batch_final_state = self.graph.invoke(batch_state)
-
-                # Update persistent device state for next batch
-                device = batch_final_state.get("device")
-                width = batch_final_state.get("width", width)
-                height = batch_final_state.get("height", height)
-
-                # Accumulate results
-                total_results["profiles_processed"] = batch_final_state.get(
-                    "profiles_processed", total_results["profiles_processed"]
-                )
-                total_results["likes_sent"] = batch_final_state.get(
-                    "likes_sent", total_results["likes_sent"]
-                )
-                total_results["comments_sent"] = batch_final_state.get(
-                    "comments_sent", total_results["comments_sent"]
-                )
-                total_results["errors_encountered"] = batch_final_state.get(
-                    "errors_encountered", total_results["errors_encountered"]
-                )
-                total_results["batches_completed"] = batch_num + 1
-
-                # Check if we should stop due to errors
-                if (
-                    total_results["errors_encountered"]
-                    > self.config.max_errors_before_abort
-                ):
-                    print(
-                        f"⚠️ Stopping automation due to too many errors: {total_results['errors_encountered']}"
-                    )
-                    total_results["completion_reason"] = "Too many errors"
-                    break
-
-                print(
-                    f"✅ Batch {batch_num + 1} completed - Processed: {batch_final_state.get('profiles_processed', 0)}, Likes: {batch_final_state.get('likes_sent', 0)}, Comments: {batch_final_state.get('comments_sent', 0)}"
-                )
-
+                for update in updates:
+                    for node, changes in update.items():
+                        changes = changes or {}
+                        state.update(changes)
+                        now = time.perf_counter()
+                        step += 1
+                        successful = changes.get("action_successful", True)
+                        yield event(node, successful, now - last)
+                        # Time the consumer spends handling the event is not counted
+                        last = time.perf_counter()
+                completion_reason = state["completion_reason"] or completion_reason
+            except GraphRecursionError:
+                print(f"⚠️ Stopping automation after {recursion_limit} graph steps")
+                completion_reason = "Graph step limit reached"
             except Exception as e:
-                print(f"❌ Batch {batch_num + 1} failed: {e}")
-                total_results["errors_encountered"] += 1
-                total_results["success"] = False
-
-                # If first batch fails, it's likely a setup issue
-                if batch_num == 0:
-                    return {
-                        **total_results,
-                        "error": str(e),
-                        "completion_reason": f"Failed on first batch: {e}",
-                    }
+                print(f"❌ Automation failed: {e}")
+                completion_reason = f"Failed: {e}"
+                error = str(e)
+
+            yield event("session_end", not error, 0.0, completion_reason, error)
+        finally:
+            updates.close()
+            # Normally done by finalize_session; also covers failed or stopped runs
+            flush_comment_store()
+            close_shell_sessions()
+            self._shutdown_extraction_pool()
 
-                # For later batches, try to continue with remaining batches
-                print(
-                    f"⚠️ Continuing with next batch despite error in batch {batch_num + 1}"
-                )
-                continue
-
-        # Final update of success rates
-        total_results["final_success_rates"] = calculate_template_success_rates()
+    def run_automation(self) -> Dict[str, Any]:
+        """Run the complete LangGraph automation workflow and return a summary"""
+        print("🚀 Starting LangGraph-powered Hinge automation...")
+
+        for event in self.stream_automation():
+            pass
+
+        results = {
+            "success": not event.error,
+            "profiles_processed": event.profiles_processed,
+            "likes_sent": event.likes_sent,
+            "comments_sent": event.comments_sent,
+            "errors_encountered": event.errors_encountered + (1 if event.error else 0),
+            "completion_reason": event.completion_reason,
+            # Final update of success rates
+            "final_success_rates": calculate_template_success_rates(),
+        }
+        if event.error:
+            results["error"] = event.error
 
         print("\n🎉 Automation completed!")
         print(
-            f"📊 Total stats: {total_results['profiles_processed']} processed, {total_results['likes_sent']} likes, {total_results['comments_sent']} comments"
-        )
-        print(
-            f"📦 Batches completed: {total_results['batches_completed']}/{num_batches}"
+            f"📊 Total stats: {results['profiles_processed']} processed, {results['likes_sent']} likes, {results['comments_sent']} comments"
         )
 
-        return total_results
+        if self.config.enable_timing:
+            results["timing"] = timing_report()
+
+        return results
 
 
 # Usage example for testing
@@ -7,9 +7,20 @@ This uses Gemini AI to intelligently select and execute tools for dating app aut
 
 import asyncio
 import argparse
+import json
 from typing import Dict, Any
 
+from gemini_client import get_gemini_client
+from helper_functions import connect_device, set_sleep_scale
 from langgraph_hinge_agent import LangGraphHingeAgent
+from replay import (
+    RecordingDevice,
+    RecordingGeminiClient,
+    ReplayDevice,
+    ReplayGeminiClient,
+    SessionRecorder,
+    SessionReplay,
+)
 from agent_config import AgentConfig, DEFAULT_CONFIG, FAST_CONFIG, CONSERVATIVE_CONFIG
 
 
@@ -48,6 +59,37 @@ def parse_arguments():
         "--no-screenshots", action="store_true", help="Disable screenshot saving"
     )
 
+    parser.add_argument(
+        "--raw-capture",
+        action="store_true",
+        help="Capture raw framebuffer instead of device-encoded PNG screenshots",
+    )
+
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record device and Gemini traffic of this session to a fixture directory",
+    )
+
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Replay a recorded session offline (no device or API key needed)",
+    )
+
+    parser.add_argument(
+        "--replay-latency",
+        choices=["zero", "original"],
+        default="zero",
+        help="Replay with zero latency or the recorded device/Gemini latency",
+    )
+
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Record per-node and per-dependency latencies and print a timing report",
+    )
+
     return parser.parse_args()
 
 
@@ -67,10 +109,68 @@ def get_config(config_name: str, args) -> AgentConfig:
     config.device_ip = args.device_ip
     config.verbose_logging = args.verbose
     config.save_screenshots = not args.no_screenshots
+    if args.raw_capture:
+        config.screenshot_capture_mode = "raw"
+    if args.timing:
+        config.enable_timing = True
 
     return config
 
 
+def create_agent(config: AgentConfig, args):
+    """
+    Create the agent, wired to a recording or replayed session if requested.
+    Returns (agent, recorder or None, replay or None).
+    """
+    if args.replay:
+        replay = SessionReplay(args.replay, latency=args.replay_latency)
+        config.max_profiles = replay.metadata.get("max_profiles", config.max_profiles)
+        config.save_screenshots = False
+        config.gemini_cache_enabled = False
+        if args.replay_latency == "zero":
+            set_sleep_scale(0)
+        print(
+            f"⏪ Replaying session from {args.replay} ({args.replay_latency} latency)"
+        )
+        return (
+            LangGraphHingeAgent(
+                max_profiles=config.max_profiles,
+                config=config,
+                gemini_client=ReplayGeminiClient(replay),
+                device=ReplayDevice(replay),
+            ),
+            None,
+            replay,
+        )
+
+    if args.record:
+        device = connect_device(config.device_ip)
+        if not device:
+            raise RuntimeError("No device connected to record from")
+        recorder = SessionRecorder(
+            args.record, metadata={"max_profiles": config.max_profiles}
+        )
+        # Every request must reach Gemini to be recorded
+        config.gemini_cache_enabled = False
+        print(f"⏺️  Recording session to {args.record}")
+        return (
+            LangGraphHingeAgent(
+                max_profiles=config.max_profiles,
+                config=config,
+                gemini_client=RecordingGeminiClient(get_gemini_client(), recorder),
+                device=RecordingDevice(device, recorder),
+            ),
+            recorder,
+            None,
+        )
+
+    return (
+        LangGraphHingeAgent(max_profiles=config.max_profiles, config=config),
+        None,
+        None,
+    )
+
+
 def print_session_summary(result: Dict[str, Any]):
     """Print a summary of the automation session"""
     print("\n" + "=" * 60)
@@ -85,6 +185,18 @@ def print_session_summary(result: Dict[str, Any]):
     if result.get("final_success_rates"):
         print(f"📈 Final Success Rates: {result['final_success_rates']}")
 
+    if result.get("replay"):
+        drift = result["replay"]
+        status = "✅" if drift["deterministic"] else "⚠️ "
+        print(
+            f"{status} Replay drift: {drift['shell_mismatches']} shell and "
+            f"{drift['gemini_mismatches']} Gemini requests differed from the recording"
+        )
+
+    if result.get("timing"):
+        print("⏱️  Timing Report (p50/p95/max per node and dependency):")
+        print(json.dumps(result["timing"], indent=2))
+
     success = result.get("success", False)
     if success:
         print("✅ Session: Completed Successfully")
@@ -111,11 +223,12 @@ async def main():
         print(f"🎯 Max Profiles: {config.max_profiles}")
         print(f"🔊 Verbose Logging: {config.verbose_logging}")
         print(f"📸 Save Screenshots: {config.save_screenshots}")
+        print(f"🖼️  Capture Mode: {config.screenshot_capture_mode}")
         print("🤖 AI Controller: Google Gemini + LangGraph")
         print()
 
         # Create and run LangGraph-powered agent
-        agent = LangGraphHingeAgent(max_profiles=config.max_profiles, config=config)
+        agent, recorder, replay = create_agent(config, args)
 
         # Run automation
         print("🎬 Starting LangGraph-powered automation workflow...")
@@ -123,6 +236,13 @@ async def main():
             "🧠 LangGraph + Gemini will manage state and intelligently route actions..."
         )
         result = agent.run_automation()
+        if recorder:
+            recorder.close()
+        if replay:
+            # A replay that diverged from its recording is not a valid regression run
+            result["replay"] = replay.drift()
+            if not result["replay"]["deterministic"]:
+                result["success"] = False
 
         # Print summary
         print_session_summary(result)
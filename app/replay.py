@@ -0,0 +1,279 @@
+# app/replay.py
+
+"""
+Record/replay of device and Gemini traffic.
+Record mode wraps a real ADB device and Gemini client and saves every shell
+command, screencap and Gemini request/response of a session to a fixture
+directory. Replay mode serves the same traffic back through fake objects, with
+the original or zero latency, so the full agent graph can run without a phone
+or an API key.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Optional
+
+from background_writer import get_background_writer
+
+SESSION_FILE = "session.jsonl"
+FRAMES_DIR = "frames"
+
+
+def request_key(model: str, contents: list, config=None) -> str:
+    """Stable digest of a Gemini request (text, image bytes and response type)"""
+    digest = hashlib.sha256(model.encode())
+    for part in contents:
+        if isinstance(part, str):
+            digest.update(b"\0t" + part.encode())
+        elif getattr(part, "inline_data", None) is not None:
+            digest.update(b"\0i" + hashlib.sha256(part.inline_data.data).digest())
+        else:
+            digest.update(b"\0p" + repr(part).encode())
+    mime_type = getattr(config, "response_mime_type", None) if config else None
+    digest.update(b"\0c" + str(mime_type).encode())
+    return digest.hexdigest()
+
+
+class _Response:
+    """Minimal stand-in for a GenerateContentResponse"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+# Recording
+class SessionRecorder:
+    """Appends session events (and screencap frames) to a fixture directory"""
+
+    def __init__(self, directory: str, metadata: dict = None):
+        self.directory = directory
+        self._frame_count = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, FRAMES_DIR), exist_ok=True)
+        # Start a fresh session file
+        with open(os.path.join(directory, SESSION_FILE), "w") as f:
+            f.write(json.dumps({"type": "session", **(metadata or {})}) + "\n")
+
+    def record(self, event: dict, frame_bytes: bytes = None):
+        with self._lock:
+            if frame_bytes is not None:
+                self._frame_count += 1
+                event["frame"] = f"{FRAMES_DIR}/{self._frame_count:06d}.png"
+            get_background_writer().submit(self._write, event, frame_bytes)
+
+    def _write(self, event: dict, frame_bytes: Optional[bytes]):
+        if frame_bytes is not None:
+            with open(os.path.join(self.directory, event["frame"]), "wb") as f:
+                f.write(frame_bytes)
+        with open(os.path.join(self.directory, SESSION_FILE), "a") as f:
+            f.write(json.dumps(event) + "\n")
+
+    def close(self):
+        get_background_writer().flush()
+
+
+class RecordingDevice:
+    """Proxies a ppadb device and records shell commands and screencaps"""
+
+    # Raw framebuffer reads are not recorded; capture falls back to PNG
+    supports_raw_capture = False
+
+    def __init__(self, device, recorder: SessionRecorder):
+        self._device = device
+        self._recorder = recorder
+        self.serial = device.serial
+
+    def shell(self, command):
+        start = time.perf_counter()
+        output = self._device.shell(command)
+        self._recorder.record(
+            {
+                "type": "shell",
+                "command": command,
+                "output": output,
+                "latency": time.perf_counter() - start,
+            }
+        )
+        return output
+
+    def screencap(self):
+        start = time.perf_counter()
+        result = bytes(self._device.screencap())
+        self._recorder.record(
+            {"type": "screencap", "latency": time.perf_counter() - start},
+            frame_bytes=result,
+        )
+        return result
+
+    def record_wait_polls(self, polls: int):
+        """Record how many captures a stable-screen wait took"""
+        self._recorder.record({"type": "wait", "polls": polls})
+
+
+class _RecordingModels:
+    def __init__(self, models, recorder: SessionRecorder):
+        self._models = models
+        self._recorder = recorder
+
+    def generate_content(self, model, contents, config=None):
+        start = time.perf_counter()
+        response = self._models.generate_content(
+            model=model, contents=contents, config=config
+        )
+        self._recorder.record(
+            {
+                "type": "gemini",
+                "key": request_key(model, contents, config),
+                "text": response.text,
+                "latency": time.perf_counter() - start,
+            }
+        )
+        return response
+
+
+class RecordingGeminiClient:
+    """Proxies a genai.Client and records request/response pairs"""
+
+    def __init__(self, client, recorder: SessionRecorder):
+        self.models = _RecordingModels(client.models, recorder)
+
+
+# Replay
+class SessionReplay:
+    """Recorded session events, served back in order"""
+
+    def __init__(self, directory: str, latency: str = "zero"):
+        if latency not in ("zero", "original"):
+            raise ValueError(f"Unknown replay latency mode: {latency}")
+        self.directory = directory
+        self.latency = latency
+        self.metadata = {}
+        self._shell = deque()
+        self._screencaps = deque()
+        self._waits = deque()
+        self._gemini = defaultdict(deque)
+        self._gemini_order = deque()
+        self._last_frame = b""
+        self._lock = threading.Lock()
+        # Requests that differed from the recording, see drift()
+        self.shell_mismatches = 0
+        self.gemini_mismatches = 0
+
+        with open(os.path.join(directory, SESSION_FILE), "r") as f:
+            for line in f:
+                event = json.loads(line)
+                kind = event.pop("type")
+                if kind == "session":
+                    self.metadata = event
+                elif kind == "shell":
+                    self._shell.append(event)
+                elif kind == "screencap":
+                    self._screencaps.append(event)
+                elif kind == "wait":
+                    self._waits.append(event)
+                elif kind == "gemini":
+                    self._gemini[event["key"]].append(event)
+                    self._gemini_order.append(event)
+
+    def _wait(self, event: dict):
+        if self.latency == "original":
+            time.sleep(event.get("latency", 0))
+
+    def next_shell_output(self, command: str) -> str:
+        with self._lock:
+            event = self._shell.popleft() if self._shell else None
+        if event is None:
+            with self._lock:
+                self.shell_mismatches += 1
+            print(f"⚠️  Replay: no recorded shell command left for '{command}'")
+            return ""
+        # Tap coordinates are randomized, so only the command itself is compared
+        if event["command"].split()[:2] != command.split()[:2]:
+            with self._lock:
+                self.shell_mismatches += 1
+            print(f"⚠️  Replay: expected '{event['command']}', got '{command}'")
+        self._wait(event)
+        return event["output"]
+
+    def next_screencap(self) -> bytes:
+        with self._lock:
+            event = self._screencaps.popleft() if self._screencaps else None
+            if event is not None:
+                with open(os.path.join(self.directory, event["frame"]), "rb") as f:
+                    self._last_frame = f.read()
+        if event is not None:
+            self._wait(event)
+        # Once the recording is exhausted the screen stays on its last frame
+        return self._last_frame
+
+    def next_wait_polls(self):
+        """Poll count of the next recorded stable-screen wait (None if exhausted)"""
+        with self._lock:
+            event = self._waits.popleft() if self._waits else None
+        return event["polls"] if event is not None else None
+
+    def gemini_response(self, key: str) -> str:
+        with self._lock:
+            matches = self._gemini[key]
+            if matches:
+                event = matches.popleft()
+                self._gemini_order.remove(event)
+            elif self._gemini_order:
+                # Request differs from the recording: fall back to recorded order
+                self.gemini_mismatches += 1
+                event = self._gemini_order.popleft()
+                self._gemini[event["key"]].remove(event)
+            else:
+                raise RuntimeError("Replay: no recorded Gemini response left")
+        self._wait(event)
+        return event["text"]
+
+    def drift(self) -> dict:
+        """How far the replayed session diverged from the recording"""
+        with self._lock:
+            return {
+                "shell_mismatches": self.shell_mismatches,
+                "gemini_mismatches": self.gemini_mismatches,
+                "unused_shell_commands": len(self._shell),
+                "unused_gemini_responses": len(self._gemini_order),
+                "deterministic": not (self.shell_mismatches or self.gemini_mismatches),
+            }
+
+
+class ReplayDevice:
+    """Fake ppadb device serving recorded shell output and screencaps"""
+
+    serial = "replay"
+    supports_raw_capture = False
+
+    def __init__(self, replay: SessionReplay):
+        self._replay = replay
+
+    def shell(self, command):
+        return self._replay.next_shell_output(command)
+
+    def screencap(self):
+        return self._replay.next_screencap()
+
+    def next_wait_polls(self):
+        return self._replay.next_wait_polls()
+
+
+class _ReplayModels:
+    def __init__(self, replay: SessionReplay):
+        self._replay = replay
+
+    def generate_content(self, model, contents, config=None):
+        key = request_key(model, contents, config)
+        return _Response(self._replay.gemini_response(key))
+
+
+class ReplayGeminiClient:
+    """Fake genai.Client serving recorded responses"""
+
+    def __init__(self, replay: SessionReplay):
+        self.models = _ReplayModels(replay)
@@ -0,0 +1,178 @@
+# app/screen_change.py
+
+"""
+Local screen-change detection using perceptual hashes and downscaled SSIM.
+Used to tell whether an action moved to a new profile without asking Gemini,
+escalating only when the local comparison is ambiguous.
+"""
+
+from typing import Any, Dict
+
+import cv2
+import numpy as np
+
+from frame import Frame
+
+# Profile header region as screen fractions (x1, y1, x2, y2), below the status bar
+DEFAULT_HEADER_REGION = (0.0, 0.06, 1.0, 0.45)
+
+# Width the compared region is downscaled to before computing SSIM
+SSIM_WIDTH = 96
+
+
+def _crop_region(gray: np.ndarray, region: tuple) -> np.ndarray:
+    height, width = gray.shape[:2]
+    x1, y1, x2, y2 = region
+    return gray[int(y1 * height) : int(y2 * height), int(x1 * width) : int(x2 * width)]
+
+
+def dhash(gray: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """Difference hash: compares adjacent pixels of a (hash_size+1) x hash_size thumbnail"""
+    thumbnail = cv2.resize(
+        gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA
+    )
+    return (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+
+
+def hamming_distance(hash_a: np.ndarray, hash_b: np.ndarray) -> int:
+    return int(np.count_nonzero(hash_a != hash_b))
+
+
+def ssim(gray_a: np.ndarray, gray_b: np.ndarray) -> float:
+    """Mean structural similarity of two equally sized grayscale images"""
+    a = gray_a.astype(np.float64)
+    b = gray_b.astype(np.float64)
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+
+    mu_a = cv2.GaussianBlur(a, (7, 7), 1.5)
+    mu_b = cv2.GaussianBlur(b, (7, 7), 1.5)
+    sigma_a = cv2.GaussianBlur(a * a, (7, 7), 1.5) - mu_a * mu_a
+    sigma_b = cv2.GaussianBlur(b * b, (7, 7), 1.5) - mu_b * mu_b
+    sigma_ab = cv2.GaussianBlur(a * b, (7, 7), 1.5) - mu_a * mu_b
+
+    ssim_map = ((2 * mu_a * mu_b + c1) * (2 * sigma_ab + c2)) / (
+        (mu_a * mu_a + mu_b * mu_b + c1) * (sigma_a + sigma_b + c2)
+    )
+    return float(ssim_map.mean())
+
+
+def compare_frames(
+    before: Frame, after: Frame, region: tuple = DEFAULT_HEADER_REGION
+) -> Dict[str, Any]:
+    """
+    Compare the same region of two frames.
+
+    Returns:
+        dict: {
+            'hash_distance': int (0-64),
+            'ssim': float,
+            'similarity': float (0.0 = completely different, 1.0 = identical)
+        }
+    """
+    return _region_similarity(
+        _crop_region(before.gray, region), _crop_region(after.gray, region)
+    )
+
+
+def _region_similarity(region_a: np.ndarray, region_b: np.ndarray) -> Dict[str, Any]:
+    # Compare at a fixed small size so both cost and noise sensitivity stay low
+    height = max(1, int(region_a.shape[0] * SSIM_WIDTH / max(1, region_a.shape[1])))
+    small_a = cv2.resize(region_a, (SSIM_WIDTH, height), interpolation=cv2.INTER_AREA)
+    small_b = cv2.resize(region_b, (SSIM_WIDTH, height), interpolation=cv2.INTER_AREA)
+
+    hash_distance = hamming_distance(dhash(small_a), dhash(small_b))
+    structural_similarity = ssim(small_a, small_b)
+    similarity = 0.5 * max(0.0, structural_similarity) + 0.5 * (1 - hash_distance / 64)
+
+    return {
+        "hash_distance": hash_distance,
+        "ssim": structural_similarity,
+        "similarity": similarity,
+    }
+
+
+def find_scrolled_region(
+    before: Frame, after: Frame, region: tuple, max_scroll: float
+) -> Dict[str, Any]:
+    """
+    Look for the region of the earlier frame moved up by up to max_scroll
+    (fraction of screen height), as after a vertical swipe within the same
+    screen. The lower part of the region, which stays inside it for any such
+    scroll, is matched against the region of the later frame.
+
+    Returns:
+        dict: {
+            'scroll': float (fraction of screen height the content moved up),
+            'similarity': float,
+            'hash_distance': int,
+            'ssim': float
+        }
+    """
+    height = before.gray.shape[0]
+    x1, y1, x2, y2 = region
+    shift = int(min(max_scroll, (y2 - y1) / 2) * height)
+    top, bottom = int(y1 * height), int(y2 * height)
+    if shift <= 0:
+        return {"scroll": 0.0, **compare_frames(before, after, region)}
+
+    width = before.gray.shape[1]
+    left, right = int(x1 * width), int(x2 * width)
+    template = before.gray[top + shift : bottom, left:right]
+    window = after.gray[top:bottom, left:right]
+
+    # Locate the band at reduced size, then score it like any other comparison
+    scale = SSIM_WIDTH / max(1, template.shape[1])
+    small_template = cv2.resize(template, None, fx=scale, fy=scale)
+    small_window = cv2.resize(window, None, fx=scale, fy=scale)
+    scores = cv2.matchTemplate(small_window, small_template, cv2.TM_CCOEFF_NORMED)
+    offset = int(np.argmax(scores[:, 0]) / scale)
+    offset = min(offset, shift)
+
+    moved = after.gray[top + offset : top + offset + template.shape[0], left:right]
+    return {
+        "scroll": (shift - offset) / height,
+        **_region_similarity(template, moved),
+    }
+
+
+def detect_screen_change(
+    before: Frame,
+    after: Frame,
+    region: tuple = DEFAULT_HEADER_REGION,
+    unchanged_similarity: float = 0.9,
+    changed_similarity: float = 0.6,
+    max_scroll: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Decide locally whether the screen changed between two frames. With
+    max_scroll, a region that only moved up by up to that fraction of the
+    screen height is reported as 'scrolled' rather than changed.
+
+    Returns:
+        dict: {
+            'verdict': 'changed' | 'unchanged' | 'scrolled' | 'ambiguous',
+            'similarity': float,
+            'hash_distance': int,
+            'ssim': float
+        }
+    """
+    if before is None or after is None or before.gray is None or after.gray is None:
+        return {"verdict": "ambiguous", "similarity": 0.0}
+
+    comparison = compare_frames(before, after, region)
+    similarity = comparison["similarity"]
+
+    if similarity >= unchanged_similarity:
+        verdict = "unchanged"
+    elif similarity <= changed_similarity:
+        verdict = "changed"
+    else:
+        verdict = "ambiguous"
+
+    if verdict != "unchanged" and max_scroll > 0:
+        scrolled = find_scrolled_region(before, after, region, max_scroll)
+        if scrolled["similarity"] >= unchanged_similarity:
+            return {"verdict": "scrolled", **scrolled}
+
+    return {"verdict": verdict, **comparison}
@@ -0,0 +1,275 @@
+# app/template_matcher.py
+
+"""
+Template registry and coarse-to-fine matcher for the OpenCV button detectors.
+Templates are loaded and preprocessed once, then matched on a downscaled
+pyramid level inside a per-template region of interest before being refined
+at full resolution around the best few coarse candidates.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# Smallest template side (in pixels) that is still matched on the coarse level
+MIN_COARSE_TEMPLATE_SIDE = 24
+
+# Coarse candidates refined at full resolution; the best coarse score can
+# belong to a look-alike that only loses once compared at full detail
+COARSE_CANDIDATES = 3
+
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    """A UI element template and where to look for it"""
+
+    name: str
+    filename: str
+    threshold: float
+    # Region of interest as screen fractions: x1, y1, x2, y2
+    roi: tuple = (0.0, 0.0, 1.0, 1.0)
+
+
+DEFAULT_TEMPLATES = (
+    TemplateSpec("like_button", "like_button.png", 0.7),
+    # Lower threshold for send button as it may have different styles
+    TemplateSpec("send_button", "send_button.png", 0.6, roi=(0.0, 0.5, 1.0, 1.0)),
+    # Lower threshold for comment field as text may vary
+    TemplateSpec("comment_field", "comment_field.png", 0.6, roi=(0.0, 0.25, 1.0, 1.0)),
+)
+
+
+@dataclass
+class LoadedTemplate:
+    """Preprocessed template ready for matching"""
+
+    spec: TemplateSpec
+    gray: np.ndarray
+    coarse: Optional[np.ndarray]
+    scale: float
+
+    @property
+    def width(self) -> int:
+        return self.gray.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.gray.shape[0]
+
+
+class TemplateMatcher:
+    """Registry of preprocessed templates with pyramid + ROI matching"""
+
+    def __init__(
+        self,
+        specs=DEFAULT_TEMPLATES,
+        assets_dir: str = ASSETS_DIR,
+        pyramid_scale: float = 0.25,
+    ):
+        self.specs: Dict[str, TemplateSpec] = {spec.name: spec for spec in specs}
+        self.assets_dir = assets_dir
+        self.pyramid_scale = pyramid_scale
+        self.templates: Dict[str, LoadedTemplate] = {}
+        self._executor = None
+        self.load()
+
+    def load(self):
+        """Load and preprocess every registered template"""
+        self.templates = {}
+        for spec in self.specs.values():
+            template = self._load_template(spec)
+            if template is not None:
+                self.templates[spec.name] = template
+
+    def _load_template(self, spec: TemplateSpec) -> Optional[LoadedTemplate]:
+        template_path = os.path.join(self.assets_dir, spec.filename)
+        if not os.path.exists(template_path):
+            print(f"❌ Template not found: {template_path}")
+            return None
+
+        template = cv2.imread(template_path)
+        if template is None:
+            print(f"❌ Could not load template: {template_path}")
+            return None
+
+        gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+
+        # Pick the coarsest level that keeps the template recognisable
+        scale = max(self.pyramid_scale, MIN_COARSE_TEMPLATE_SIDE / min(gray.shape))
+        coarse = None
+        if scale < 1.0:
+            coarse = cv2.resize(
+                gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+            )
+        else:
+            scale = 1.0
+
+        return LoadedTemplate(spec=spec, gray=gray, coarse=coarse, scale=scale)
+
+    def set_roi(self, name: str, roi: tuple):
+        """Change the region of interest for a registered template"""
+        self.specs[name] = replace(self.specs[name], roi=tuple(roi))
+        if name in self.templates:
+            self.templates[name].spec = self.specs[name]
+
+    def match(self, name: str, screenshot_gray: np.ndarray) -> dict:
+        """
+        Find a template in a grayscale screenshot.
+
+        Returns:
+            dict: {
+                'found': bool,
+                'x': int,
+                'y': int,
+                'confidence': float,
+                'width': int,
+                'height': int,
+                'top_left_x': int,
+                'top_left_y': int,
+                'threshold': float
+            }
+        """
+        template = self.templates.get(name)
+        if template is None:
+            return {"found": False, "confidence": 0.0}
+
+        spec = template.spec
+        screen_height, screen_width = screenshot_gray.shape[:2]
+        roi_x1 = int(spec.roi[0] * screen_width)
+        roi_y1 = int(spec.roi[1] * screen_height)
+        roi_x2 = int(spec.roi[2] * screen_width)
+        roi_y2 = int(spec.roi[3] * screen_height)
+        region = screenshot_gray[roi_y1:roi_y2, roi_x1:roi_x2]
+
+        if region.shape[0] < template.height or region.shape[1] < template.width:
+            return {"found": False, "confidence": 0.0, "threshold": spec.threshold}
+
+        if template.coarse is not None:
+            confidence, (match_x, match_y) = self._coarse_to_fine(template, region)
+        else:
+            confidence, (match_x, match_y) = self._best_match(region, template.gray)
+
+        top_left_x = roi_x1 + match_x
+        top_left_y = roi_y1 + match_y
+
+        return {
+            "found": confidence >= spec.threshold,
+            "x": top_left_x + template.width // 2,
+            "y": top_left_y + template.height // 2,
+            "confidence": confidence,
+            "width": template.width,
+            "height": template.height,
+            "top_left_x": top_left_x,
+            "top_left_y": top_left_y,
+            "threshold": spec.threshold,
+        }
+
+    def match_many(
+        self, names: List[str], screenshot_gray: np.ndarray, parallel: bool = False
+    ) -> Dict[str, dict]:
+        """
+        Match several templates against the same grayscale screenshot.
+        OpenCV releases the GIL while matching, so templates can run in parallel.
+        """
+        if not parallel or len(names) < 2:
+            return {name: self.match(name, screenshot_gray) for name in names}
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self.specs), thread_name_prefix="template-matcher"
+            )
+        futures = {
+            name: self._executor.submit(self.match, name, screenshot_gray)
+            for name in names
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    def _coarse_to_fine(self, template: LoadedTemplate, region: np.ndarray):
+        """Locate on the downscaled level, then refine at full resolution"""
+        scale = template.scale
+        coarse_region = cv2.resize(
+            region, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+        if (
+            coarse_region.shape[0] < template.coarse.shape[0]
+            or coarse_region.shape[1] < template.coarse.shape[1]
+        ):
+            return self._best_match(region, template.gray)
+
+        coarse_result = cv2.matchTemplate(
+            coarse_region, template.coarse, cv2.TM_CCOEFF_NORMED
+        )
+        best = (-1.0, (0, 0))
+        for coarse_x, coarse_y in self._top_candidates(
+            coarse_result, template.coarse.shape
+        ):
+            # Search a small full-resolution window around the coarse candidate
+            margin = int(2 / scale) + 2
+            x1 = max(0, int(coarse_x / scale) - margin)
+            y1 = max(0, int(coarse_y / scale) - margin)
+            x2 = min(region.shape[1], int(coarse_x / scale) + template.width + margin)
+            y2 = min(region.shape[0], int(coarse_y / scale) + template.height + margin)
+            window = region[y1:y2, x1:x2]
+
+            if window.shape[0] < template.height or window.shape[1] < template.width:
+                return self._best_match(region, template.gray)
+
+            confidence, (match_x, match_y) = self._best_match(window, template.gray)
+            if confidence > best[0]:
+                best = (confidence, (x1 + match_x, y1 + match_y))
+        return best
+
+    @staticmethod
+    def _top_candidates(result: np.ndarray, template_shape) -> list:
+        """Locations of the COARSE_CANDIDATES best non-overlapping coarse scores"""
+        result = result.copy()
+        half_height, half_width = template_shape[0] // 2, template_shape[1] // 2
+        candidates = []
+        for _ in range(COARSE_CANDIDATES):
+            _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+            if candidates and max_val <= -1.0:
+                break
+            candidates.append((x, y))
+            # Suppress the neighbourhood so the next candidate is a different spot
+            result[
+                max(0, y - half_height) : y + half_height + 1,
+                max(0, x - half_width) : x + half_width + 1,
+            ] = -1.0
+        return candidates
+
+    @staticmethod
+    def _best_match(image: np.ndarray, template: np.ndarray):
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return float(max_val), max_loc
+
+
+_template_matcher: Optional[TemplateMatcher] = None
+
+
+def get_template_matcher() -> TemplateMatcher:
+    """Shared matcher, templates are loaded on first use"""
+    global _template_matcher
+    if _template_matcher is None:
+        _template_matcher = TemplateMatcher()
+    return _template_matcher
+
+
+def configure_template_matcher(
+    pyramid_scale: float = None, rois: Dict[str, tuple] = None
+) -> TemplateMatcher:
+    """Apply agent configuration and (re)load templates at startup"""
+    matcher = get_template_matcher()
+    if pyramid_scale is not None and pyramid_scale != matcher.pyramid_scale:
+        matcher.pyramid_scale = pyramid_scale
+        matcher.load()
+    for name, roi in (rois or {}).items():
+        if roi is not None and name in matcher.specs:
+            matcher.set_roi(name, roi)
+    return matcher
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# app/test_adb_shell.py
+
+"""
+Test script to verify the persistent ADB shell session
+"""
+
+import os
+import re
+import select
+import shlex
+import subprocess
+
+from ppadb.device import Device
+
+import adb_shell
+import helper_functions
+from adb_shell import (
+    CommandInterruptedError,
+    PersistentShell,
+    configure_persistent_shell,
+)
+from helper_functions import input_text_robust, shell, tap
+
+COMMAND_PATTERN = re.compile(rb"sh -c (.*) </dev/null 2>&1; echo (\S+)\n", re.S)
+
+
+class _FakeShellConnection:
+    """adb server connection running a fake `sh` that answers each command"""
+
+    def __init__(self, client):
+        self.client = client
+        self.pending = b""
+        self.closed = False
+
+    def send(self, msg):
+        # "host:transport:<serial>" then "shell:sh"
+        self.client.requests.append(msg)
+        return True
+
+    def write(self, data):
+        quoted, sentinel = COMMAND_PATTERN.fullmatch(data).groups()
+        (command,) = shlex.split(quoted.decode())
+        self.client.commands.append(command)
+        if self.client.drop_after_write:
+            self.client.drop_after_write = False
+            return
+        output = b"Physical size: 1080x2400\n" if command == "wm size" else b""
+        # Split the reply to exercise partial reads
+        self.pending += output + b"partial" + sentinel + b"\n"
+
+    def read(self, length=0):
+        data, self.pending = self.pending[:7], self.pending[7:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+class _LocalShConnection:
+    """Connection backed by a local `sh` process, like the device-side shell"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ["sh"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+
+    def send(self, msg):
+        return True
+
+    def write(self, data):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def read(self, length=0):
+        # An empty read counts as a dropped session instead of hanging the test
+        ready, _, _ = select.select([self.process.stdout], [], [], 5)
+        return os.read(self.process.stdout.fileno(), length) if ready else b""
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+
+
+class _FakeAdbClient:
+    def __init__(self):
+        self.connections = []
+        self.requests = []
+        self.commands = []
+        self.drop_after_write = False
+        self.refuse_connections = False
+
+    def create_connection(self, timeout=None):
+        if self.refuse_connections:
+            raise RuntimeError("adb server unreachable")
+        conn = _FakeShellConnection(self)
+        self.connections.append(conn)
+        return conn
+
+
+def test_commands_share_one_session():
+    """Test that commands reuse one shell channel and parse their output"""
+    print("🧪 Testing persistent shell session...")
+
+    client = _FakeAdbClient()
+    session = PersistentShell(Device(client, "emulator-5554"))
+
+    assert session.run("wm size") == "Physical size: 1080x2400\npartial"
+    assert session.run("input tap 1 2") == "partial"
+    assert len(client.connections) == 1
+    assert client.requests == ["host:transport:emulator-5554", "shell:sh"]
+    assert client.commands == ["wm size", "input tap 1 2"]
+    print("✅ Two commands sent over one shell channel")
+
+
+def test_session_reconnects_after_drop():
+    """Test that a dropped session fails the command in flight and then reopens"""
+    print("🧪 Testing shell session reconnect...")
+
+    client = _FakeAdbClient()
+    session = PersistentShell(Device(client, "emulator-5554"))
+    session.run("input keyevent KEYCODE_HOME")
+
+    client.drop_after_write = True
+    try:
+        session.run("input tap 5 5")
+        assert False, "Expected the dropped command to fail"
+    except RuntimeError as e:
+        assert "dropped" in str(e)
+    assert not session.connected
+    assert client.connections[0].closed
+
+    assert session.run("input tap 6 6") == "partial"
+    assert len(client.connections) == 2
+    assert session.reconnects == 1
+    print("✅ Session reopened after the transport dropped")
+
+
+def test_syntax_error_ends_with_its_command():
+    """Test that a command with unbalanced quoting does not stall the session"""
+    print("🧪 Testing shell syntax errors...")
+
+    class _ShClient:
+        def create_connection(self, timeout=None):
+            return _LocalShConnection()
+
+    session = PersistentShell(Device(_ShClient(), "emulator-5554"), timeout=5)
+    try:
+        # Comment text ending in a backslash escapes the closing quote
+        output = session.run('echo "trailing backslash\\"')
+        assert "trailing backslash" not in output, output
+        assert session.run("echo still here") == "still here\n"
+        assert session.reconnects == 0
+    finally:
+        session.close()
+    print("✅ Syntax error contained to its own command")
+
+
+def test_dropped_commands_are_not_resent():
+    """Test that input commands interrupted by a drop are reported, not resent"""
+    print("🧪 Testing shell() after a dropped session...")
+
+    class _Device(Device):
+        def shell(self, cmd, handler=None, timeout=None):
+            return f"one-off: {cmd}"
+
+    client = _FakeAdbClient()
+    device = _Device(client, "emulator-5558")
+    helper_functions.set_sleep_scale(0)
+    try:
+        client.drop_after_write = True
+        try:
+            shell(device, "input tap 5 5")
+            assert False, "Expected the interrupted tap to raise"
+        except CommandInterruptedError:
+            pass
+
+        client.drop_after_write = True
+        assert shell(device, "wm size") == "one-off: wm size"
+        assert client.commands == ["input tap 5 5", "wm size"]
+
+        client.drop_after_write = True
+        assert tap(device, 6, 6) is False
+        assert tap(device, 6, 6) is True
+
+        # The text is not typed again by the fallback methods
+        client.drop_after_write = True
+        result = input_text_robust(device, "hello there")
+        assert not result["success"], result
+        assert "interrupted" in result["error"], result
+        assert client.commands[-1] == 'input text "hello there"', client.commands
+    finally:
+        helper_functions.set_sleep_scale(1.0)
+        adb_shell.close_shell_sessions()
+    print("✅ Interrupted input reported to the caller and not resent")
+
+
+def test_shell_helper_falls_back_when_unavailable():
+    """Test that shell() uses a one-off channel when no session can be opened"""
+    print("🧪 Testing shell() fallback...")
+
+    class _Device(Device):
+        def shell(self, cmd, handler=None, timeout=None):
+            return f"one-off: {cmd}"
+
+    client = _FakeAdbClient()
+    device = _Device(client, "emulator-5556")
+    try:
+        assert shell(device, "wm size") == "Physical size: 1080x2400\npartial"
+
+        client.refuse_connections = True
+        adb_shell.close_shell_sessions()
+        assert shell(device, "wm size") == "one-off: wm size"
+
+        configure_persistent_shell(False)
+        client.refuse_connections = False
+        assert shell(device, "wm size") == "one-off: wm size"
+    finally:
+        configure_persistent_shell(True)
+        adb_shell.close_shell_sessions()
+    print("✅ shell() falls back to device.shell()")
+
+
+if __name__ == "__main__":
+    test_commands_share_one_session()
+    test_session_reconnects_after_drop()
+    test_syntax_error_ends_with_its_command()
+    test_dropped_commands_are_not_resent()
+    test_shell_helper_falls_back_when_unavailable()
+    print("\n🎉 All ADB shell tests passed!")
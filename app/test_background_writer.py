@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# app/test_background_writer.py
+
+"""
+Test script to verify the background writer queue
+"""
+
+import threading
+import time
+
+from background_writer import BackgroundWriter
+
+
+def test_writes_run_in_order():
+    """Test that queued writes run in submission order and flush() drains them"""
+    print("🧪 Testing background write ordering...")
+
+    writer = BackgroundWriter(name="test-writer")
+    done = []
+    for i in range(100):
+        writer.submit(lambda i=i: (time.sleep(0.0005), done.append(i)))
+    writer.flush()
+
+    assert done == list(range(100)), done
+    assert writer.pending == 0
+    print("✅ 100 writes ran in order")
+
+
+def test_full_queue_applies_backpressure():
+    """Test that submit() blocks once max_pending writes are queued"""
+    print("🧪 Testing background writer backpressure...")
+
+    writer = BackgroundWriter(name="test-writer", max_pending=2)
+    release = threading.Event()
+    writer.submit(release.wait)  # occupies the writer thread
+    time.sleep(0.05)
+    writer.submit(lambda: None)
+    writer.submit(lambda: None)
+
+    blocked = threading.Thread(target=writer.submit, args=(lambda: None,))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive(), "submit() should block while the queue is full"
+
+    release.set()
+    blocked.join(2)
+    assert not blocked.is_alive()
+    writer.flush()
+    assert writer.pending == 0
+    print("✅ Full queue blocked the producer until a write finished")
+
+
+def test_failed_write_keeps_thread_alive():
+    """Test that an exception in one write does not stop later writes"""
+    print("🧪 Testing background write failure...")
+
+    writer = BackgroundWriter(name="test-writer")
+    done = []
+
+    def fail():
+        raise OSError("disk full")
+
+    writer.submit(fail)
+    writer.submit(done.append, "after")
+    writer.flush()
+
+    assert done == ["after"], done
+    assert writer._thread.is_alive()
+    print("✅ Writer survived a failed write")
+
+
+if __name__ == "__main__":
+    test_writes_run_in_order()
+    test_full_queue_applies_backpressure()
+    test_failed_write_keeps_thread_alive()
+    print("\n🎉 All background writer tests passed!")
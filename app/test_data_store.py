@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# app/test_data_store.py
+
+"""
+Test script to verify the JSONL and SQLite comment stores
+"""
+
+import json
+import os
+import tempfile
+
+import data_store
+
+
+def _in_temp_dir(test):
+    def run():
+        previous_dir = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                test()
+            finally:
+                data_store.close_comment_store()
+                data_store.close_database()
+                data_store.configure_data_store(db_file=data_store.DEFAULT_DB_FILE)
+                os.chdir(previous_dir)
+
+    run.__name__ = test.__name__
+    run.__doc__ = test.__doc__
+    return run
+
+
+@_in_temp_dir
+def test_legacy_migration_and_append():
+    """Test that the old JSON array is migrated once and then appended to"""
+    print("🧪 Testing legacy comment migration...")
+    data_store.configure_data_store("jsonl")
+
+    legacy = [
+        {"comment_id": "a", "style_used": "flirty", "generated_comment": "hi"},
+        {"comment_id": "b", "style_used": "comedic", "generated_comment": "yo"},
+    ]
+    with open(data_store.LEGACY_DATA_FILE, "w") as f:
+        json.dump(legacy, f, indent=2)
+
+    data_store.store_generated_comment("c", "profile", "hello", "flirty")
+    data_store.flush_comment_store()
+
+    assert not os.path.exists(data_store.LEGACY_DATA_FILE)
+    ids = [record["comment_id"] for record in data_store.load_generated_comments()]
+    assert ids == ["a", "b", "c"], ids
+    print("✅ Legacy comments migrated")
+
+
+@_in_temp_dir
+def test_failed_migration_is_retried():
+    """Test that an unreadable legacy file is not replaced by an empty log"""
+    print("🧪 Testing failed legacy migration...")
+    data_store.configure_data_store("jsonl")
+
+    with open(data_store.LEGACY_DATA_FILE, "w") as f:
+        f.write('[{"comment_id": "a", "style_used": "flirty"')
+
+    try:
+        list(data_store.load_generated_comments())
+        assert False, "Expected the migration to fail"
+    except ValueError as e:
+        assert data_store.LEGACY_DATA_FILE in str(e)
+    assert not os.path.exists(data_store.DATA_FILE)
+
+    with open(data_store.LEGACY_DATA_FILE, "w") as f:
+        f.write('[{"comment_id": "a", "style_used": "flirty"}]')
+    ids = [record["comment_id"] for record in data_store.load_generated_comments()]
+    assert ids == ["a"], ids
+    print("✅ Migration retried once the legacy file is readable")
+
+
+@_in_temp_dir
+def test_partial_line_recovery():
+    """Test that a record torn by a crash does not corrupt later writes"""
+    print("🧪 Testing torn write recovery...")
+    data_store.configure_data_store("jsonl")
+
+    with open(data_store.DATA_FILE, "w") as f:
+        f.write(json.dumps({"comment_id": "a", "style_used": "flirty"}) + "\n")
+        f.write('{"comment_id": "torn", "sty')
+
+    data_store.store_generated_comment("b", "profile", "hello", "comedic")
+
+    with open(data_store.FEEDBACK_FILE, "w") as f:
+        json.dump(
+            [
+                {"comment_id": "a", "outcome": "match"},
+                {"comment_id": "b", "outcome": "no_match"},
+            ],
+            f,
+        )
+
+    rates = data_store.calculate_template_success_rates()
+    assert rates == {"flirty": 1.0, "comedic": 0.0}, rates
+    print("✅ Torn line skipped, later records intact")
+
+
+@_in_temp_dir
+def test_sqlite_success_rates():
+    """Test that SQLite imports the JSONL history and aggregates by style"""
+    print("🧪 Testing SQLite success rates...")
+
+    data_store.configure_data_store("jsonl")
+    data_store.store_generated_comment("a", "profile", "hi", "flirty")
+    data_store.close_comment_store()
+
+    data_store.configure_data_store("sqlite")
+    data_store.store_generated_comment("b", "profile", "hey", "flirty")
+    data_store.store_generated_comment("c", "profile", "yo", "comedic")
+    with open(data_store.FEEDBACK_FILE, "w") as f:
+        json.dump([{"comment_id": "a", "outcome": "match"}], f)
+    data_store.store_feedback("b", "no_match")
+    data_store.store_feedback("c", "match")
+
+    rates = data_store.calculate_template_success_rates()
+    assert rates == {"flirty": 0.5, "comedic": 1.0}, rates
+
+    # Feedback file records are only imported once
+    assert data_store.calculate_template_success_rates() == rates
+    print("✅ SQLite aggregates match")
+
+
+@_in_temp_dir
+def test_comments_imported_after_backend_switch():
+    """Test that comments logged after the first SQLite import are imported too"""
+    print("🧪 Testing incremental comment import...")
+
+    data_store.configure_data_store("jsonl")
+    data_store.store_generated_comment("a", "profile", "hi", "flirty")
+    data_store.configure_data_store("sqlite")
+    data_store.store_feedback("a", "match")
+    assert data_store.calculate_template_success_rates() == {"flirty": 1.0}
+
+    data_store.configure_data_store("jsonl")
+    data_store.store_generated_comment("b", "profile", "yo", "comedic")
+    data_store.configure_data_store("sqlite")
+    data_store.store_feedback("b", "no_match")
+
+    rates = data_store.calculate_template_success_rates()
+    assert rates == {"flirty": 1.0, "comedic": 0.0}, rates
+    count = data_store._get_database().execute("SELECT COUNT(*) FROM comments")
+    assert count.fetchone()[0] == 2
+    print("✅ Later log entries imported once")
+
+
+@_in_temp_dir
+def test_sqlite_comments_kept_in_log():
+    """Test that comments stored with SQLite are still there after switching to JSONL"""
+    print("🧪 Testing switch back to the JSONL store...")
+
+    data_store.configure_data_store("sqlite")
+    data_store.store_generated_comment("a", "profile", "hi", "flirty")
+    assert data_store.calculate_template_success_rates() == {}
+    data_store.store_generated_comment("b", "profile", "yo", "comedic")
+    data_store.flush_comment_store()
+    count = data_store._get_database().execute("SELECT COUNT(*) FROM comments")
+    assert count.fetchone()[0] == 2
+
+    data_store.configure_data_store("jsonl")
+    with open(data_store.FEEDBACK_FILE, "w") as f:
+        json.dump([{"comment_id": "a", "outcome": "match"}], f)
+    ids = [c["comment_id"] for c in data_store.load_generated_comments()]
+    assert ids == ["a", "b"], ids
+    assert data_store.calculate_template_success_rates() == {"flirty": 1.0}
+    print("✅ SQLite comments visible to the JSONL store")
+
+
+@_in_temp_dir
+def test_backend_switch_keeps_db_file():
+    """Test that selecting a backend does not reset a custom database path"""
+    print("🧪 Testing custom database path...")
+
+    data_store.configure_data_store("sqlite", "custom.db")
+    data_store.store_feedback("a", "match")
+    db = data_store._get_database()
+
+    data_store.configure_data_store(backend="sqlite")
+    assert data_store.DB_FILE == "custom.db"
+    assert data_store._get_database() is db, "connection should stay open"
+    data_store.configure_data_store(backend="jsonl")
+    assert data_store.DB_FILE == "custom.db"
+    assert not os.path.exists(data_store.DEFAULT_DB_FILE)
+    print("✅ Custom database path kept")
+
+
+@_in_temp_dir
+def test_incremental_style_counters():
+    """Test that counters persist and pick up feedback stored before its comment"""
+    print("🧪 Testing incremental style counters...")
+
+    for backend in ("jsonl", "sqlite"):
+        data_store.configure_data_store(backend)
+        with open(data_store.FEEDBACK_FILE, "w") as f:
+            json.dump([{"comment_id": f"{backend}-late", "outcome": "match"}], f)
+
+        assert data_store.calculate_template_success_rates() == {}
+        data_store.store_generated_comment(f"{backend}-late", "p", "hi", backend)
+
+        rates = data_store.calculate_template_success_rates()
+        assert rates == {backend: 1.0}, (backend, rates)
+        print(f"   ✅ {backend} counters updated")
+
+
+if __name__ == "__main__":
+    test_legacy_migration_and_append()
+    test_failed_migration_is_retried()
+    test_partial_line_recovery()
+    test_sqlite_success_rates()
+    test_comments_imported_after_backend_switch()
+    test_sqlite_comments_kept_in_log()
+    test_backend_switch_keeps_db_file()
+    test_incremental_style_counters()
+    print("\n🎉 All data store tests passed!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# app/test_frame.py
+
+"""
+Test script to verify in-memory frames and raw framebuffer decoding
+"""
+
+import struct
+
+import cv2
+import numpy as np
+
+from frame import Frame, decode_raw_framebuffer
+
+
+def _random_rgba(width, height):
+    rng = np.random.default_rng(42)
+    return rng.integers(0, 255, (height, width, 4), dtype=np.uint8)
+
+
+def test_frame_lazy_decoding():
+    """Test that a frame decodes PNG bytes once and re-encodes from pixels"""
+    print("🧪 Testing Frame lazy decoding...")
+
+    image = cv2.cvtColor(_random_rgba(16, 32), cv2.COLOR_RGBA2BGR)
+    png_frame = Frame("encoded", image=image)
+    decoded_frame = Frame("decoded", png_bytes=png_frame.png_bytes)
+
+    assert decoded_frame.image is decoded_frame.image
+    assert (decoded_frame.image == image).all()
+    assert decoded_frame.gray.shape == (32, 16)
+    assert (decoded_frame.width, decoded_frame.height) == (16, 32)
+
+    print("✅ Frame decoding working")
+
+
+def test_encode_crop_and_downscale():
+    """Test that upload encoding crops to a region and caps the longest edge"""
+    print("🧪 Testing Frame upload encoding...")
+
+    image = cv2.cvtColor(_random_rgba(400, 800), cv2.COLOR_RGBA2BGR)
+    frame = Frame("upload", image=image)
+
+    for fmt in ("jpeg", "webp"):
+        encoded = frame.encode(fmt, max_edge=200, quality=80, crop=(0, 0, 1, 0.5))
+        decoded = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape[:2] == (200, 200), decoded.shape
+        print(f"   ✅ {fmt}: {len(encoded)} bytes vs {len(frame.png_bytes)} PNG")
+
+
+def test_raw_framebuffer_headers():
+    """Test both the 12-byte and 16-byte screencap headers"""
+    print("🧪 Testing raw framebuffer decoding...")
+
+    width, height = 8, 6
+    rgba = _random_rgba(width, height)
+    expected = cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+
+    headers = [
+        struct.pack("<III", width, height, 1),
+        struct.pack("<IIII", width, height, 1, 0),
+    ]
+    for header in headers:
+        decoded = decode_raw_framebuffer(header + rgba.tobytes())
+        assert decoded.shape == (height, width, 3)
+        assert (decoded == expected).all()
+        print(f"   ✅ {len(header)}-byte header decoded")
+
+    try:
+        decode_raw_framebuffer(struct.pack("<III", width, height, 1) + b"\x00" * 10)
+        raise AssertionError("Truncated framebuffer should be rejected")
+    except ValueError:
+        print("   ✅ Truncated framebuffer rejected")
+
+
+if __name__ == "__main__":
+    test_frame_lazy_decoding()
+    test_encode_crop_and_downscale()
+    test_raw_framebuffer_headers()
+    print("\n🎉 All frame tests passed!")
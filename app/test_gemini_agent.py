@@ -6,7 +6,6 @@ Test script for Hinge automation system using Gemini AI.
 This script tests various components to ensure proper setup and functionality.
 """
 
-import os
 from config import GEMINI_API_KEY
 from helper_functions import connect_device, get_screen_resolution, capture_screenshot
 from gemini_analyzer import (
@@ -26,9 +25,9 @@ def test_gemini_connection():
         return False
 
     try:
-        from google import genai
+        from gemini_client import get_gemini_client
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        client = get_gemini_client(GEMINI_API_KEY)
 
         # Simple text generation test
         response = client.models.generate_content(
@@ -91,17 +90,17 @@ def test_screenshot_and_analysis(device):
     try:
         # Capture test screenshot
         print("📸 Capturing test screenshot...")
-        screenshot_path = capture_screenshot(device, "gemini_test")
+        screenshot = capture_screenshot(device, "gemini_test")
 
-        if not os.path.exists(screenshot_path):
-            print(f"❌ Screenshot not saved to {screenshot_path}")
+        if not screenshot.png_bytes or screenshot.image is None:
+            print(f"❌ Screenshot could not be decoded: {screenshot}")
             return False
 
-        print(f"✅ Screenshot saved: {screenshot_path}")
+        print(f"✅ Screenshot captured: {screenshot.width}x{screenshot.height}")
 
         # Test text extraction
         print("🔍 Testing text extraction with Gemini...")
-        extracted_text = extract_text_from_image_gemini(screenshot_path, GEMINI_API_KEY)
+        extracted_text = extract_text_from_image_gemini(screenshot, GEMINI_API_KEY)
 
         if extracted_text:
             print("✅ Text extraction successful")
@@ -111,7 +110,7 @@ def test_screenshot_and_analysis(device):
 
         # Test UI analysis
         print("🎯 Testing UI analysis with Gemini...")
-        ui_analysis = analyze_dating_ui_with_gemini(screenshot_path, GEMINI_API_KEY)
+        ui_analysis = analyze_dating_ui_with_gemini(screenshot, GEMINI_API_KEY)
 
         if ui_analysis:
             print("✅ UI analysis successful")
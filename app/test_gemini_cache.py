@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# app/test_gemini_cache.py
+
+"""
+Test script to verify the content-addressed Gemini response cache
+"""
+
+import itertools
+import tempfile
+
+import numpy as np
+
+from fakes import StubGeminiClient
+from frame import Frame
+from gemini_analyzer import extract_text_from_image_gemini, generate_comment_gemini
+from gemini_cache import GeminiResponseCache, configure_gemini_cache
+
+
+def _counting_client():
+    """Client whose responses are numbered, so repeated requests are visible"""
+    numbers = itertools.count(1)
+    return StubGeminiClient(lambda contents, config: f"response {next(numbers)}")
+
+
+def _screen(value):
+    return Frame("screen", image=np.full((200, 100, 3), value, dtype=np.uint8))
+
+
+def test_repeated_analysis_hits_cache():
+    """Test that analyzing an identical screen twice makes one request"""
+    print("🧪 Testing Gemini response cache hits...")
+
+    client = _counting_client()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            configure_gemini_cache(directory=directory)
+
+            first = extract_text_from_image_gemini(_screen(120), client=client)
+            second = extract_text_from_image_gemini(_screen(120), client=client)
+            other = extract_text_from_image_gemini(_screen(30), client=client)
+
+            assert first == second == "response 1"
+            assert other == "response 2"
+            assert client.models.calls == 2
+    finally:
+        configure_gemini_cache(enabled=False)
+    print("✅ Identical screen served from cache")
+
+
+def test_comment_generation_is_not_cached():
+    """Test that the same profile text gets a freshly generated comment"""
+    print("🧪 Testing uncached comment generation...")
+
+    client = _counting_client()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            configure_gemini_cache(directory=directory)
+
+            first = generate_comment_gemini("Name: Sam\nLoves hiking", client=client)
+            second = generate_comment_gemini("Name: Sam\nLoves hiking", client=client)
+
+            assert client.models.calls == 2
+            assert first != second
+    finally:
+        configure_gemini_cache(enabled=False)
+    print("✅ Comment generated per request")
+
+
+def test_disk_persistence_and_ttl():
+    """Test that entries survive a restart and expire after the TTL"""
+    print("🧪 Testing Gemini cache persistence and TTL...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = GeminiResponseCache(directory=directory)
+        key = cache.make_key("test", "model", "prompt", [_screen(50)])
+        cache.put(key, "cached text")
+
+        restarted = GeminiResponseCache(directory=directory)
+        assert restarted.get(key) == "cached text"
+
+        expired = GeminiResponseCache(directory=directory, ttl_seconds=-1)
+        assert expired.get(key) is None
+    print("✅ Persistence and TTL work")
+
+
+if __name__ == "__main__":
+    test_repeated_analysis_hits_cache()
+    test_comment_generation_is_not_cached()
+    test_disk_persistence_and_ttl()
+    print("\n🎉 All Gemini cache tests passed!")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# app/test_gemini_client.py
+
+"""
+Test script to verify the shared Gemini client provider
+"""
+
+import numpy as np
+from google import genai
+
+import gemini_client
+from agent_config import AgentConfig
+from fakes import StubGeminiClient, profile_response
+from frame import Frame
+from gemini_analyzer import (
+    PROFILE_FRAMES_SCHEMA,
+    analyze_profile_frames_gemini,
+    extract_text_from_image_gemini,
+)
+from gemini_cache import configure_gemini_cache
+from gemini_client import get_gemini_client
+from langgraph_hinge_agent import LangGraphHingeAgent
+
+
+def test_passed_client_is_used():
+    """Test that a client passed to an analyzer call replaces the shared one there only"""
+    print("🧪 Testing Gemini client injection...")
+
+    stub = StubGeminiClient("Name: Sam")
+    configure_gemini_cache(enabled=False)
+    screen = Frame("screen", image=np.zeros((200, 100, 3), dtype=np.uint8))
+    assert extract_text_from_image_gemini(screen, client=stub) == "Name: Sam"
+    assert stub.models.calls == 1
+
+    # An agent keeps its injected client to itself
+    agent = LangGraphHingeAgent(
+        config=AgentConfig(save_screenshots=False), gemini_client=stub
+    )
+    try:
+        assert agent.gemini_client is stub
+        assert get_gemini_client("test-key") is not stub
+    finally:
+        gemini_client._clients.clear()
+    print("✅ Passed client used by analyzer calls")
+
+
+def test_profile_frames_request_is_typed():
+    """Test that the multi-frame analysis sends its schema and joins list content"""
+    print("🧪 Testing typed profile frames response...")
+
+    configs = []
+
+    def respond(contents, config):
+        configs.append(config)
+        analysis = {"profile_quality_score": 7, "red_flags": []}
+        return profile_response(analysis, ["Name: Sam", "Loves hiking"])
+
+    stub = StubGeminiClient(respond)
+    configure_gemini_cache(enabled=False)
+    screens = [
+        Frame(f"screen_{i}", image=np.full((200, 100, 3), i * 40, dtype=np.uint8))
+        for i in range(3)
+    ]
+    result = analyze_profile_frames_gemini(screens, client=stub)
+
+    assert result["user_content"] == "Name: Sam\nLoves hiking", result
+    assert result["analysis"]["profile_quality_score"] == 7
+    assert configs[0].response_mime_type == "application/json"
+    assert configs[0].response_schema is PROFILE_FRAMES_SCHEMA
+    print("✅ Schema sent and list content joined by lines")
+
+
+def test_client_reused_per_api_key():
+    """Test that one client is created per API key and then reused"""
+    print("🧪 Testing Gemini client reuse...")
+
+    created = []
+    original = gemini_client._create_client
+    gemini_client._create_client = lambda key: created.append(key) or object()
+    gemini_client._clients.clear()
+    try:
+        first = get_gemini_client("key-a")
+        assert get_gemini_client("key-a") is first
+        second = get_gemini_client("key-b")
+        assert second is not first
+        assert created == ["key-a", "key-b"]
+
+        # The real client is created the same way, with the pooled HTTP client
+        assert isinstance(original("test-key"), genai.Client)
+    finally:
+        gemini_client._create_client = original
+        gemini_client._clients.clear()
+    print("✅ One client per API key")
+
+
+if __name__ == "__main__":
+    test_passed_client_is_used()
+    test_profile_frames_request_is_typed()
+    test_client_reused_per_api_key()
+    print("\n🎉 All Gemini client tests passed!")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# app/test_instrumentation.py
+
+"""
+Test script to verify latency spans and the timing report
+"""
+
+import time
+
+import instrumentation
+from instrumentation import span, timed, timing_report
+
+
+@timed("test", "sleepy")
+def _sleepy(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_disabled_spans_record_nothing():
+    """Test that spans are no-ops while timing is disabled"""
+    print("🧪 Testing disabled spans...")
+
+    instrumentation.enable_timing(False)
+    instrumentation.reset_timing()
+    with span("test", "block"):
+        pass
+    assert _sleepy(0) == 0
+    assert timing_report() == {}
+    print("✅ Disabled spans are no-ops")
+
+
+def test_timing_report_percentiles():
+    """Test that enabled spans produce per-category percentiles"""
+    print("🧪 Testing timing report...")
+
+    instrumentation.enable_timing(True)
+    instrumentation.reset_timing()
+    try:
+        for _ in range(3):
+            _sleepy(0.01)
+        with span("adb", "input tap"):
+            time.sleep(0.02)
+        report = timing_report()
+    finally:
+        instrumentation.enable_timing(False)
+        instrumentation.reset_timing()
+
+    assert report["test"]["sleepy"]["count"] == 3
+    assert report["test"]["sleepy"]["p50_ms"] >= 10
+    assert report["adb"]["input tap"]["max_ms"] >= 20
+    print(f"✅ Timing report: {report}")
+
+
+if __name__ == "__main__":
+    test_disabled_spans_record_nothing()
+    test_timing_report_percentiles()
+    print("\n🎉 All instrumentation tests passed!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# app/test_replay.py
+
+"""
+Test script to verify that a recorded session replays through the full agent graph
+"""
+
+import os
+import tempfile
+import time
+
+
+from agent_config import AgentConfig
+from fakes import FakeDevice, StubGeminiClient, profile_response
+from helper_functions import set_sleep_scale, wait_for_screen_stable
+from langgraph_hinge_agent import LangGraphHingeAgent
+from replay import (
+    RecordingDevice,
+    RecordingGeminiClient,
+    ReplayDevice,
+    ReplayGeminiClient,
+    SessionRecorder,
+    SessionReplay,
+)
+
+
+def _stub_client():
+    analysis = {"profile_quality_score": 3, "red_flags": ["no bio"]}
+    return StubGeminiClient(profile_response(analysis))
+
+
+def _run(device, gemini_client):
+    config = AgentConfig(
+        max_profiles=1, save_screenshots=False, gemini_cache_enabled=False
+    )
+    agent = LangGraphHingeAgent(
+        max_profiles=1, config=config, gemini_client=gemini_client, device=device
+    )
+    return agent.run_automation()
+
+
+def test_record_then_replay():
+    """Test that replaying a recording reproduces the session offline"""
+    print("🧪 Testing session record and replay...")
+
+    previous_dir = os.getcwd()
+    set_sleep_scale(0)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+
+            stub = _stub_client()
+            recorder = SessionRecorder("fixture", metadata={"max_profiles": 1})
+            recorded = _run(
+                RecordingDevice(FakeDevice(seed=7), recorder),
+                RecordingGeminiClient(stub, recorder),
+            )
+            recorder.close()
+            assert stub.models.calls > 0
+
+            replay = SessionReplay("fixture")
+            replayed = _run(ReplayDevice(replay), ReplayGeminiClient(replay))
+    finally:
+        set_sleep_scale(1.0)
+        os.chdir(previous_dir)
+
+    for key in ("profiles_processed", "likes_sent", "comments_sent"):
+        assert replayed[key] == recorded[key], (key, recorded, replayed)
+    assert replay.drift()["deterministic"], replay.drift()
+    assert recorded["profiles_processed"] == 1, recorded
+    print(f"✅ Replay matches recording: {replayed['profiles_processed']} processed")
+
+
+def test_timed_out_wait_replays_same_captures():
+    """Test that a wait that timed out while recording takes as many polls in replay"""
+    print("🧪 Testing replay of a timed-out screen wait...")
+
+    class _SlowAnimatingDevice(FakeDevice):
+        def screencap(self):
+            time.sleep(0.03)
+            self.current = (self.current + 1) % len(self.screens)
+            return self.screens[self.current]
+
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = SessionRecorder(directory)
+        device = RecordingDevice(_SlowAnimatingDevice(), recorder)
+        recorded = wait_for_screen_stable(device, timeout=0.05, min_interval=0.01)
+        marker = device.screencap()
+        recorder.close()
+        assert not recorded["stable"]
+        assert recorded["polls"] < 6, recorded  # ended by the timeout
+
+        replay = SessionReplay(directory)
+        replay_device = ReplayDevice(replay)
+        set_sleep_scale(0)
+        try:
+            replayed = wait_for_screen_stable(
+                replay_device, timeout=0.05, min_interval=0.01
+            )
+        finally:
+            set_sleep_scale(1.0)
+
+        assert replayed["polls"] == recorded["polls"], (recorded, replayed)
+        assert replay_device.screencap() == marker
+    print(f"✅ Replayed wait took the recorded {recorded['polls']} polls")
+
+
+def test_replay_counts_drift():
+    """Test that requests differing from the recording are counted"""
+    print("🧪 Testing replay drift detection...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = SessionRecorder(directory)
+        device = RecordingDevice(FakeDevice(seed=7), recorder)
+        device.shell("input tap 10 10")
+        RecordingGeminiClient(_stub_client(), recorder).models.generate_content(
+            "model", ["prompt"]
+        )
+        recorder.close()
+
+        replay = SessionReplay(directory)
+        ReplayDevice(replay).shell("input swipe 1 2 3 4")
+        ReplayDevice(replay).shell("input tap 10 10")
+        ReplayGeminiClient(replay).models.generate_content("model", ["other prompt"])
+
+    drift = replay.drift()
+    assert drift["shell_mismatches"] == 2, drift
+    assert drift["gemini_mismatches"] == 1, drift
+    assert not drift["deterministic"]
+    print("✅ Drift counted")
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_timed_out_wait_replays_same_captures()
+    test_replay_counts_drift()
+    print("\n🎉 All replay tests passed!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# app/test_screen_change.py
+
+"""
+Test script to verify local perceptual screen change detection
+"""
+
+import cv2
+import numpy as np
+
+from frame import Frame
+from screen_change import detect_screen_change
+
+
+def _profile_screen(seed, width=540, height=1200):
+    """Synthetic profile screen: random photo-like header over a plain body"""
+    rng = np.random.default_rng(seed)
+    screen = np.full((height, width, 3), 245, dtype=np.uint8)
+    blocks = rng.integers(0, 255, (12, 6, 3), dtype=np.uint8)
+    screen[: height // 2] = cv2.resize(
+        blocks, (width, height // 2), interpolation=cv2.INTER_CUBIC
+    )
+    return screen
+
+
+def test_identical_screens_unchanged():
+    """Test that the same screen with small noise is reported unchanged"""
+    print("🧪 Testing unchanged screen detection...")
+
+    before = _profile_screen(1)
+    noise = np.random.default_rng(9).integers(-3, 4, before.shape)
+    after = np.clip(before.astype(int) + noise, 0, 255).astype(np.uint8)
+
+    result = detect_screen_change(
+        Frame("before", image=before), Frame("after", image=after)
+    )
+    assert result["verdict"] == "unchanged", result
+    print(f"✅ Unchanged (similarity: {result['similarity']:.2f})")
+
+
+def test_different_profiles_changed():
+    """Test that a different profile header is reported changed"""
+    print("🧪 Testing changed screen detection...")
+
+    before = Frame("before", image=_profile_screen(1))
+    after = Frame("after", image=_profile_screen(2))
+
+    result = detect_screen_change(before, after)
+    assert result["verdict"] == "changed", result
+    print(f"✅ Changed (similarity: {result['similarity']:.2f})")
+
+
+def _scrolled(screen, fraction):
+    """The same screen with its content moved up, as after a short swipe"""
+    shift = int(screen.shape[0] * fraction)
+    scrolled = np.full_like(screen, 245)
+    scrolled[:-shift] = screen[shift:]
+    return scrolled
+
+
+def test_scrolled_profile_not_changed():
+    """Test that a scrolled copy of the same profile is not reported as a new one"""
+    print("🧪 Testing scrolled screen detection...")
+
+    screen = _profile_screen(1)
+    before = Frame("before", image=screen)
+    after = Frame("after", image=_scrolled(screen, 0.125))
+
+    assert detect_screen_change(before, after)["verdict"] != "unchanged"
+    result = detect_screen_change(before, after, max_scroll=0.18)
+    assert result["verdict"] == "scrolled", result
+    assert abs(result["scroll"] - 0.125) < 0.01, result
+
+    other = Frame("other", image=_scrolled(_profile_screen(2), 0.125))
+    result = detect_screen_change(before, other, max_scroll=0.18)
+    assert result["verdict"] == "changed", result
+    print("✅ Scroll within a profile told apart from a new profile")
+
+
+def test_missing_reference_is_ambiguous():
+    """Test that a missing pre-action frame escalates instead of guessing"""
+    print("🧪 Testing missing reference frame...")
+
+    result = detect_screen_change(None, Frame("after", image=_profile_screen(2)))
+    assert result["verdict"] == "ambiguous"
+    print("✅ Missing reference escalates")
+
+
+if __name__ == "__main__":
+    test_identical_screens_unchanged()
+    test_different_profiles_changed()
+    test_scrolled_profile_not_changed()
+    test_missing_reference_is_ambiguous()
+    print("\n🎉 All screen change tests passed!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# app/test_screen_waits.py
+
+"""
+Test script to verify stable-screen waits after UI actions
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+import helper_functions
+from helper_functions import configure_screen_waits, settle, wait_for_screen_stable
+
+
+class _AnimatingDevice:
+    """Screen that changes for `frames` captures, then stays still"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.captures = 0
+
+    def screencap(self):
+        self.captures += 1
+        seed = min(self.captures, self.frames)
+        rng = np.random.default_rng(seed)
+        screen = rng.integers(0, 255, (400, 240, 3), dtype=np.uint8)
+        return cv2.imencode(".png", screen)[1].tobytes()
+
+
+def test_returns_once_screen_settles():
+    """Test that the wait ends as soon as consecutive captures match"""
+    print("🧪 Testing stable-screen wait...")
+
+    device = _AnimatingDevice(frames=3)
+    result = wait_for_screen_stable(device, timeout=5.0, min_interval=0.01)
+
+    assert result["stable"], result
+    assert result["polls"] == 4, result  # 3 changing frames + 1 unchanged
+    assert result["waited"] < 1.0, result
+    print(f"✅ Settled after {result['polls']} polls")
+
+
+def test_gives_up_on_animated_screen():
+    """Test that a screen that never settles is bounded by the poll budget"""
+    print("🧪 Testing stable-screen wait timeout...")
+
+    device = _AnimatingDevice(frames=10**6)
+    result = wait_for_screen_stable(device, timeout=0.1, min_interval=0.02)
+
+    assert not result["stable"], result
+    assert result["polls"] <= 6, result
+    print(f"✅ Gave up after {result['polls']} polls")
+
+
+def test_pacing_floor_is_respected():
+    """Test that a settled screen still waits for the configured pacing floor"""
+    print("🧪 Testing pacing floor...")
+
+    result = wait_for_screen_stable(
+        _AnimatingDevice(frames=1), timeout=1.0, min_interval=0.01, min_delay=0.3
+    )
+    assert result["stable"], result
+    assert result["waited"] >= 0.3, result
+    print(f"✅ Waited {result['waited']:.2f}s with a 0.3s floor")
+
+
+def test_settle_falls_back_to_fixed_delay():
+    """Test that settle() sleeps without capturing when waits are disabled"""
+    print("🧪 Testing settle() without stable-screen waits...")
+
+    device = _AnimatingDevice(frames=1)
+    configure_screen_waits(enabled=False)
+    helper_functions.set_sleep_scale(0.01)
+    try:
+        start = time.perf_counter()
+        settle(device, 2)
+        assert time.perf_counter() - start >= 0.02
+        assert device.captures == 0
+
+        configure_screen_waits(enabled=True, poll_interval=0.01)
+        settle(device, 2, 4)
+        assert device.captures == 2
+    finally:
+        helper_functions.set_sleep_scale(1.0)
+        configure_screen_waits(enabled=False)
+    print("✅ settle() switches between fixed delays and screen waits")
+
+
+if __name__ == "__main__":
+    test_returns_once_screen_settles()
+    test_gives_up_on_animated_screen()
+    test_pacing_floor_is_respected()
+    test_settle_falls_back_to_fixed_delay()
+    print("\n🎉 All screen wait tests passed!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# app/test_shell_batch.py
+
+"""
+Test script to verify batched ADB input commands
+"""
+
+import helper_functions
+from helper_functions import ShellBatch, _type_with_keyevents
+
+
+class _RecordingDevice:
+    def __init__(self):
+        self.commands = []
+
+    def shell(self, command):
+        self.commands.append(command)
+        return ""
+
+
+def test_batch_runs_in_one_round_trip():
+    """Test that queued commands and sleeps go out as one shell call"""
+    print("🧪 Testing shell batch...")
+
+    device = _RecordingDevice()
+    with ShellBatch(device) as batch:
+        batch.add("input tap 10 20")
+        batch.sleep(0.2)
+        batch.add("input tap 30 20")
+
+    assert device.commands == ["input tap 10 20; sleep 0.20; input tap 30 20"]
+    print("✅ Batch sent in one round-trip")
+
+
+def test_batch_splits_long_command_lines():
+    """Test that batches stay under the command length limit"""
+    print("🧪 Testing shell batch splitting...")
+
+    device = _RecordingDevice()
+    batch = ShellBatch(device)
+    for i in range(200):
+        batch.add(f"input keyevent KEYCODE_{i % 10}")
+    batch.run()
+
+    assert len(device.commands) > 1
+    assert all(
+        len(line) <= helper_functions.MAX_BATCH_COMMAND_LENGTH
+        for line in device.commands
+    )
+    assert sum(line.count("input keyevent") for line in device.commands) == 200
+    assert batch.commands == []
+    print(f"✅ 200 commands split into {len(device.commands)} round-trips")
+
+
+def test_keyevent_typing_is_batched():
+    """Test that keyevent typing sends one multi-key event per word"""
+    print("🧪 Testing batched keyevent typing...")
+
+    device = _RecordingDevice()
+    helper_functions.set_sleep_scale(0)
+    try:
+        _type_with_keyevents(device, "Hi there 2day!")
+        comment = "Would love to hear the story behind that photo " * 3
+        long_device = _RecordingDevice()
+        _type_with_keyevents(long_device, comment)
+    finally:
+        helper_functions.set_sleep_scale(1.0)
+
+    assert device.commands == [
+        "input keyevent KEYCODE_H KEYCODE_I KEYCODE_SPACE; "
+        "input keyevent KEYCODE_T KEYCODE_H KEYCODE_E KEYCODE_R KEYCODE_E KEYCODE_SPACE; "
+        "input keyevent KEYCODE_2 KEYCODE_D KEYCODE_A KEYCODE_Y "
+        "KEYCODE_SHIFT_LEFT KEYCODE_1"
+    ], device.commands
+    assert len(comment) > 140
+    assert len(long_device.commands) <= 3, long_device.commands
+    print(
+        f"✅ {len(comment)} characters typed in {len(long_device.commands)} round-trips"
+    )
+
+
+if __name__ == "__main__":
+    test_batch_runs_in_one_round_trip()
+    test_batch_splits_long_command_lines()
+    test_keyevent_typing_is_batched()
+    print("\n🎉 All shell batch tests passed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# app/test_template_matcher.py
+
+"""
+Test script to verify the pyramid template matcher on synthetic screenshots
+"""
+
+import cv2
+import numpy as np
+
+from template_matcher import TemplateMatcher
+
+
+def _synthetic_screen(matcher, placements, width=1080, height=2400):
+    """Composite templates onto a blurred noise background"""
+    rng = np.random.default_rng(7)
+    screen = rng.integers(0, 255, (height, width), dtype=np.uint8)
+    screen = cv2.GaussianBlur(screen, (0, 0), 3)
+    for name, (x, y) in placements.items():
+        template = matcher.templates[name].gray
+        screen[y : y + template.shape[0], x : x + template.shape[1]] = template
+    return screen
+
+
+def test_pyramid_matching_locates_templates():
+    """Test that coarse-to-fine matching recovers exact template positions"""
+    print("🧪 Testing pyramid template matching...")
+
+    matcher = TemplateMatcher()
+    placements = {
+        "like_button": (901, 1203),
+        "send_button": (250, 1900),
+        "comment_field": (75, 1300),
+    }
+    screen = _synthetic_screen(matcher, placements)
+
+    for name, (x, y) in placements.items():
+        result = matcher.match(name, screen)
+        assert result["found"], f"{name} not found: {result}"
+        assert (result["top_left_x"], result["top_left_y"]) == (x, y)
+        print(f"   ✅ {name} at ({x}, {y}) - confidence {result['confidence']:.3f}")
+
+
+def test_region_of_interest_excludes_matches():
+    """Test that a template outside its region of interest is not reported"""
+    print("🧪 Testing template regions of interest...")
+
+    matcher = TemplateMatcher()
+    # Send button placed in the top half, outside its default bottom-half region
+    screen = _synthetic_screen(matcher, {"send_button": (250, 300)})
+    assert not matcher.match("send_button", screen)["found"]
+
+    matcher.set_roi("send_button", (0.0, 0.0, 1.0, 1.0))
+    assert matcher.match("send_button", screen)["found"]
+
+    print("✅ Regions of interest respected")
+
+
+def test_refines_several_coarse_candidates():
+    """Test that a blurry look-alike winning the coarse pass does not hide the real match"""
+    print("🧪 Testing coarse candidate refinement...")
+
+    matcher = TemplateMatcher()
+    template = matcher.templates["like_button"]
+    # Like button in the left half, which the default search region covers
+    screen = _synthetic_screen(matcher, {"like_button": (100, 1800)})
+    decoy = cv2.resize(template.coarse, (template.width, template.height))
+    screen[400 : 400 + template.height, 600 : 600 + template.width] = decoy
+
+    result = matcher.match("like_button", screen)
+    assert (result["top_left_x"], result["top_left_y"]) == (100, 1800), result
+    print(f"✅ Real match kept over the decoy - confidence {result['confidence']:.3f}")
+
+
+def test_single_pass_multi_template_detection():
+    """Test detect_ui_elements_cv matches several templates on one frame"""
+    print("🧪 Testing single-pass multi-template detection...")
+
+    from frame import Frame
+    from helper_functions import detect_ui_elements_cv
+    from template_matcher import get_template_matcher
+
+    matcher = get_template_matcher()
+    placements = {"comment_field": (75, 1300), "send_button": (250, 1900)}
+    screen = _synthetic_screen(matcher, placements)
+    frame = Frame("synthetic", image=cv2.cvtColor(screen, cv2.COLOR_GRAY2BGR))
+
+    sequential = detect_ui_elements_cv(frame, list(placements))
+    parallel = detect_ui_elements_cv(frame, list(placements), parallel=True)
+
+    for name, (x, y) in placements.items():
+        assert sequential[name] == parallel[name]
+        assert (parallel[name]["top_left_x"], parallel[name]["top_left_y"]) == (x, y)
+    assert not detect_ui_elements_cv(frame, ["like_button"])["like_button"]["found"]
+
+    print("✅ Multi-template detection working")
+
+
+if __name__ == "__main__":
+    test_pyramid_matching_locates_templates()
+    test_region_of_interest_excludes_matches()
+    test_refines_several_coarse_candidates()
+    test_single_pass_multi_template_detection()
+    print("\n🎉 All template matcher tests passed!")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# app/test_workflow_routing.py
+
+"""
+Test script to verify rule-based workflow routing between action nodes
+"""
+
+import os
+import tempfile
+from dataclasses import replace
+
+import cv2
+import numpy as np
+
+from agent_config import AgentConfig
+from fakes import FakeDevice, StubGeminiClient, profile_response
+from helper_functions import set_sleep_scale
+from frame import Frame
+from langgraph_hinge_agent import EMPTY_PROFILE, LangGraphHingeAgent, SessionContext
+
+
+def _disliking_client():
+    analysis = {"profile_quality_score": 2, "red_flags": ["no bio"]}
+    return StubGeminiClient(profile_response(analysis))
+
+
+def _state(profile_index=-1, analysis=None, **overrides):
+    state = {
+        "last_action": "capture_screenshot",
+        "action_successful": True,
+        "stuck_count": 0,
+        "current_profile_index": 0,
+        "comment_interface_open": False,
+        "profile": replace(EMPTY_PROFILE, index=profile_index, analysis=analysis or {}),
+    }
+    state.update(overrides)
+    return state
+
+
+def _agent():
+    return LangGraphHingeAgent(
+        max_profiles=1, config=AgentConfig(save_screenshots=False)
+    )
+
+
+def test_happy_path_transitions():
+    """Test that the normal profile flow is routed without Gemini"""
+    print("🧪 Testing happy path transitions...")
+
+    agent = _agent()
+    expected = [
+        (_state(last_action="initialize_session"), "capture_screenshot"),
+        (_state(last_action="capture_screenshot"), "analyze_profile"),
+        (_state(last_action="analyze_profile"), "make_like_decision"),
+        (
+            _state(
+                last_action="make_like_decision",
+                analysis={"should_like": True},
+            ),
+            "detect_like_button",
+        ),
+        (_state(last_action="make_like_decision"), "execute_dislike"),
+        (_state(last_action="detect_like_button"), "execute_like"),
+        (
+            _state(last_action="execute_like", comment_interface_open=True),
+            "generate_comment",
+        ),
+        (_state(last_action="generate_comment"), "send_comment_with_typing"),
+        (
+            _state(
+                last_action="send_comment_with_typing",
+                current_profile_index=1,
+                profile_index=0,
+            ),
+            "capture_screenshot",
+        ),
+        (
+            _state(
+                last_action="send_comment_with_typing",
+                current_profile_index=0,
+                profile_index=0,
+            ),
+            "navigate_to_next",
+        ),
+    ]
+    for state, next_action in expected:
+        decided = agent.gemini_decide_action_node(state)
+        assert decided["next_tool_suggestion"] == next_action, (state, decided)
+    print("✅ Happy path routed locally")
+
+
+def test_failures_escalate_to_gemini():
+    """Test that failed actions and stuck states are left to Gemini"""
+    print("🧪 Testing escalation on failure...")
+
+    agent = _agent()
+    assert agent._rule_based_next_action(_state(action_successful=False)) is None
+    assert agent._rule_based_next_action(_state(stuck_count=1)) is None
+    print("✅ Failures escalate to Gemini")
+
+
+def test_nodes_return_state_deltas():
+    """Test that nodes return only changed keys and leave profile records intact"""
+    print("🧪 Testing node state deltas...")
+
+    agent = _agent()
+    state = _state(
+        last_action="analyze_profile",
+        analysis={"profile_quality_score": 9, "conversation_potential": 9},
+    )
+    state["profile"] = replace(state["profile"], text="Name: Sam")
+
+    update = agent.make_like_decision_node(state)
+
+    assert set(update) == {"profile", "last_action", "action_successful"}, update
+    assert update["profile"].analysis["should_like"] is True
+    assert update["profile"].text == "Name: Sam"
+    assert "should_like" not in state["profile"].analysis
+    print("✅ Node returned a delta with a new profile record")
+
+
+def test_scroll_is_not_navigation():
+    """Test that a navigation swipe which only scrolled the profile counts as stuck"""
+    print("🧪 Testing navigation verification after a scroll...")
+
+    blocks = np.random.default_rng(5).integers(0, 255, (12, 6, 3), dtype=np.uint8)
+    screen = np.full((1200, 540, 3), 245, dtype=np.uint8)
+    screen[:600] = cv2.resize(blocks, (540, 600), interpolation=cv2.INTER_CUBIC)
+    scrolled = np.full_like(screen, 245)
+    scrolled[:-150] = screen[150:]  # content moved up by the swipe
+
+    device = FakeDevice(seed=3)
+    device.screens = [
+        cv2.imencode(".png", image)[1].tobytes() for image in (screen, scrolled)
+    ]
+    state = _state(
+        session=SessionContext(device, 540, 1200, 1),
+        current_screenshot=Frame("before", image=screen),
+        profiles_processed=0,
+    )
+
+    agent = _agent()
+    set_sleep_scale(0)
+    try:
+        update = agent.navigate_to_next_node(state)
+    finally:
+        set_sleep_scale(1.0)
+
+    assert update["action_successful"] is False, update
+    assert update["stuck_count"] == 1
+    assert "current_profile_index" not in update
+    print("✅ Scrolled copy of the same profile not counted as a new profile")
+
+
+def test_run_initializes_once():
+    """Test that a multi-profile run opens the app once and respects the step limit"""
+    print("🧪 Testing single graph run...")
+
+    device = FakeDevice(seed=3)
+    config = AgentConfig(
+        save_screenshots=False, gemini_cache_enabled=False, stable_screen_waits=False
+    )
+    previous_dir = os.getcwd()
+    set_sleep_scale(0)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            agent = LangGraphHingeAgent(
+                max_profiles=4,
+                config=config,
+                gemini_client=_disliking_client(),
+                device=device,
+            )
+            result = agent.run_automation()
+
+            config.max_graph_steps_per_profile = 2
+            limited = agent.run_automation()
+    finally:
+        set_sleep_scale(1.0)
+        os.chdir(previous_dir)
+
+    assert result["profiles_processed"] == 4, result
+    assert device.launches == 2, device.launches  # once per run
+    assert limited["completion_reason"] == "Graph step limit reached", limited
+    print("✅ Four profiles processed in one graph run")
+
+
+def test_stream_automation_events():
+    """Test per-step progress events and stopping a run early"""
+    print("🧪 Testing streamed automation events...")
+
+    # Per-frame analysis runs extractions on the worker pool
+    config = AgentConfig(
+        save_screenshots=False,
+        gemini_cache_enabled=False,
+        stable_screen_waits=False,
+        profile_analysis_mode="per_frame",
+    )
+    previous_dir = os.getcwd()
+    set_sleep_scale(0)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            agent = LangGraphHingeAgent(
+                max_profiles=3,
+                config=config,
+                gemini_client=_disliking_client(),
+                device=FakeDevice(seed=3),
+            )
+            events = list(agent.stream_automation())
+
+            stopped = []
+            pooled = False
+            for event in agent.stream_automation():
+                stopped.append(event)
+                pooled = pooled or agent._extraction_pool is not None
+                if event.profiles_processed >= 1:
+                    break
+    finally:
+        set_sleep_scale(1.0)
+        os.chdir(previous_dir)
+
+    assert events[0].node == "initialize_session", events[0]
+    assert events[-2].node == "finalize_session", events[-2]
+    assert events[-1].node == "session_end", events[-1]
+    assert events[-1].profiles_processed == 3, events[-1]
+    assert events[-1].completion_reason == "Max profiles reached", events[-1]
+    assert [event.step for event in events[:-1]] == list(range(1, len(events)))
+    assert all(event.duration >= 0 for event in events)
+    processed = [event.profiles_processed for event in events]
+    assert processed == sorted(processed)
+
+    assert stopped[-1].profiles_processed == 1
+    assert pooled and agent._extraction_pool is None
+    assert "session_end" not in [event.node for event in stopped]
+    print(f"✅ {len(events)} events streamed, early stop after {len(stopped)}")
+
+
+if __name__ == "__main__":
+    test_happy_path_transitions()
+    test_failures_escalate_to_gemini()
+    test_nodes_return_state_deltas()
+    test_scroll_is_not_navigation()
+    test_run_initializes_once()
+    test_stream_automation_events()
+    print("\n🎉 All workflow routing tests passed!")